@@ -0,0 +1,63 @@
+import argparse
+
+from .bench_generator import generator_benchmarks
+from .runner import compare_results, load_results, run_suite, save_results
+
+
+def main() -> None:
+    """Запустить бенчмарки и при необходимости сравнить с прошлым прогоном."""
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Микробенчмарки password_generator и обработчиков бота.')
+    parser.add_argument('--suite',
+                        choices=('all', 'generator', 'handlers', 'sharding',
+                                 'replay'),
+                        default='all',
+                        help='sharding - нагрузочный тест процессов, '
+                             'replay - прогон main.py против заглушки '
+                             'Bot API; в all не входят.')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='Количества процессов для --suite sharding.')
+    parser.add_argument('--mode', nargs='+', default=['polling'],
+                        choices=('polling', 'async', 'sharded'),
+                        help='Режимы main.py для --suite replay.')
+    parser.add_argument('--chats', type=int, default=1000,
+                        help='Количество чатов для --suite replay.')
+    parser.add_argument('--concurrency', type=int, default=100,
+                        help='Одновременно активных чатов для --suite '
+                             'replay.')
+    parser.add_argument('--output', help='Записать результаты в JSON-файл.')
+    parser.add_argument('--compare',
+                        help='JSON-файл прошлого прогона для сравнения.')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Множитель количества вызовов.')
+    arguments = parser.parse_args()
+
+    if arguments.suite == 'sharding':
+        from .bench_sharding import sharding_load_test
+        results = sharding_load_test(arguments.workers, scale=arguments.scale)
+    elif arguments.suite == 'replay':
+        from .bench_replay import replay_suite
+        results = replay_suite(arguments.mode, chats=arguments.chats,
+                               concurrency=arguments.concurrency,
+                               scale=arguments.scale)
+    else:
+        benchmarks = list()
+        if arguments.suite in ('all', 'generator'):
+            benchmarks.extend(generator_benchmarks())
+        if arguments.suite in ('all', 'handlers'):
+            # бот создается только для бенчмарков обработчиков
+            from .bench_handlers import handler_benchmarks
+            benchmarks.extend(handler_benchmarks())
+        results = run_suite(benchmarks, scale=arguments.scale)
+
+    if arguments.output:
+        save_results(results, arguments.output)
+    if arguments.compare:
+        print()
+        for row in compare_results(load_results(arguments.compare), results):
+            print('{0:<60} {1:>8.2f}x'.format(row['name'], row['speedup']))
+
+
+if __name__ == '__main__':
+    main()
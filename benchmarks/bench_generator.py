@@ -0,0 +1,99 @@
+import functools
+import os
+import random
+import tempfile
+from typing import List
+
+from password_generator import AutomaticPasswordGeneration, \
+    CustomGenerationPassword
+from password_generator.dedup import BloomFilter, UniquePasswordGeneration
+from password_generator.generator import AUTOMATIC_TEMPLATE, \
+    PasswordGeneratorMixin
+from password_generator.rng import SeededRandomSource, SystemRandomSource
+from password_generator.strength import AUTOMATIC_KEYSPACE_BITS, \
+    score_many, score_password
+
+
+USER_SEQUENCE = 'kadabra'
+
+# длины кастомного пароля: остаточная длина 1, 2, 3 и длинные хвосты
+CUSTOM_PASSWORD_LENGTHS = range(8, 33)
+
+
+def generator_benchmarks() -> List:
+    """Бенчмарки password_generator: (имя, функция, количество вызовов)."""
+    automatic = AutomaticPasswordGeneration(auto_gen=True)
+    benchmarks = [
+        ('create_sequence', PasswordGeneratorMixin.create_sequence, 20000),
+        ('create_many_sequences[1000]',
+         lambda: PasswordGeneratorMixin.create_many_sequences(1000), 50),
+        ('automatic.generate_password', automatic.generate_password, 10000),
+        ('automatic.generate_many[1000]',
+         lambda: automatic.generate_many(1000), 50),
+    ]
+    for password_length in CUSTOM_PASSWORD_LENGTHS:
+        custom = CustomGenerationPassword(password_length=password_length,
+                                          user_sequence=USER_SEQUENCE)
+        benchmarks += [
+            ('custom.generate_password[{0}]'.format(password_length),
+             custom.generate_password, 5000),
+            ('custom.generate_many[{0}][1000]'.format(password_length),
+             functools.partial(custom.generate_many, 1000), 20),
+        ]
+    passwords = automatic.generate_many(1000)
+    benchmarks += [
+        ('strength.score_password',
+         lambda: score_password(passwords[0],
+                                keyspace_bits=AUTOMATIC_KEYSPACE_BITS), 10000),
+        ('strength.score_many[1000]',
+         lambda: score_many(passwords, keyspace_bits=AUTOMATIC_KEYSPACE_BITS),
+         20),
+    ]
+    benchmarks += dedup_benchmarks(automatic, passwords)
+    benchmarks += rng_benchmarks()
+    return benchmarks
+
+
+def rng_benchmarks() -> List:
+    """
+    Поштучная генерация пароля: прежний путь через общий random.choice
+    и буферы потока RandomSource.
+    """
+    choice = random.choice
+
+    def random_choice_password() -> str:
+        return ''.join([choice(alphabet)
+                        for shape in map(choice, AUTOMATIC_TEMPLATE.segments)
+                        for alphabet in shape])
+
+    system = SystemRandomSource()
+    seeded = SeededRandomSource(0)
+    return [
+        ('rng.random_choice.generate', random_choice_password, 10000),
+        ('rng.system.generate',
+         lambda: AUTOMATIC_TEMPLATE.generate(rng=system), 10000),
+        ('rng.seeded.generate',
+         lambda: AUTOMATIC_TEMPLATE.generate(rng=seeded), 10000),
+        ('rng.system.randbelow[62]', lambda: system.randbelow(62), 20000),
+        ('rng.random.randrange[62]', lambda: random.randrange(62), 20000),
+    ]
+
+
+def dedup_benchmarks(automatic: AutomaticPasswordGeneration,
+                     passwords: List[str]) -> List:
+    """Бенчмарки фильтра выданных паролей на 1 млн паролей."""
+    descriptor, path = tempfile.mkstemp(suffix='.bloom')
+    os.close(descriptor)
+    os.remove(path)
+    seen = BloomFilter(path, capacity=1000000, shared=False)
+    # файл отображен в память и после удаления доступен до закрытия
+    os.remove(path)
+    for password in passwords:
+        seen.add(password)
+    unique = UniquePasswordGeneration(automatic, seen)
+    return [
+        ('dedup.contains', lambda: passwords[0] in seen, 20000),
+        ('unique.generate_password', unique.generate_password, 10000),
+        ('unique.generate_many[1000]', lambda: unique.generate_many(1000),
+         20),
+    ]
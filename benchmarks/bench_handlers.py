@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+from typing import Dict, List
+
+from telebot import apihelper, types
+
+
+CHAT = {'id': 42, 'type': 'private', 'first_name': 'Gerry'}
+USER = {'id': 42, 'is_bot': False, 'first_name': 'Gerry'}
+
+
+class FakeResponse:
+    """Ответ Bot API в виде, который ожидает telebot.apihelper."""
+
+    status_code = 200
+
+    def __init__(self, payload: Dict) -> None:
+        self.text = json.dumps(payload)
+        self._payload = payload
+
+    def json(self) -> Dict:
+        return self._payload
+
+
+class FakeTelegramApi:
+    """
+    Заглушка Bot API для telebot.apihelper.CUSTOM_REQUEST_SENDER.
+
+    Ответы подготовлены заранее, чтобы в замер попадали обработчики
+    бота и telebot, а не заглушка.
+    """
+    def __init__(self) -> None:
+        self.calls = dict()
+        message = {'message_id': 1, 'date': 0, 'chat': CHAT, 'text': 'ok'}
+        sticker_message = dict(message, sticker={
+            'file_id': 'sticker-file-id', 'file_unique_id': 'sticker',
+            'width': 512, 'height': 512, 'is_animated': True})
+        self._responses = {
+            'sendSticker': FakeResponse({'ok': True,
+                                         'result': sticker_message}),
+        }
+        self._default_response = FakeResponse({'ok': True, 'result': message})
+
+    def __call__(self, method: str, url: str, **kwargs) -> FakeResponse:
+        method_name = url.rsplit('/', 1)[-1]
+        self.calls[method_name] = self.calls.get(method_name, 0) + 1
+        return self._responses.get(method_name, self._default_response)
+
+
+def message_update(update_id: int, text: str) -> types.Update:
+    """Update с текстовым сообщением пользователя."""
+    message = {'message_id': update_id, 'date': 0, 'chat': CHAT,
+               'from': USER, 'text': text}
+    if text.startswith('/'):
+        message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                'length': len(text)}]
+    return types.Update.de_json({'update_id': update_id, 'message': message})
+
+
+def callback_update(update_id: int, data: str) -> types.Update:
+    """Update с нажатием inline-кнопки."""
+    return types.Update.de_json({
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id), 'chat_instance': 'bench', 'data': data,
+            'from': USER,
+            'message': {'message_id': 1, 'date': 0, 'chat': CHAT,
+                        'text': 'Ваш пароль:\n\nbench'},
+        },
+    })
+
+
+def load_bot_app():
+    """
+    Создать бота через create_app с заглушкой Bot API.
+
+    Токен и кэш стикеров подменяются в окружении, ограничитель частоты
+    отключается, обработчики выполняются синхронно в вызывающем потоке.
+    """
+    os.environ.setdefault('BOT_TOKEN', '1:BENCHMARK')
+    os.environ.setdefault('RATE_LIMIT_RATE', '1e9')
+    os.environ.setdefault('RATE_LIMIT_BURST', '1e9')
+    os.environ.setdefault('STICKER_CACHE_PATH', os.path.join(
+        tempfile.mkdtemp(prefix='gerry-bench-'), 'file_ids.json'))
+    from gerry_bot.app import create_app
+
+    app = create_app(threaded=False)
+    # create_app ставит свой HTTP-клиент - заменяем его заглушкой
+    apihelper.CUSTOM_REQUEST_SENDER = FakeTelegramApi()
+    return app
+
+
+def handler_benchmarks() -> List:
+    """Бенчмарки обработчиков бота: (имя, функция, количество вызовов)."""
+    app = load_bot_app()
+    bot = app.bot
+    app.password_pool.fill()
+
+    start = message_update(1, '/start')
+    automatic = callback_update(2, 'auto_gen')
+    custom_dialog = (callback_update(3, 'custom_gen'),
+                     message_update(4, '20'),
+                     message_update(5, 'kadabra'))
+    ok_selection = callback_update(6, 'ok_selection')
+    other_text = message_update(7, 'hello')
+
+    def run_custom_dialog():
+        for update in custom_dialog:
+            bot.process_new_updates([update])
+
+    return [
+        ('handler.start_message',
+         lambda: bot.process_new_updates([start]), 2000),
+        ('handler.callback_automatic_password_generation',
+         lambda: bot.process_new_updates([automatic]), 2000),
+        ('handler.custom_dialog[length=20]', run_custom_dialog, 1000),
+        ('handler.callback_user_decision_is_ok',
+         lambda: bot.process_new_updates([ok_selection]), 2000),
+        ('handler.process_all_messages_from_user',
+         lambda: bot.process_new_updates([other_text]), 2000),
+    ]
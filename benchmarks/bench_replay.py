@@ -0,0 +1,413 @@
+import collections
+import json
+import os
+import random
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOT_TOKEN = '123456:replay'
+
+# последовательности кастомного диалога (не длиннее 8 символов)
+USER_SEQUENCES = ('kadabra', 'bmw', 'tesla3', 'gerry', 'audi80')
+# ожидание getUpdates без новых Update, секунды (ограничивает остановку)
+MAX_LONG_POLL = 0.5
+# чаты прогрева до начала замера: запуск процессов и импорт не входят
+# в задержки
+WARMUP_CHATS = 50
+
+_MULTIPART_CHAT_ID = re.compile(rb'name="chat_id"\r\n\r\n(-?\d+)\r\n')
+
+
+class Step(NamedTuple):
+    """
+    Шаг диалога одного чата.
+
+    Attributes:
+        kind (str): 'command', 'callback' или 'text'.
+        value (str): Текст сообщения или callback_data.
+        replies (int): Сколько запросов к Bot API для этого чата
+            отправляет бот в ответ на шаг.
+    """
+    kind: str
+    value: str
+    replies: int
+
+
+START = Step('command', '/start', 3)
+AUTOMATIC = Step('callback', 'auto_gen', 1)
+CUSTOM = Step('callback', 'custom_gen', 1)
+OK = Step('callback', 'ok_selection', 2)
+STRAY = Step('text', 'hello', 1)
+
+
+def dialog_steps(rng: random.Random) -> List[Step]:
+    """
+    Случайный сценарий одного чата: автоматический пароль (иногда с
+    повтором), кастомный диалог или случайное сообщение до /start.
+    """
+    scenario = rng.random()
+    steps = [START]
+    if scenario < 0.1:
+        steps.insert(0, STRAY)
+    if scenario < 0.55:
+        steps.append(AUTOMATIC)
+        if rng.random() < 0.3:
+            steps.append(AUTOMATIC)
+    else:
+        sequence = rng.choice(USER_SEQUENCES)
+        steps += [CUSTOM,
+                  Step('text', str(rng.randint(max(8, len(sequence)), 32)),
+                       1),
+                  Step('text', sequence, 1)]
+    steps.append(OK)
+    return steps
+
+
+def update_json(update_id: int, chat_id: int, step: Step) -> Dict:
+    """Update шага в формате JSON Bot API."""
+    chat = {'id': chat_id, 'type': 'private', 'first_name': 'Gerry'}
+    user = {'id': chat_id, 'is_bot': False, 'first_name': 'Gerry'}
+    if step.kind == 'callback':
+        return {'update_id': update_id, 'callback_query': {
+            'id': str(update_id), 'chat_instance': 'replay',
+            'data': step.value, 'from': user,
+            'message': {'message_id': update_id, 'date': 0, 'chat': chat,
+                        'text': 'replay'}}}
+    message = {'message_id': update_id, 'date': 0, 'chat': chat,
+               'from': user, 'text': step.value}
+    if step.kind == 'command':
+        message['entities'] = [{'type': 'bot_command', 'offset': 0,
+                                'length': len(step.value)}]
+    return {'update_id': update_id, 'message': message}
+
+
+class _Chat:
+    __slots__ = ('chat_id', 'steps', 'index', 'remaining', 'released_at')
+
+    def __init__(self, chat_id: int, steps: List[Step]) -> None:
+        self.chat_id = chat_id
+        self.steps = steps
+        self.index = 0
+        self.remaining = 0
+        self.released_at = 0.0
+
+
+class ReplayState:
+    """
+    Очередь Update и учет ответов бота.
+
+    Чат ведет себя как пользователь: следующий шаг отправляется, когда
+    бот ответил на предыдущий всеми запросами шага. Одновременно активны
+    не больше concurrency чатов. Задержка шага - от появления Update в
+    getUpdates до последнего ответа бота на него.
+
+    Args:
+        concurrency (int): Количество одновременно активных чатов.
+    """
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self.latencies: List[float] = list()
+        self.calls = collections.Counter()
+        self.unexpected = 0
+        self.finished = threading.Event()
+        self.polled = threading.Event()
+        self._condition = threading.Condition()
+        self._updates = collections.deque()
+        self._next_update_id = 1
+        self._chats: Dict[int, _Chat] = dict()
+        self._waiting = collections.deque()
+        self._active = 0
+
+    def run(self, dialogs: Dict[int, List[Step]]) -> None:
+        """Начать сценарии чатов (предыдущие замеры сбрасываются)."""
+        with self._condition:
+            self.latencies = list()
+            self.finished.clear()
+            self._chats = {chat_id: _Chat(chat_id, steps)
+                           for chat_id, steps in dialogs.items()}
+            self._waiting = collections.deque(self._chats.values())
+            self._active = 0
+            if not self._waiting:
+                self.finished.set()
+            while self._waiting and self._active < self.concurrency:
+                self._start_next()
+
+    def get_updates(self, offset: Optional[int], limit: int,
+                    timeout: float) -> List[Dict]:
+        """Update для getUpdates: подтвержденные offset удаляются."""
+        self.polled.set()
+        with self._condition:
+            if offset is not None:
+                while self._updates and self._updates[0][0] < offset:
+                    self._updates.popleft()
+            if not self._updates and timeout > 0:
+                self._condition.wait(min(timeout, MAX_LONG_POLL))
+            return [update for _, update in
+                    list(self._updates)[:max(1, min(limit, 100))]]
+
+    def reply(self, method: str, chat_id: Optional[int]) -> None:
+        """Учесть запрос бота к Bot API."""
+        now = time.perf_counter()
+        with self._condition:
+            self.calls[method] += 1
+            chat = self._chats.get(chat_id)
+            if chat is None or chat.remaining <= 0:
+                self.unexpected += 1
+                return
+            chat.remaining -= 1
+            if chat.remaining:
+                return
+            self.latencies.append(now - chat.released_at)
+            chat.index += 1
+            if chat.index < len(chat.steps):
+                self._release(chat)
+                return
+            self._active -= 1
+            if self._waiting:
+                self._start_next()
+            elif not self._active:
+                self.finished.set()
+
+    def _start_next(self) -> None:
+        self._active += 1
+        self._release(self._waiting.popleft())
+
+    def _release(self, chat: _Chat) -> None:
+        step = chat.steps[chat.index]
+        chat.remaining = step.replies
+        chat.released_at = time.perf_counter()
+        self._updates.append((self._next_update_id, update_json(
+            self._next_update_id, chat.chat_id, step)))
+        self._next_update_id += 1
+        self._condition.notify_all()
+
+
+class _BotApiHandler(BaseHTTPRequestHandler):
+    """Запросы /bot<token>/<method> к заглушке Bot API."""
+
+    protocol_version = 'HTTP/1.1'
+    # заголовки и тело уходят отдельными пакетами: без TCP_NODELAY
+    # каждый ответ ждет задержанного ACK клиента (~40 мс)
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self._handle()
+
+    def do_POST(self) -> None:
+        self._handle()
+
+    def log_message(self, format: str, *args) -> None:
+        """Не писать каждый запрос в stderr."""
+
+    def _handle(self) -> None:
+        url = urlsplit(self.path)
+        method = url.path.rsplit('/', 1)[-1]
+        params = {name: values[0]
+                  for name, values in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/x-www-form-urlencoded'):
+            params.update((name, values[0]) for name, values in parse_qs(
+                body.decode('utf-8')).items())
+        elif content_type.startswith('application/json') and body:
+            params.update(json.loads(body))
+        elif 'chat_id' not in params:
+            match = _MULTIPART_CHAT_ID.search(body)
+            if match:
+                params['chat_id'] = match.group(1).decode('ascii')
+        self._respond(self.server.state, method, params)
+
+    def _respond(self, state: ReplayState, method: str,
+                 params: Dict) -> None:
+        if method == 'getUpdates':
+            offset = params.get('offset')
+            result = state.get_updates(
+                int(offset) if offset is not None else None,
+                int(params.get('limit', 100)),
+                float(params.get('timeout', 0)))
+        elif method == 'getMe':
+            result = {'id': 123456, 'is_bot': True, 'first_name': 'Replay',
+                      'username': 'replay_bot'}
+        elif 'chat_id' in params:
+            chat_id = int(params['chat_id'])
+            state.reply(method, chat_id)
+            result = {'message_id': 1, 'date': 0,
+                      'chat': {'id': chat_id, 'type': 'private'},
+                      'text': params.get('text', '')}
+            if method == 'sendSticker':
+                result['sticker'] = {
+                    'file_id': 'replay-sticker', 'file_unique_id': 'replay',
+                    'width': 512, 'height': 512, 'is_animated': True}
+        else:
+            state.reply(method, None)
+            result = True
+        payload = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeBotApiServer(ThreadingHTTPServer):
+    """
+    Локальная заглушка Bot API: getUpdates, sendMessage,
+    editMessageText, sendSticker и остальные методы с ответом ok.
+
+    Args:
+        state (ReplayState): Очередь Update и учет ответов.
+        address (Tuple[str, int]) = ('127.0.0.1', 0): Адрес сервера,
+            порт 0 - любой свободный.
+    """
+    daemon_threads = True
+
+    def __init__(self, state: ReplayState,
+                 address: Tuple[str, int] = ('127.0.0.1', 0)) -> None:
+        super().__init__(address, _BotApiHandler)
+        self.state = state
+
+    def handle_error(self, request, client_address) -> None:
+        """Разрывы соединений при остановке бота - не ошибка."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def api_url(self) -> str:
+        """Шаблон адреса для TELEGRAM_API_URL."""
+        return 'http://{0}:{1}/bot{{0}}/{{1}}'.format(*self.server_address)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Перцентиль с линейной интерполяцией (values не пустой)."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (
+        position - lower)
+
+
+def bot_environment(api_url: str, directory: str) -> Dict[str, str]:
+    """Окружение main.py: заглушка Bot API, без ограничений частоты."""
+    environment = dict(os.environ)
+    environment.update({
+        'BOT_TOKEN': BOT_TOKEN,
+        'TELEGRAM_API_URL': api_url,
+        'LOG_PATH': os.path.join(directory, 'bot.log'),
+        'LOG_LEVEL': 'WARNING',
+        'STICKER_CACHE_PATH': os.path.join(directory, 'file_ids.json'),
+        'RATE_LIMIT_RATE': '1000000',
+        'RATE_LIMIT_BURST': '1000000',
+        'METRICS_ENABLED': 'false',
+        'ANALYTICS_ENABLED': 'false',
+        'PASSWORD_DEDUP_PATH': '',
+        'DIALOG_STORE': 'memory',
+    })
+    return environment
+
+
+def _wait_finished(state: ReplayState, process: subprocess.Popen,
+                   deadline: float, stderr) -> None:
+    """Дождаться ответов на все шаги, пока бот работает."""
+    while not state.finished.wait(MAX_LONG_POLL):
+        if process.poll() is None and time.monotonic() < deadline:
+            continue
+        stderr.seek(0)
+        output = stderr.read()[-2000:].decode('utf-8', 'replace')
+        raise RuntimeError('Бот не ответил на все Update (код {0}):\n'
+                           '{1}'.format(process.returncode, output))
+
+
+def replay_load_test(mode: str = 'polling', chats: int = 1000,
+                     concurrency: int = 100, seed: int = 0,
+                     timeout: float = 600) -> Dict:
+    """
+    Запустить main.py против заглушки Bot API и проиграть диалоги chats
+    чатов.
+
+    Args:
+        mode (str) = 'polling': Режим main.py --mode (polling, async,
+            sharded).
+        chats (int) = 1000: Количество чатов.
+        concurrency (int) = 100: Одновременно активных чатов.
+        seed (int) = 0: Зерно сценариев.
+        timeout (float) = 600: Предельное время прогона, секунды.
+
+    Raises:
+        RuntimeError: Если бот не запустился или не ответил за timeout.
+
+    Returns:
+        Dict: Результат в формате benchmarks.runner (best - среднее время
+            на Update) и p50/p95/p99 задержки ответа, секунды.
+    """
+    rng = random.Random(seed)
+    dialogs = {chat_id: dialog_steps(rng) for chat_id in range(1, chats + 1)}
+    state = ReplayState(concurrency)
+    server = FakeBotApiServer(state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with tempfile.TemporaryDirectory() as directory, \
+            open(os.path.join(directory, 'stderr.log'), 'w+b') as stderr:
+        process = subprocess.Popen(
+            [sys.executable, 'main.py', '--mode', mode], cwd=PROJECT_DIR,
+            env=bot_environment(server.api_url, directory),
+            stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            deadline = time.monotonic() + timeout
+            state.run({-chat_id: [STRAY] for chat_id in
+                       range(1, min(WARMUP_CHATS, chats) + 1)})
+            _wait_finished(state, process, deadline, stderr)
+            started = time.perf_counter()
+            state.run(dialogs)
+            _wait_finished(state, process, deadline, stderr)
+            elapsed = time.perf_counter() - started
+        finally:
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            server.shutdown()
+            server.server_close()
+
+    latencies = state.latencies
+    return {
+        'name': 'replay.{0}[chats={1},concurrency={2}]'.format(
+            mode, chats, concurrency),
+        'number': len(latencies),
+        'repeat': 1,
+        'best': elapsed / len(latencies),
+        'mean': statistics.mean(latencies),
+        'ops_per_second': len(latencies) / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'unexpected_calls': state.unexpected,
+    }
+
+
+def replay_suite(modes: List[str], chats: int = 1000,
+                 concurrency: int = 100, scale: float = 1.0) -> List[Dict]:
+    """Нагрузочный прогон main.py в нескольких режимах с выводом итогов."""
+    results = list()
+    for mode in modes:
+        result = replay_load_test(mode, max(1, int(chats * scale)),
+                                  concurrency)
+        print('{0:<48} {1:>8.0f} upd/s  p50 {2:>7.2f} ms  p95 {3:>7.2f} ms'
+              '  p99 {4:>7.2f} ms'.format(
+                  result['name'], result['ops_per_second'],
+                  result['p50'] * 1000, result['p95'] * 1000,
+                  result['p99'] * 1000))
+        results.append(result)
+    return results
@@ -0,0 +1,120 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+from gerry_bot.sharding import ShardSupervisor
+
+from .bench_handlers import load_bot_app
+
+
+# getUpdates отдает не больше 100 Update за запрос
+UPDATES_PER_REQUEST = 100
+
+
+def load_worker_bot():
+    """Бот с заглушкой Bot API для процесса-обработчика."""
+    app = load_bot_app()
+    app.start()
+    return app.bot
+
+
+def custom_dialog_updates(chats: int, password_length: int = 20,
+                          first_update_id: int = 1) -> List[Dict]:
+    """
+    Update кастомного диалога для chats чатов в формате JSON Bot API.
+
+    Шаги диалога идут по очереди для всех чатов, как от одновременно
+    работающих пользователей.
+    """
+    updates = list()
+    update_id = first_update_id
+    steps = ('custom_gen', str(password_length), 'kadabra')
+    for step_index, step in enumerate(steps):
+        for chat_id in range(1, chats + 1):
+            chat = {'id': chat_id, 'type': 'private', 'first_name': 'Gerry'}
+            user = {'id': chat_id, 'is_bot': False, 'first_name': 'Gerry'}
+            if step_index == 0:
+                updates.append({'update_id': update_id, 'callback_query': {
+                    'id': str(update_id), 'chat_instance': 'bench',
+                    'data': step, 'from': user,
+                    'message': {'message_id': 1, 'date': 0, 'chat': chat,
+                                'text': 'bench'}}})
+            else:
+                updates.append({'update_id': update_id, 'message': {
+                    'message_id': update_id, 'date': 0, 'chat': chat,
+                    'from': user, 'text': step}})
+            update_id += 1
+    return updates
+
+
+def run_load_test(workers: int, updates: List[Dict],
+                  timeout: float = 600) -> Dict:
+    """
+    Пропустить Update через ShardSupervisor и замерить пропускную способность.
+
+    Время запуска процессов (создание бота) в замер не входит.
+
+    Returns:
+        Dict: Результат в формате benchmarks.runner: best - время на
+            один Update, ops_per_second - Update в секунду.
+    """
+    supervisor = ShardSupervisor(load_worker_bot, workers)
+    supervisor.start()
+    try:
+        # прогрев: каждый процесс получает хотя бы один Update
+        supervisor.dispatch(custom_dialog_updates(workers))
+        if not supervisor.wait_processed(timeout):
+            raise RuntimeError('Процессы не запустились за {0} с'.format(
+                timeout))
+        started = time.perf_counter()
+        for offset in range(0, len(updates), UPDATES_PER_REQUEST):
+            supervisor.dispatch(updates[offset:offset + UPDATES_PER_REQUEST])
+        if not supervisor.wait_processed(timeout):
+            raise RuntimeError('Update не обработаны за {0} с'.format(
+                timeout))
+        elapsed = time.perf_counter() - started
+    finally:
+        supervisor.stop()
+    return {
+        'name': 'sharding.custom_dialog[workers={0}]'.format(workers),
+        'number': len(updates),
+        'repeat': 1,
+        'best': elapsed / len(updates),
+        'mean': elapsed / len(updates),
+        'ops_per_second': len(updates) / elapsed,
+    }
+
+
+def sharding_load_test(worker_counts: Optional[List[int]] = None,
+                       chats: int = 2000,
+                       scale: float = 1.0) -> List[Dict]:
+    """
+    Нагрузочный тест sharded-режима для разного числа процессов.
+
+    Args:
+        worker_counts (List[int]) = None: Количества процессов, по
+            умолчанию 1, 2, 4, ... до числа ядер.
+        chats (int) = 2000: Количество чатов (по 3 Update на чат).
+        scale (float) = 1.0: Множитель количества чатов.
+
+    Returns:
+        List[Dict]: Результаты с ускорением относительно первого прогона.
+    """
+    if not worker_counts:
+        cores = os.cpu_count() or 1
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cores:
+            worker_counts.append(worker_counts[-1] * 2)
+        if worker_counts[-1] != cores:
+            worker_counts.append(cores)
+    updates = custom_dialog_updates(max(1, int(chats * scale)))
+    results = list()
+    for workers in worker_counts:
+        result = run_load_test(workers, updates)
+        result['speedup'] = result['ops_per_second'] \
+            / (results[0]['ops_per_second'] if results
+               else result['ops_per_second'])
+        print('{0:<60} {1:>10.0f} upd/s {2:>6.2f}x'.format(
+            result['name'], result['ops_per_second'], result['speedup']))
+        results.append(result)
+    return results
@@ -0,0 +1,100 @@
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List
+
+
+def run_benchmark(name: str, function: Callable, number: int,
+                  repeat: int = 5) -> Dict:
+    """
+    Замерить время вызова функции через timeit.
+
+    Args:
+        name (str): Имя бенчмарка.
+        function (Callable): Функция без аргументов.
+        number (int): Количество вызовов в одном замере.
+        repeat (int) = 5: Количество замеров.
+
+    Returns:
+        Dict: Результат: лучшее и среднее время одного вызова в секундах,
+            количество вызовов в секунду.
+    """
+    timings = [timing / number for timing in
+               timeit.Timer(function).repeat(repeat=repeat, number=number)]
+    best = min(timings)
+    return {
+        'name': name,
+        'number': number,
+        'repeat': repeat,
+        'best': best,
+        'mean': statistics.mean(timings),
+        'ops_per_second': 1 / best if best else None,
+    }
+
+
+def run_suite(benchmarks: List, scale: float = 1.0) -> List[Dict]:
+    """
+    Выполнить список бенчмарков.
+
+    Args:
+        benchmarks (List): Кортежи (имя, функция, количество вызовов).
+        scale (float) = 1.0: Множитель количества вызовов (для быстрых
+            прогонов меньше 1).
+
+    Returns:
+        List[Dict]: Результаты run_benchmark.
+    """
+    results = list()
+    for name, function, number in benchmarks:
+        result = run_benchmark(name, function, max(1, int(number * scale)))
+        print('{0:<60} {1:>12.3f} us'.format(name, result['best'] * 1e6))
+        results.append(result)
+    return results
+
+
+def save_results(results: List[Dict], path: str) -> None:
+    """Записать результаты и окружение прогона в JSON-файл."""
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version,
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(path, mode='w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, ensure_ascii=False, indent=2)
+
+
+def load_results(path: str) -> List[Dict]:
+    """Прочитать результаты из JSON-файла."""
+    with open(path, encoding='utf-8') as report_file:
+        return json.load(report_file)['results']
+
+
+def compare_results(baseline: List[Dict], current: List[Dict]) -> List[Dict]:
+    """
+    Сравнить два прогона по лучшему времени.
+
+    Args:
+        baseline (List[Dict]): Результаты прошлого прогона.
+        current (List[Dict]): Результаты текущего прогона.
+
+    Returns:
+        List[Dict]: Для общих бенчмарков - время до/после и ускорение
+            (speedup > 1 - стало быстрее).
+    """
+    baseline_by_name = {result['name']: result for result in baseline}
+    comparison = list()
+    for result in current:
+        previous = baseline_by_name.get(result['name'])
+        if previous is None:
+            continue
+        comparison.append({
+            'name': result['name'],
+            'baseline': previous['best'],
+            'current': result['best'],
+            'speedup': previous['best'] / result['best'],
+        })
+    return comparison
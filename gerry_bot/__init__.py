@@ -0,0 +1,37 @@
+import importlib
+
+
+# публичные имена пакета и модули, из которых они импортируются при
+# первом обращении: import gerry_bot не загружает telebot, requests и
+# sqlite3
+_EXPORTS = {
+    'MemoryDialogStore': 'dialogs',
+    'SQLiteDialogStore': 'dialogs',
+    'create_dialog_store': 'dialogs',
+    'StickerCache': 'stickers',
+    'WebhookServer': 'webhook',
+    'serve_webhook': 'webhook',
+    'CircuitBreaker': 'telegram_client',
+    'CircuitOpenError': 'telegram_client',
+    'TelegramHttpClient': 'telegram_client',
+    'install_telegram_client': 'telegram_client',
+    'ShardSupervisor': 'sharding',
+    'run_sharded': 'sharding',
+    'EventRecorder': 'analytics',
+    'GenerationEvent': 'analytics',
+    'SQLiteEventStore': 'analytics',
+    'Profiler': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Импортировать публичное имя из его модуля при первом обращении."""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(
+            "module 'gerry_bot' has no attribute '{0}'".format(name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
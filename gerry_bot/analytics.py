@@ -0,0 +1,258 @@
+import collections
+import contextlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from loguru import logger
+
+
+# режимы генерации
+AUTOMATIC_MODE = 'automatic'
+CUSTOM_MODE = 'custom'
+# автоматический пароль берется из пула PasswordPool
+AUTOMATIC_BRANCH = 'pool'
+
+
+class GenerationEvent(NamedTuple):
+    """
+    Событие генерации пароля. Пароль и последовательность пользователя
+    не записываются.
+
+    Attributes:
+        created_at (float): Время события, unix time.
+        mode (str): Режим генерации: 'automatic' или 'custom'.
+        password_length (Optional[int]): Длина пароля.
+        branch (Optional[str]): Ветка генерации (для кастомного пароля -
+            CustomGenerationPassword.find_branch, для автоматического -
+            'pool').
+        latency (float): Время генерации ответа в секундах.
+        error (Optional[str]): Код ошибки проверки данных или имя
+            исключения.
+    """
+    created_at: float
+    mode: str
+    password_length: Optional[int]
+    branch: Optional[str]
+    latency: float
+    error: Optional[str]
+
+
+class SQLiteEventStore:
+    """
+    Хранилище событий генерации в SQLite.
+
+    События пишутся пакетами через executemany в одной транзакции. Файл
+    может использоваться несколькими процессами бота (WAL), дашборды
+    читают таблицу generation_events обычным SQL.
+
+    Args:
+        path (str): Путь к файлу базы.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # пишет фоновый поток, последний сброс - поток остановки
+        self._connection = sqlite3.connect(path, timeout=5,
+                                           check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS generation_events ('
+                'id INTEGER PRIMARY KEY, '
+                'created_at REAL NOT NULL, '
+                'mode TEXT NOT NULL, '
+                'password_length INTEGER, '
+                'branch TEXT, '
+                'latency REAL NOT NULL, '
+                'error TEXT)')
+            self._connection.execute(
+                'CREATE INDEX IF NOT EXISTS generation_events_created_at '
+                'ON generation_events (created_at)')
+
+    def insert_many(self, events: Iterable[GenerationEvent]) -> None:
+        """Записать события одной транзакцией."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT INTO generation_events (created_at, mode, '
+                'password_length, branch, latency, error) '
+                'VALUES (?, ?, ?, ?, ?, ?)', events)
+
+    def summary(self, since: float = 0) -> List[Dict]:
+        """
+        Сводка событий по режиму, ветке и ошибке.
+
+        Args:
+            since (float) = 0: Учитывать события не раньше этого времени.
+
+        Returns:
+            List[Dict]: mode, branch, error, count, mean_latency,
+                max_latency.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT mode, branch, error, COUNT(*), AVG(latency), '
+                'MAX(latency) FROM generation_events WHERE created_at >= ? '
+                'GROUP BY mode, branch, error '
+                'ORDER BY mode, branch, error', (since,)).fetchall()
+        return [{'mode': mode, 'branch': branch, 'error': error,
+                 'count': count, 'mean_latency': mean_latency,
+                 'max_latency': max_latency}
+                for mode, branch, error, count, mean_latency, max_latency
+                in rows]
+
+    def close(self) -> None:
+        """Закрыть соединение с базой."""
+        with self._lock:
+            self._connection.close()
+
+
+class EventRecorder:
+    """
+    Очередь событий генерации с пакетной записью в хранилище по таймеру.
+
+    record только добавляет событие в очередь в памяти (deque, без
+    блокировок). Фоновый поток раз в flush_interval секунд или при
+    накоплении batch_size событий забирает всю очередь и записывает ее
+    одним insert_many. Пока хранилище не задано (configure), события
+    не собираются.
+
+    Args:
+        flush_interval (float) = 5: Период записи в секундах.
+        batch_size (int) = 500: Размер очереди, при котором запись
+            начинается раньше таймера.
+        max_queue (int) = 100000: Максимальный размер очереди, лишние
+            события отбрасываются (хранилище недоступно).
+    """
+    def __init__(self, flush_interval: float = 5, batch_size: int = 500,
+                 max_queue: int = 100000) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.store: Optional[SQLiteEventStore] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._events = collections.deque()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def configure(self, store: Optional[SQLiteEventStore],
+                  flush_interval: Optional[float] = None,
+                  batch_size: Optional[int] = None,
+                  max_queue: Optional[int] = None) -> None:
+        """
+        Задать хранилище (None - не собирать события) и параметры записи.
+        """
+        self.store = store
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if max_queue is not None:
+            self.max_queue = max_queue
+
+    @property
+    def enabled(self) -> bool:
+        """События собираются."""
+        return self.store is not None
+
+    def record(self, mode: str, latency: float,
+               password_length: Optional[int] = None,
+               branch: Optional[str] = None,
+               error: Optional[str] = None) -> None:
+        """Добавить событие в очередь."""
+        if self.store is None:
+            return
+        if len(self._events) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._events.append(GenerationEvent(
+            created_at=time.time(), mode=mode,
+            password_length=password_length, branch=branch,
+            latency=latency, error=error))
+        if len(self._events) >= self.batch_size:
+            self._wake.set()
+
+    @contextlib.contextmanager
+    def track(self, mode: str, password_length: Optional[int] = None):
+        """
+        Замерить генерацию и записать событие.
+
+        Внутри блока можно заполнить 'branch' и 'error' в полученном
+        словаре. Исключение записывается как error с именем его класса.
+
+        Args:
+            mode (str): Режим генерации.
+            password_length (int) = None: Длина пароля.
+        """
+        event = {'password_length': password_length, 'branch': None,
+                 'error': None}
+        started = time.perf_counter()
+        try:
+            yield event
+        except Exception as error:
+            event['error'] = type(error).__name__
+            raise
+        finally:
+            self.record(mode, time.perf_counter() - started, **event)
+
+    def flush(self) -> int:
+        """
+        Записать накопленные события.
+
+        Returns:
+            int: Количество записанных событий.
+        """
+        with self._flush_lock:
+            store = self.store
+            events = list()
+            while self._events:
+                events.append(self._events.popleft())
+            if not events or store is None:
+                return 0
+            try:
+                store.insert_many(events)
+            except sqlite3.Error as error:
+                self.failed += len(events)
+                logger.warning('Ошибка записи событий генерации - {0}', error)
+                return 0
+            self.written += len(events)
+            return len(events)
+
+    def start(self) -> None:
+        """Запустить фоновую запись (если хранилище задано)."""
+        if self.store is None or (self._worker is not None
+                                  and self._worker.is_alive()):
+            return
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._flush_loop,
+                                        name='analytics-flush', daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановить фоновую запись и записать остаток очереди."""
+        self._stopped.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика очереди: queued, written, dropped, failed."""
+        return {'queued': len(self._events), 'written': self.written,
+                'dropped': self.dropped, 'failed': self.failed}
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+# общий для процесса журнал событий, хранилище задает create_app
+recorder = EventRecorder()
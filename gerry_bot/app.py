@@ -0,0 +1,374 @@
+from typing import Any, Dict, Optional
+
+import telebot
+from loguru import logger
+from telebot import types
+
+from gerry_bot_config import get_config
+from password_generator import AutomaticPasswordGeneration, BloomFilter, \
+    PasswordPool, UniquePasswordGeneration
+from . import dialogs, replies
+from .analytics import AUTOMATIC_BRANCH, AUTOMATIC_MODE, \
+    SQLiteEventStore, recorder as analytics_recorder
+from .dialogs import create_dialog_store
+from .logging_config import configure_logging
+from .metrics import registry as metrics_registry
+from .profiling import profiler
+from .stickers import StickerCache
+from .telegram_client import CircuitBreaker, TelegramHttpClient, \
+    install_telegram_client
+from .throttling import Throttle, TokenBucketLimiter
+
+
+class GerryBot:
+    """
+    Синхронный бот на telebot.TeleBot.
+
+    Все зависимости передаются явно, обработчики регистрируются вызовом
+    register_handlers. Тексты и клавиатуры - из gerry_bot.replies (общие
+    с асинхронным runtime).
+
+    Args:
+        bot (telebot.TeleBot): Клиент Telegram.
+        password_pool (PasswordPool): Пул готовых паролей автоматической
+            генерации.
+        sticker_cache (StickerCache): Кэш telegram file_id стикеров.
+        dialog_store: Хранилище состояния кастомного диалога.
+        throttle (Throttle) = None: Ограничитель частоты запросов.
+        telegram_client (TelegramHttpClient) = None: HTTP-клиент Bot API.
+    """
+    def __init__(self, bot: telebot.TeleBot, password_pool: PasswordPool,
+                 sticker_cache: StickerCache, dialog_store,
+                 throttle: Optional[Throttle] = None,
+                 telegram_client: Optional[TelegramHttpClient] = None) -> None:
+        self.bot = bot
+        self.password_pool = password_pool
+        self.sticker_cache = sticker_cache
+        self.dialog_store = dialog_store
+        self.throttle = throttle
+        self.telegram_client = telegram_client
+        # шаги диалога вызываются напрямую, не через telebot
+        self.password_length_from_user = logger.catch(profiler.track_handler(
+            metrics_registry.track_handler(self.password_length_from_user)))
+        self.generate_custom_password_for_user = logger.catch(
+            profiler.track_handler(metrics_registry.track_handler(
+                self.generate_custom_password_for_user)))
+
+    def register_handlers(self) -> None:
+        """Зарегистрировать обработчики в порядке проверки telebot."""
+        # ограничитель снаружи: отклоненные запросы не попадают в метрики
+        # и трассы обработчиков, как и в async_runtime
+        def on_message(handler):
+            handler = profiler.track_handler(
+                metrics_registry.track_handler(handler))
+            return self.throttle.message(handler) if self.throttle \
+                else handler
+
+        def on_callback(handler):
+            handler = profiler.track_handler(
+                metrics_registry.track_handler(handler))
+            return self.throttle.callback(handler) if self.throttle \
+                else handler
+
+        self.bot.register_message_handler(on_message(self.start_message),
+                                          commands=['start'])
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_automatic_password_generation),
+            func=lambda call: call.data == 'auto_gen')
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_custom_password_generation),
+            func=lambda call: call.data == 'custom_gen')
+        self.bot.register_message_handler(
+            on_message(self.continue_custom_dialog),
+            content_types=['text'],
+            func=lambda message: self.dialog_store.get(
+                message.chat.id) is not None)
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_user_decision_is_ok),
+            func=lambda call: call.data == 'ok_selection')
+        self.bot.register_message_handler(
+            on_message(self.process_all_messages_from_user),
+            content_types=['text'])
+
+    def start(self) -> None:
+        """
+        Запустить фоновое пополнение пула паролей, запись событий и трасс
+        медленных обработчиков.
+        """
+        self.password_pool.start()
+        analytics_recorder.start()
+        profiler.start()
+
+    def stop(self) -> None:
+        """
+        Остановить пул паролей, записать оставшиеся события и закрыть
+        соединения с Telegram.
+        """
+        self.password_pool.stop(timeout=1)
+        analytics_recorder.stop(timeout=1)
+        profiler.stop(timeout=1)
+        if self.telegram_client is not None:
+            self.telegram_client.close()
+        logger.debug('Password pool stats - {0}', self.password_pool.stats())
+
+    def start_message(self, message: types.Message) -> None:
+        """Начать стартовый диалог с пользователем."""
+        # /start прерывает незавершенный кастомный диалог
+        self.dialog_store.pop(message.chat.id)
+        self._send_sticker(message.chat.id, replies.HELLO_STICKER,
+                           replies.HELLO_STICKER_FALLBACK)
+        self.bot.send_message(
+            message.chat.id,
+            replies.hello_message(message.from_user.first_name))
+        self.bot.send_message(message.chat.id, replies.BUTTONS_MESSAGE,
+                              reply_markup=replies.start_buttons())
+
+    def callback_automatic_password_generation(
+            self, call: types.CallbackQuery) -> None:
+        """Обработать автоматическую генерацию пароля."""
+        logger.debug('Выбрана автоматическая генерация пароля пользователем')
+        with metrics_registry.time('generator', 'password_pool.get'), \
+                analytics_recorder.track(AUTOMATIC_MODE) as event:
+            password = self.password_pool.get()
+            event['password_length'] = len(password)
+            event['branch'] = AUTOMATIC_BRANCH
+        text = replies.automatic_password_message(password)
+        markup = replies.user_password_answer_buttons(
+            automatic_selection=True)
+        # заменить предыдущее сообщение
+        self.bot.edit_message_text(chat_id=call.message.chat.id,
+                                   message_id=call.message.message_id,
+                                   text=text,
+                                   reply_markup=markup)
+
+    def callback_custom_password_generation(
+            self, call: types.CallbackQuery) -> None:
+        """Обработать генерацию пользовательского пароля."""
+        logger.debug('Выбрана кастомная генерация пароля пользователем')
+        self.dialog_store.set(call.message.chat.id,
+                              {'step': dialogs.WAITING_PASSWORD_LENGTH})
+        self.bot.send_message(chat_id=call.message.chat.id,
+                              text=replies.PASSWORD_LENGTH_MESSAGE)
+
+    def continue_custom_dialog(self, message: types.Message) -> None:
+        """Передать сообщение текущему шагу кастомного диалога."""
+        state = self.dialog_store.pop(message.chat.id)
+        if state is None:
+            self.process_all_messages_from_user(message)
+        elif state['step'] == dialogs.WAITING_PASSWORD_LENGTH:
+            self.password_length_from_user(message)
+        elif state['step'] == dialogs.WAITING_USER_SEQUENCE:
+            self.generate_custom_password_for_user(
+                message, state['password_length'])
+
+    def password_length_from_user(self, message: types.Message) -> None:
+        """Получить от пользователя общую длину пароля."""
+        password_length = replies.parse_password_length(message.text)
+        if password_length is None:
+            self.dialog_store.set(message.chat.id,
+                                  {'step': dialogs.WAITING_PASSWORD_LENGTH})
+            self.bot.send_message(message.chat.id,
+                                  replies.DIGITS_ONLY_MESSAGE)
+        elif password_length:
+            self.dialog_store.set(message.chat.id,
+                                  {'step': dialogs.WAITING_USER_SEQUENCE,
+                                   'password_length': password_length})
+            self.bot.send_message(chat_id=message.chat.id,
+                                  text=replies.USER_SEQUENCE_MESSAGE)
+
+    def generate_custom_password_for_user(self, message: types.Message,
+                                          password_length: int) -> None:
+        """
+        Получить общую длину пароля и последовательность от пользователя.
+
+        Args:
+            message: class Message.
+            password_length (int): Длина пароля от пользователя.
+        """
+        with metrics_registry.time('generator', 'custom_password_reply'):
+            text, markup = replies.custom_password_reply(
+                password_length=password_length,
+                user_sequence=message.text
+            )
+        self.bot.send_message(message.chat.id, text=text, reply_markup=markup)
+
+    def callback_user_decision_is_ok(self, call: types.CallbackQuery) -> None:
+        """Обработать кнопку == ok_selection."""
+        self.bot.edit_message_text(chat_id=call.message.chat.id,
+                                   message_id=call.message.message_id,
+                                   text=replies.ok_message(call.message.text),
+                                   reply_markup=None,
+                                   parse_mode='Markdown')
+        self._send_sticker(call.message.chat.id, replies.END_STICKER,
+                           replies.END_STICKER_FALLBACK)
+
+    def process_all_messages_from_user(self, message: types.Message) -> None:
+        """Обработать сообщения от пользователя и перенаправить на start."""
+        if message.text != '/start':
+            self.bot.send_message(chat_id=message.chat.id,
+                                  text=replies.REDIRECT_TO_START_MESSAGE)
+
+    def _send_sticker(self, chat_id: int, sticker_name: str,
+                      fallback: str) -> None:
+        """Отправить стикер, при ошибке - эмодзи."""
+        try:
+            self.sticker_cache.send_sticker(self.bot, chat_id, sticker_name)
+        except Exception as error_message:
+            logger.exception('Ошибка загрузки стикера "{0}" - {1}'.format(
+                                                sticker_name, error_message))
+            self.bot.send_message(chat_id, fallback)
+
+
+def configure_runtime(config: Dict[str, Any]) -> TelegramHttpClient:
+    """
+    Настроить журнал процесса и HTTP-клиент Bot API для telebot.
+
+    Достаточно супервизору sharded-режима: сам бот создается в
+    процессах-обработчиках.
+
+    Args:
+        config (Dict): Настройки gerry_bot_config.load_config.
+
+    Raises:
+        ValueError: Если не задан BOT_TOKEN.
+
+    Returns:
+        TelegramHttpClient: Установленный клиент Bot API.
+    """
+    configure_logging(path=config['LOG_PATH'],
+                      level=config['LOG_LEVEL'],
+                      serialize=config['LOG_FORMAT'] == 'json',
+                      rotation=config['LOG_ROTATION'],
+                      retention=config['LOG_RETENTION'],
+                      compression=config['LOG_COMPRESSION'],
+                      console=config['LOG_CONSOLE'])
+    if not config['BOT_TOKEN']:
+        raise ValueError('BOT_TOKEN не задан - укажите токен бота '
+                         'в окружении или в файле .env.')
+
+    telegram_client = TelegramHttpClient(
+        pool_size=config['TELEGRAM_POOL_SIZE'],
+        connect_timeout=config['TELEGRAM_CONNECT_TIMEOUT'],
+        max_retries=config['TELEGRAM_MAX_RETRIES'],
+        backoff_base=config['TELEGRAM_BACKOFF_BASE'],
+        backoff_max=config['TELEGRAM_BACKOFF_MAX'],
+        breaker=CircuitBreaker(
+            failure_threshold=config['TELEGRAM_BREAKER_THRESHOLD'],
+            cooldown=config['TELEGRAM_BREAKER_COOLDOWN']))
+    install_telegram_client(telegram_client,
+                            api_url=config['TELEGRAM_API_URL'])
+    return telegram_client
+
+
+def create_app(config: Optional[Dict[str, Any]] = None,
+               threaded: bool = True) -> GerryBot:
+    """
+    Создать бота со всеми зависимостями и зарегистрированными
+    обработчиками.
+
+    Gauge-метрики пулов и клиентов регистрируются в общем реестре по
+    имени: повторно созданный бот заменяет метрики предыдущего.
+
+    Args:
+        config (Dict) = None: Настройки gerry_bot_config.load_config,
+            по умолчанию - настройки процесса.
+        threaded (bool) = True: Выполнять обработчики в пуле потоков
+            telebot; False - в потоке process_new_updates.
+
+    Raises:
+        ValueError: Если не задан BOT_TOKEN.
+
+    Returns:
+        GerryBot: Бот, готовый к запуску.
+    """
+    if config is None:
+        config = get_config()
+    telegram_client = configure_runtime(config)
+    bot = telebot.TeleBot(token=config['BOT_TOKEN'], threaded=threaded)
+    metrics_registry.instrument_bot(bot)
+
+    generation = AutomaticPasswordGeneration(auto_gen=True)
+    if config['PASSWORD_DEDUP_PATH']:
+        generation = UniquePasswordGeneration(generation, BloomFilter(
+            config['PASSWORD_DEDUP_PATH'],
+            capacity=config['PASSWORD_DEDUP_CAPACITY'],
+            error_rate=config['PASSWORD_DEDUP_ERROR_RATE']))
+    password_pool = PasswordPool(
+        generation=generation,
+        size=config['PASSWORD_POOL_SIZE'],
+        low_water_mark=config['PASSWORD_POOL_LOW_WATER_MARK'],
+        collect_stats=config['PASSWORD_POOL_STATS'])
+
+    sticker_cache = StickerCache(stickers_dir=config['STICKERS_DIR'],
+                                 cache_path=config['STICKER_CACHE_PATH'])
+    sticker_cache.preload([replies.HELLO_STICKER, replies.END_STICKER])
+
+    dialog_store = create_dialog_store(kind=config['DIALOG_STORE'],
+                                       path=config['DIALOG_STORE_PATH'],
+                                       ttl=config['DIALOG_TTL'],
+                                       max_size=config['DIALOG_MAX_SIZE'])
+
+    if config['ANALYTICS_ENABLED']:
+        analytics_recorder.configure(
+            SQLiteEventStore(config['ANALYTICS_PATH']),
+            flush_interval=config['ANALYTICS_FLUSH_INTERVAL'],
+            batch_size=config['ANALYTICS_BATCH_SIZE'],
+            max_queue=config['ANALYTICS_MAX_QUEUE'])
+    if config['PROFILING_ENABLED']:
+        profiler.configure(
+            config['PROFILING_DIR'],
+            slow_threshold=config['PROFILING_SLOW_THRESHOLD'],
+            snapshot_duration=config['PROFILING_SNAPSHOT_DURATION'],
+            sample_interval=config['PROFILING_SAMPLE_INTERVAL'],
+            max_queue=config['PROFILING_MAX_QUEUE'])
+        profiler.install_signal_handlers()
+
+    rate_limiter = TokenBucketLimiter(rate=config['RATE_LIMIT_RATE'],
+                                      capacity=config['RATE_LIMIT_BURST'],
+                                      idle_ttl=config['RATE_LIMIT_IDLE_TTL'])
+    throttle = Throttle(rate_limiter,
+                        answer_callback=bot.answer_callback_query,
+                        send_message=bot.send_message)
+
+    app = GerryBot(bot, password_pool, sticker_cache, dialog_store,
+                   throttle, telegram_client)
+    app.register_handlers()
+
+    collectors = [('password_pool', password_pool.stats),
+                  ('telegram', telegram_client.stats),
+                  ('throttle', throttle.stats),
+                  ('analytics', analytics_recorder.stats),
+                  ('profiling', profiler.stats),
+                  ('password_dedup', generation.stats
+                   if isinstance(generation, UniquePasswordGeneration)
+                   else dict)]
+    for prefix, stats in collectors:
+        metrics_registry.add_collector(
+            lambda prefix=prefix, stats=stats: {
+                'gerry_bot_{0}_{1}'.format(prefix, name): value
+                for name, value in stats().items()}, name=prefix)
+    return app
+
+
+def shard_worker_bot() -> telebot.TeleBot:
+    """
+    Бот процесса-обработчика sharded-режима (вызывается в процессе).
+
+    Обработчики выполняются синхронно: процесс считает Update
+    обработанным после ответа, а Update одного чата не обгоняют друг
+    друга. Журнал процесса пишется в свой файл (shard_log_path), метрики
+    процесса с номером index отдаются на METRICS_PORT + 1 + index.
+    """
+    from .metrics import start_metrics_server
+    from .sharding import shard_log_path, worker_index
+
+    config = dict(get_config())
+    index = worker_index()
+    if index is not None:
+        config['LOG_PATH'] = shard_log_path(config['LOG_PATH'], index)
+    app = create_app(config, threaded=False)
+    if index is not None and config['METRICS_ENABLED']:
+        start_metrics_server(metrics_registry, config['METRICS_HOST'],
+                             config['METRICS_PORT'] + 1 + index)
+    app.start()
+    return app.bot
@@ -0,0 +1,261 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from loguru import logger
+from telebot import asyncio_helper, types
+from telebot.async_telebot import AsyncTeleBot
+
+from . import dialogs, replies
+from .analytics import AUTOMATIC_BRANCH, AUTOMATIC_MODE, \
+    recorder as analytics_recorder
+from .metrics import registry as metrics_registry
+from .profiling import profiler
+from .throttling import Throttle
+
+
+class AsyncGerryBot:
+    """
+    Асинхронный runtime бота на AsyncTeleBot.
+
+    Тексты и клавиатуры берутся из gerry_bot.replies (общие с синхронным
+    main.py), генерация кастомного пароля выполняется в пуле потоков, чтобы
+    не блокировать event loop. Обращения к хранилищу диалогов, кроме
+    MemoryDialogStore, тоже выполняются вне event loop (executor по
+    умолчанию): запрос к SQLite может ждать блокировку файла.
+
+    Args:
+        bot (AsyncTeleBot): Асинхронный клиент Telegram.
+        password_pool: Пул готовых паролей автоматической генерации.
+        sticker_cache: Кэш telegram file_id стикеров.
+        dialog_store: Хранилище состояния кастомного диалога.
+        executor (ThreadPoolExecutor): Пул потоков для генерации паролей.
+        throttle (Throttle) = None: Ограничитель частоты запросов.
+    """
+    def __init__(self, bot: AsyncTeleBot, password_pool, sticker_cache,
+                 dialog_store, executor: ThreadPoolExecutor,
+                 throttle: Throttle = None) -> None:
+        self.bot = bot
+        self.password_pool = password_pool
+        self.sticker_cache = sticker_cache
+        self.dialog_store = dialog_store
+        self.executor = executor
+        self.throttle = throttle
+
+    def register_handlers(self) -> None:
+        """Зарегистрировать обработчики в том же порядке, что и в main.py."""
+        def on_message(handler):
+            handler = profiler.track_handler(
+                metrics_registry.track_handler(handler))
+            return self.throttle.message(handler) if self.throttle \
+                else handler
+
+        def on_callback(handler):
+            handler = profiler.track_handler(
+                metrics_registry.track_handler(handler))
+            return self.throttle.callback(handler) if self.throttle \
+                else handler
+
+        self.bot.register_message_handler(on_message(self.start_message),
+                                          commands=['start'])
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_automatic_password_generation),
+            func=lambda call: call.data == 'auto_gen')
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_custom_password_generation),
+            func=lambda call: call.data == 'custom_gen')
+        self.bot.register_callback_query_handler(
+            on_callback(self.callback_user_decision_is_ok),
+            func=lambda call: call.data == 'ok_selection')
+        # фильтры telebot синхронные, поэтому состояние диалога читается
+        # в обработчике: без диалога он передает сообщение в
+        # process_all_messages_from_user
+        self.bot.register_message_handler(
+            on_message(self.continue_custom_dialog),
+            content_types=['text'])
+
+    async def start_message(self, message: types.Message) -> None:
+        """Начать стартовый диалог с пользователем."""
+        await self._dialog('pop', message.chat.id)
+        # порядок сообщений в чате важен - отправляем последовательно
+        await self._send_sticker(message.chat.id, replies.HELLO_STICKER,
+                                 replies.HELLO_STICKER_FALLBACK)
+        await self.bot.send_message(
+            message.chat.id,
+            replies.hello_message(message.from_user.first_name))
+        await self.bot.send_message(message.chat.id, replies.BUTTONS_MESSAGE,
+                                    reply_markup=replies.start_buttons())
+
+    async def callback_automatic_password_generation(
+            self, call: types.CallbackQuery) -> None:
+        """Обработать автоматическую генерацию пароля."""
+        logger.debug('Выбрана автоматическая генерация пароля пользователем')
+        loop = asyncio.get_running_loop()
+        # при промахе пул генерирует пароль на месте, оценка надежности
+        # тоже считается в пуле потоков
+        with metrics_registry.time('generator', 'password_pool.get'), \
+                analytics_recorder.track(AUTOMATIC_MODE) as event:
+            password = await loop.run_in_executor(self.executor,
+                                                  self.password_pool.get)
+            event['password_length'] = len(password)
+            event['branch'] = AUTOMATIC_BRANCH
+        text = await loop.run_in_executor(
+            self.executor, replies.automatic_password_message, password)
+        markup = replies.user_password_answer_buttons(
+            automatic_selection=True)
+        await self.bot.edit_message_text(
+            chat_id=call.message.chat.id,
+            message_id=call.message.message_id,
+            text=text,
+            reply_markup=markup)
+
+    async def callback_custom_password_generation(
+            self, call: types.CallbackQuery) -> None:
+        """Обработать генерацию пользовательского пароля."""
+        logger.debug('Выбрана кастомная генерация пароля пользователем')
+        await self._dialog('set', call.message.chat.id,
+                           {'step': dialogs.WAITING_PASSWORD_LENGTH})
+        await self.bot.send_message(chat_id=call.message.chat.id,
+                                    text=replies.PASSWORD_LENGTH_MESSAGE)
+
+    async def continue_custom_dialog(self, message: types.Message) -> None:
+        """Передать сообщение текущему шагу кастомного диалога."""
+        state = await self._dialog('pop', message.chat.id)
+        if state is None:
+            await self.process_all_messages_from_user(message)
+        elif state['step'] == dialogs.WAITING_PASSWORD_LENGTH:
+            await self.password_length_from_user(message)
+        elif state['step'] == dialogs.WAITING_USER_SEQUENCE:
+            await self.generate_custom_password_for_user(
+                message, state['password_length'])
+
+    async def password_length_from_user(self, message: types.Message) -> None:
+        """Получить от пользователя общую длину пароля."""
+        password_length = replies.parse_password_length(message.text)
+        if password_length is None:
+            await self._dialog('set', message.chat.id,
+                               {'step': dialogs.WAITING_PASSWORD_LENGTH})
+            await self.bot.send_message(message.chat.id,
+                                        replies.DIGITS_ONLY_MESSAGE)
+        elif password_length:
+            await self._dialog('set', message.chat.id,
+                               {'step': dialogs.WAITING_USER_SEQUENCE,
+                                'password_length': password_length})
+            await self.bot.send_message(chat_id=message.chat.id,
+                                        text=replies.USER_SEQUENCE_MESSAGE)
+
+    async def generate_custom_password_for_user(
+            self, message: types.Message, password_length: int) -> None:
+        """
+        Сгенерировать кастомный пароль в пуле потоков и отправить его.
+
+        Args:
+            message: class Message.
+            password_length (int): Длина пароля от пользователя.
+        """
+        loop = asyncio.get_running_loop()
+        with metrics_registry.time('generator', 'custom_password_reply'):
+            text, markup = await loop.run_in_executor(
+                self.executor, replies.custom_password_reply,
+                password_length, message.text)
+        await self.bot.send_message(message.chat.id, text=text,
+                                    reply_markup=markup)
+
+    async def callback_user_decision_is_ok(
+            self, call: types.CallbackQuery) -> None:
+        """Обработать кнопку == ok_selection."""
+        # правка сообщения и стикер независимы - отправляем одновременно
+        await asyncio.gather(
+            self.bot.edit_message_text(
+                chat_id=call.message.chat.id,
+                message_id=call.message.message_id,
+                text=replies.ok_message(call.message.text),
+                reply_markup=None,
+                parse_mode='Markdown'),
+            self._send_sticker(call.message.chat.id, replies.END_STICKER,
+                               replies.END_STICKER_FALLBACK))
+
+    async def process_all_messages_from_user(
+            self, message: types.Message) -> None:
+        """Обработать сообщения от пользователя и перенаправить на start."""
+        if message.text != '/start':
+            await self.bot.send_message(
+                chat_id=message.chat.id,
+                text=replies.REDIRECT_TO_START_MESSAGE)
+
+    async def _dialog(self, method: str, *args):
+        """
+        Вызвать метод хранилища диалогов, не блокируя event loop.
+
+        Args:
+            method (str): 'get', 'set' или 'pop'.
+            *args: Аргументы метода.
+
+        Returns:
+            Результат метода хранилища.
+        """
+        function = getattr(self.dialog_store, method)
+        if isinstance(self.dialog_store, dialogs.MemoryDialogStore):
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(function, *args))
+
+    async def _send_sticker(self, chat_id: int, sticker_name: str,
+                            fallback: str) -> None:
+        """Отправить стикер, при ошибке - эмодзи."""
+        try:
+            await self.sticker_cache.send_sticker_async(self.bot, chat_id,
+                                                        sticker_name)
+        except Exception as error_message:
+            logger.exception('Ошибка загрузки стикера "{0}" - {1}'.format(
+                                                sticker_name, error_message))
+            await self.bot.send_message(chat_id, fallback)
+
+
+def create_async_bot(token: str, password_pool, sticker_cache, dialog_store,
+                     rate_limiter, generation_workers: int,
+                     api_url: Optional[str] = None) -> AsyncGerryBot:
+    """
+    Создать асинхронный бот с зарегистрированными обработчиками.
+
+    Args:
+        token (str): Токен бота.
+        password_pool: Пул готовых паролей автоматической генерации.
+        sticker_cache: Кэш telegram file_id стикеров.
+        dialog_store: Хранилище состояния кастомного диалога.
+        rate_limiter (TokenBucketLimiter): Ограничитель частоты запросов.
+        generation_workers (int): Количество потоков генерации паролей.
+        api_url (str) = None: Шаблон адреса Bot API вида
+            'http://host:port/bot{0}/{1}' (например, локальный сервер).
+
+    Returns:
+        AsyncGerryBot: Бот, готовый к запуску polling.
+    """
+    if api_url:
+        asyncio_helper.API_URL = api_url
+    executor = ThreadPoolExecutor(max_workers=generation_workers,
+                                  thread_name_prefix='generation')
+    bot = AsyncTeleBot(token)
+    metrics_registry.instrument_bot(bot)
+    throttle = Throttle(rate_limiter,
+                        answer_callback=bot.answer_callback_query,
+                        send_message=bot.send_message)
+    gerry_bot = AsyncGerryBot(bot, password_pool, sticker_cache,
+                              dialog_store, executor, throttle)
+    gerry_bot.register_handlers()
+    return gerry_bot
+
+
+def run_async_bot(token: str, password_pool, sticker_cache, dialog_store,
+                  rate_limiter, generation_workers: int,
+                  api_url: Optional[str] = None) -> None:
+    """Запустить асинхронный бот в режиме polling."""
+    gerry_bot = create_async_bot(token, password_pool, sticker_cache,
+                                 dialog_store, rate_limiter,
+                                 generation_workers, api_url)
+    try:
+        asyncio.run(gerry_bot.bot.polling(non_stop=True, interval=0))
+    finally:
+        gerry_bot.executor.shutdown(wait=False)
@@ -0,0 +1,183 @@
+import collections
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+# шаги кастомного диалога: длина пароля -> последовательность -> пароль
+WAITING_PASSWORD_LENGTH = 'waiting_password_length'
+WAITING_USER_SEQUENCE = 'waiting_user_sequence'
+
+
+class MemoryDialogStore:
+    """
+    Хранилище состояния диалогов в памяти процесса.
+
+    Состояние живет ttl секунд, количество диалогов ограничено max_size:
+    при переполнении вытесняются самые давние. Порядок в OrderedDict
+    совпадает с порядком истечения, поэтому очистка стоит O(1) на запись.
+
+    Args:
+        ttl (float): Время жизни состояния в секундах.
+        max_size (int): Максимальное количество диалогов.
+    """
+    def __init__(self, ttl: float, max_size: int) -> None:
+        if ttl <= 0 or max_size <= 0:
+            raise ValueError('ttl и max_size должны быть больше 0.')
+        self.ttl = ttl
+        self.max_size = max_size
+        self._dialogs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chat_id: int) -> Optional[Dict]:
+        """Получить состояние диалога или None."""
+        with self._lock:
+            item = self._dialogs.get(chat_id)
+            if item is None:
+                return None
+            expires_at, state = item
+            if expires_at <= time.monotonic():
+                del self._dialogs[chat_id]
+                return None
+            return state
+
+    def set(self, chat_id: int, state: Dict) -> None:
+        """Сохранить состояние диалога."""
+        now = time.monotonic()
+        with self._lock:
+            self._dialogs[chat_id] = (now + self.ttl, state)
+            self._dialogs.move_to_end(chat_id)
+            self._evict(now)
+
+    def pop(self, chat_id: int) -> Optional[Dict]:
+        """Забрать состояние диалога (удалив его) или None."""
+        with self._lock:
+            item = self._dialogs.pop(chat_id, None)
+        if item is None or item[0] <= time.monotonic():
+            return None
+        return item[1]
+
+    def __len__(self) -> int:
+        return len(self._dialogs)
+
+    def _evict(self, now: float) -> None:
+        """Удалить истекшие и лишние диалоги с начала очереди."""
+        while self._dialogs:
+            expires_at, _ = next(iter(self._dialogs.values()))
+            if expires_at > now and len(self._dialogs) <= self.max_size:
+                break
+            self._dialogs.popitem(last=False)
+
+
+class SQLiteDialogStore:
+    """
+    Хранилище состояния диалогов в SQLite.
+
+    Файл базы может использоваться несколькими процессами бота
+    одновременно, состояние переживает перезапуск.
+
+    Args:
+        path (str): Путь к файлу базы.
+        ttl (float): Время жизни состояния в секундах.
+        purge_every (int) = 1000: Раз в сколько записей удалять истекшие
+            диалоги.
+    """
+    def __init__(self, path: str, ttl: float, purge_every: int = 1000) -> None:
+        if ttl <= 0:
+            raise ValueError('ttl должен быть больше 0.')
+        self.path = path
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._local = threading.local()
+        self._writes = 0
+        # счетчик записей общий для потоков telebot и executor
+        self._writes_lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS dialogs ('
+                'chat_id INTEGER PRIMARY KEY, '
+                'state TEXT NOT NULL, '
+                'expires_at REAL NOT NULL)')
+
+    def get(self, chat_id: int) -> Optional[Dict]:
+        """Получить состояние диалога или None."""
+        row = self._connection().execute(
+            'SELECT state FROM dialogs WHERE chat_id = ? AND expires_at > ?',
+            (chat_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, chat_id: int, state: Dict) -> None:
+        """Сохранить состояние диалога."""
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO dialogs (chat_id, state, expires_at) '
+                'VALUES (?, ?, ?)',
+                (chat_id, json.dumps(state), now + self.ttl))
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            # очистку выполняет один поток - тот, чья запись кратна
+            # purge_every
+            with self._connection() as connection:
+                connection.execute('DELETE FROM dialogs WHERE expires_at <= ?',
+                                   (now,))
+
+    def pop(self, chat_id: int) -> Optional[Dict]:
+        """Забрать состояние диалога (удалив его) или None."""
+        connection = self._connection()
+        # BEGIN IMMEDIATE - чтобы два процесса не забрали один диалог
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                'SELECT state, expires_at FROM dialogs WHERE chat_id = ?',
+                (chat_id,)).fetchone()
+            if row:
+                connection.execute('DELETE FROM dialogs WHERE chat_id = ?',
+                                   (chat_id,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def __len__(self) -> int:
+        row = self._connection().execute(
+            'SELECT COUNT(*) FROM dialogs WHERE expires_at > ?',
+            (time.time(),)).fetchone()
+        return row[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        """Соединение с базой для текущего потока."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+
+def create_dialog_store(kind: str, path: str, ttl: float, max_size: int):
+    """
+    Создать хранилище состояния диалогов.
+
+    Args:
+        kind (str): 'memory' или 'sqlite'.
+        path (str): Путь к файлу базы (для 'sqlite').
+        ttl (float): Время жизни состояния в секундах.
+        max_size (int): Максимальное количество диалогов (для 'memory').
+
+    Raises:
+        ValueError: Если указан неизвестный тип хранилища.
+    """
+    if kind == 'memory':
+        return MemoryDialogStore(ttl=ttl, max_size=max_size)
+    if kind == 'sqlite':
+        return SQLiteDialogStore(path=path, ttl=ttl)
+    raise ValueError('Неизвестный тип хранилища диалогов - {0}'.format(kind))
@@ -0,0 +1,78 @@
+from typing import Dict, List, Tuple
+
+from telebot import types
+
+
+# имена клавиатур
+START = 'start'
+AUTOMATIC_PASSWORD = 'automatic_password'
+CUSTOM_PASSWORD = 'custom_password'
+CUSTOM_RETRY = 'custom_retry'
+
+# все клавиатуры бота: строки кнопок (текст, callback_data)
+KEYBOARD_LAYOUTS: Dict[str, List[List[Tuple[str, str]]]] = {
+    START: [[('Автоматический', 'auto_gen'), ('Кастомный', 'custom_gen')]],
+    AUTOMATIC_PASSWORD: [[('OK!', 'ok_selection'),
+                          ('Повтор генерации', 'auto_gen')]],
+    CUSTOM_PASSWORD: [[('OK!', 'ok_selection'),
+                       ('Повтор генерации', 'custom_gen')]],
+    CUSTOM_RETRY: [[('Ввести данные заново', 'custom_gen')]],
+}
+
+
+class CachedKeyboard(types.InlineKeyboardMarkup):
+    """
+    Неизменяемая inline-клавиатура с заранее сериализованным JSON.
+
+    Один экземпляр используется во всех ответах, поэтому добавлять
+    кнопки после создания нельзя.
+
+    Args:
+        rows (List[List[Tuple[str, str]]]): Строки кнопок
+            (текст, callback_data).
+    """
+    def __init__(self, rows: List[List[Tuple[str, str]]]) -> None:
+        super().__init__(keyboard=[
+            [types.InlineKeyboardButton(text, callback_data=callback_data)
+             for text, callback_data in row]
+            for row in rows])
+        self._json = super().to_json()
+
+    def to_json(self) -> str:
+        """JSON клавиатуры, вычисленный при создании."""
+        return self._json
+
+    def add(self, *args, row_width=None):
+        raise TypeError('CachedKeyboard нельзя изменять.')
+
+    def row(self, *args):
+        raise TypeError('CachedKeyboard нельзя изменять.')
+
+
+class KeyboardRegistry:
+    """
+    Клавиатуры, созданные один раз при запуске.
+
+    Args:
+        layouts (Dict) = KEYBOARD_LAYOUTS: Имя клавиатуры -> строки кнопок.
+    """
+    def __init__(self, layouts: Dict[str, List[List[Tuple[str, str]]]]
+                 = KEYBOARD_LAYOUTS) -> None:
+        self._keyboards = {name: CachedKeyboard(rows)
+                           for name, rows in layouts.items()}
+
+    def get(self, name: str) -> CachedKeyboard:
+        """
+        Клавиатура по имени.
+
+        Raises:
+            KeyError: Если клавиатура не объявлена.
+        """
+        return self._keyboards[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._keyboards
+
+
+# клавиатуры процесса
+keyboards = KeyboardRegistry()
@@ -0,0 +1,50 @@
+import sys
+from typing import List
+
+from loguru import logger
+
+
+TEXT_FORMAT = ('{time:YYYY-MM-DD at HH:mm:ss} {file} (line - {line})  '
+               '{level}  {message} <- {function} ')
+
+
+def configure_logging(path: str, level: str, serialize: bool = False,
+                      rotation: str = '1 week', retention: int = 4,
+                      compression: str = 'zip',
+                      console: bool = False) -> List[int]:
+    """
+    Настроить журнал бота.
+
+    Записи ставятся в очередь (enqueue=True) и пишутся на диск фоновым
+    потоком loguru - там же выполняются ротация и сжатие, поэтому
+    дисковый ввод-вывод не задерживает ответ пользователю. Вызовы ниже
+    level отбрасываются loguru до форматирования сообщения.
+
+    Args:
+        path (str): Путь к файлу журнала.
+        level (str): Минимальный уровень ('DEBUG', 'INFO', ...).
+        serialize (bool) = False: Писать записи в формате JSON.
+        rotation (str) = '1 week': Период ротации файла.
+        retention (int) = 4: Сколько файлов хранить.
+        compression (str) = 'zip': Формат сжатия старых файлов.
+        console (bool) = False: Дублировать журнал в stderr.
+
+    Returns:
+        List[int]: Идентификаторы добавленных обработчиков loguru.
+    """
+    # стандартный обработчик loguru пишет DEBUG в stderr синхронно
+    logger.remove()
+    handler_ids = [
+        logger.add(path,
+                   format=TEXT_FORMAT,
+                   level=level,
+                   rotation=rotation,
+                   retention=retention,
+                   compression=compression,
+                   serialize=serialize,
+                   enqueue=True),
+    ]
+    if console:
+        handler_ids.append(logger.add(sys.stderr, level=level,
+                                      serialize=serialize, enqueue=True))
+    return handler_ids
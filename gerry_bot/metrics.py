@@ -0,0 +1,320 @@
+import asyncio
+import bisect
+import contextlib
+import functools
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# границы корзин гистограмм задержки, секунды
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HANDLER_CALLS = 'gerry_bot_handler_calls_total'
+HANDLER_ERRORS = 'gerry_bot_handler_errors_total'
+HANDLER_DURATION = 'gerry_bot_handler_duration_seconds'
+OPERATION_DURATION = 'gerry_bot_operation_duration_seconds'
+
+TELEGRAM_METHODS = ('send_message', 'edit_message_text', 'send_sticker',
+                    'answer_callback_query')
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами в формате Prometheus.
+
+    Args:
+        buckets (Iterable[float]): Верхние границы корзин.
+    """
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Добавить наблюдение."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Накопленные количества по корзинам, включая '+Inf'."""
+        bounds = [repr(bound) for bound in self.buckets] + ['+Inf']
+        cumulative = list()
+        total = 0
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class MetricsRegistry:
+    """
+    Потокобезопасный реестр счетчиков и гистограмм.
+
+    Args:
+        buckets (Iterable[float]) = DEFAULT_BUCKETS: Корзины гистограмм.
+    """
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._counters: Dict[Tuple[str, Tuple], float] = dict()
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = dict()
+        self._descriptions: Dict[str, Tuple[str, str]] = dict()
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = dict()
+        self._listeners: List[Callable[[str, str, float], None]] = list()
+        self._lock = threading.Lock()
+        self.describe(HANDLER_CALLS, 'counter', 'Вызовы обработчиков.')
+        self.describe(HANDLER_ERRORS, 'counter',
+                      'Исключения в обработчиках.')
+        self.describe(HANDLER_DURATION, 'histogram',
+                      'Время выполнения обработчиков.')
+        self.describe(OPERATION_DURATION, 'histogram',
+                      'Время генерации паролей и вызовов Telegram API.')
+
+    def describe(self, name: str, metric_type: str, description: str) -> None:
+        """Задать тип и описание метрики для /metrics."""
+        self._descriptions[name] = (metric_type, description)
+
+    def inc(self, name: str, labels: Dict[str, str] = None,
+            value: float = 1) -> None:
+        """Увеличить счетчик."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float,
+                labels: Dict[str, str] = None) -> None:
+        """Добавить наблюдение в гистограмму."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Dict[str, float]],
+                      name: Optional[str] = None) -> None:
+        """
+        Добавить источник gauge-метрик, который читается при каждом /metrics.
+
+        Args:
+            collector (Callable): Функция без аргументов, возвращающая
+                словарь 'имя метрики -> значение'.
+            name (str) = None: Имя источника: источник с тем же именем
+                заменяется (например, при повторном создании бота).
+        """
+        if name is None:
+            name = 'collector-{0}'.format(id(collector))
+        self._collectors[name] = collector
+
+    def add_listener(self,
+                     listener: Callable[[str, str, float], None]) -> None:
+        """
+        Добавить получателя замеров time (например, трассировку медленных
+        обработчиков).
+
+        Args:
+            listener (Callable): Функция (operation, name, duration),
+                вызывается в потоке замера после каждого блока time.
+        """
+        self._listeners.append(listener)
+
+    @contextlib.contextmanager
+    def time(self, operation: str, name: str):
+        """
+        Замерить время блока кода как операцию.
+
+        Args:
+            operation (str): Тип операции: 'generator' или 'telegram'.
+            name (str): Имя операции, например 'send_message'.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            self.observe(OPERATION_DURATION, duration,
+                         {'operation': operation, 'name': name})
+            for listener in self._listeners:
+                listener(operation, name, duration)
+
+    def track_handler(self, function: Callable) -> Callable:
+        """
+        Декоратор: считать вызовы, ошибки и время обработчика.
+
+        Поддерживает обычные и async-функции, исключения пробрасываются
+        дальше.
+        """
+        labels = {'handler': function.__name__}
+
+        def record(started: float, failed: bool) -> None:
+            self.inc(HANDLER_CALLS, labels)
+            if failed:
+                self.inc(HANDLER_ERRORS, labels)
+            self.observe(HANDLER_DURATION, time.perf_counter() - started,
+                         labels)
+
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                failed = True
+                try:
+                    result = await function(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    record(started, failed)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                record(started, failed)
+        return wrapper
+
+    def instrument_bot(self, bot,
+                       methods: Iterable[str] = TELEGRAM_METHODS) -> None:
+        """
+        Замерять вызовы Telegram API у экземпляра бота.
+
+        Args:
+            bot: telebot.TeleBot или AsyncTeleBot.
+            methods (Iterable[str]): Имена методов бота.
+        """
+        for method_name in methods:
+            method = getattr(bot, method_name, None)
+            if method is None:
+                continue
+            setattr(bot, method_name, self._timed_method(method_name, method))
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, histogram.cumulative_counts(), histogram.sum,
+                 histogram.count)
+                for key, histogram in self._histograms.items())
+        lines = list()
+        described = set()
+
+        def header(name: str, default_type: str) -> None:
+            if name in described:
+                return
+            described.add(name)
+            metric_type, description = self._descriptions.get(
+                name, (default_type, name))
+            lines.append('# HELP {0} {1}'.format(name, description))
+            lines.append('# TYPE {0} {1}'.format(name, metric_type))
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append('{0}{1} {2}'.format(name, _labels(labels),
+                                             _number(value)))
+        for (name, labels), buckets, total, count in histograms:
+            header(name, 'histogram')
+            for bound, bucket_count in buckets:
+                lines.append('{0}_bucket{1} {2}'.format(
+                    name, _labels(labels + (('le', bound),)), bucket_count))
+            lines.append('{0}_sum{1} {2}'.format(name, _labels(labels),
+                                                 _number(total)))
+            lines.append('{0}_count{1} {2}'.format(name, _labels(labels),
+                                                   count))
+        for collector in list(self._collectors.values()):
+            for name, value in sorted(collector().items()):
+                header(name, 'gauge')
+                lines.append('{0} {1}'.format(name, _number(value)))
+        return '\n'.join(lines) + '\n'
+
+    def _timed_method(self, method_name: str, method: Callable) -> Callable:
+        """Обернуть метод бота замером времени."""
+        if asyncio.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_timed(*args, **kwargs):
+                with self.time('telegram', method_name):
+                    return await method(*args, **kwargs)
+            return async_timed
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            with self.time('telegram', method_name):
+                return method(*args, **kwargs)
+        return timed
+
+
+def _labels(labels: Tuple) -> str:
+    """Метки в формате {name="value",...}."""
+    if not labels:
+        return ''
+    return '{{{0}}}'.format(','.join(
+        '{0}="{1}"'.format(key, str(value).replace('\\', '\\\\')
+                           .replace('"', '\\"'))
+        for key, value in labels))
+
+
+def _number(value: float) -> str:
+    """Число без лишней дробной части."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Отдать метрики реестра по GET /metrics."""
+
+    def do_GET(self) -> None:
+        """Обработать GET-запрос."""
+        if self.path != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        """Не писать в журнал каждый запрос к /metrics."""
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер для /metrics.
+
+    Args:
+        registry (MetricsRegistry): Реестр метрик.
+        host (str): Адрес сервера.
+        port (int): Порт (0 - выбрать свободный).
+    """
+    daemon_threads = True
+
+    def __init__(self, registry: MetricsRegistry, host: str,
+                 port: int) -> None:
+        super().__init__((host, port), MetricsRequestHandler)
+        self.registry = registry
+
+
+def start_metrics_server(registry: MetricsRegistry, host: str,
+                         port: int) -> MetricsServer:
+    """Запустить сервер /metrics в фоновом потоке."""
+    server = MetricsServer(registry, host, port)
+    thread = threading.Thread(target=server.serve_forever,
+                              name='metrics-server', daemon=True)
+    thread.start()
+    return server
+
+
+# реестр процесса, общий для main.py и асинхронного runtime
+registry = MetricsRegistry()
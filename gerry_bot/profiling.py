@@ -0,0 +1,487 @@
+import asyncio
+import collections
+import contextvars
+import cProfile
+import functools
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from .metrics import registry as metrics_registry
+
+
+# виды снимков профиля
+SAMPLING = 'sampling'
+CPROFILE = 'cprofile'
+# ожидание выхода обработчиков из профилей в конце cProfile-снимка,
+# секунды
+CPROFILE_DRAIN_TIMEOUT = 5
+# cProfile в Python 3.12+ работает через sys.monitoring: один включенный
+# профиль видит все потоки, а второй enable() бросает ValueError
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+class _Trace:
+    """Трасса одного Update: замеры операций внутри обработчика."""
+
+    __slots__ = ('handler', 'thread', 'created_at', 'started', 'spans',
+                 'error')
+
+    def __init__(self, handler: str) -> None:
+        self.handler = handler
+        self.thread = threading.current_thread().name
+        self.created_at = time.time()
+        self.started = time.perf_counter()
+        self.spans = list()
+        self.error = None
+
+    def add(self, operation: str, name: str, duration: float) -> None:
+        """Добавить завершившуюся операцию."""
+        offset = time.perf_counter() - duration - self.started
+        self.spans.append((operation, name, offset, duration))
+
+
+# трасса обработчика текущего потока или asyncio-задачи
+_current_trace = contextvars.ContextVar('gerry_bot_trace', default=None)
+
+
+class Profiler:
+    """
+    Профилирование бота: трассы медленных обработчиков и снимки профиля
+    по запросу.
+
+    track_handler замеряет каждый обработчик; вызовы Telegram API и
+    генерация паролей (MetricsRegistry.time) попадают в трассу текущего
+    обработчика через contextvars. Трасса обработчика дольше
+    slow_threshold ставится в очередь, фоновый поток пишет ее в
+    slow-handlers-<pid>.jsonl каталога профилей. Обработчик не ждет
+    диска и не берет блокировок.
+
+    Снимки (snapshot, сигналы SIGUSR1/SIGUSR2) собираются в отдельном
+    потоке и пишутся в тот же каталог:
+
+    - sampling - выборка стеков всех потоков раз в sample_interval
+      секунд, файл в формате collapsed stacks (flamegraph.pl,
+      speedscope), учитывается и время ожидания;
+    - cprofile - cProfile синхронных обработчиков на время снимка, файл
+      pstats (python -m pstats, snakeviz); в Python 3.12+ - один профиль
+      всего процесса, обработчики не трогают cProfile.
+
+    Ошибки снимков только пишутся в лог и не доходят до обработчиков.
+
+    Пока каталог не задан (configure), обработчики вызываются без
+    замеров.
+
+    Args:
+        slow_threshold (float) = 1: Время обработчика в секундах, после
+            которого трасса записывается.
+        snapshot_duration (float) = 30: Длительность снимка, секунды.
+        sample_interval (float) = 0.005: Период выборки стеков, секунды.
+        max_queue (int) = 1000: Максимальная очередь трасс, лишние
+            отбрасываются.
+    """
+    def __init__(self, slow_threshold: float = 1,
+                 snapshot_duration: float = 30,
+                 sample_interval: float = 0.005,
+                 max_queue: int = 1000) -> None:
+        self.slow_threshold = slow_threshold
+        self.snapshot_duration = snapshot_duration
+        self.sample_interval = sample_interval
+        self.max_queue = max_queue
+        self.directory: Optional[str] = None
+        self.written = 0
+        self.dropped = 0
+        self.snapshots = 0
+        self._traces = collections.deque()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+        self._snapshot_lock = threading.Lock()
+        # cProfile-снимок: профиль на поток, счетчик вызовов под профилем
+        self._profile_lock = threading.Lock()
+        self._profiling = False
+        self._profiles: Dict[int, cProfile.Profile] = dict()
+        self._profiled_calls = 0
+        self._local = threading.local()
+
+    def configure(self, directory: Optional[str],
+                  slow_threshold: Optional[float] = None,
+                  snapshot_duration: Optional[float] = None,
+                  sample_interval: Optional[float] = None,
+                  max_queue: Optional[int] = None) -> None:
+        """
+        Задать каталог профилей (None - не профилировать) и параметры.
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        if slow_threshold is not None:
+            self.slow_threshold = slow_threshold
+        if snapshot_duration is not None:
+            self.snapshot_duration = snapshot_duration
+        if sample_interval is not None:
+            self.sample_interval = sample_interval
+        if max_queue is not None:
+            self.max_queue = max_queue
+
+    @property
+    def enabled(self) -> bool:
+        """Профилирование включено."""
+        return self.directory is not None
+
+    def track_handler(self, function: Callable) -> Callable:
+        """
+        Декоратор: трасса обработчика.
+
+        Вложенный обработчик (шаг диалога) записывается операцией
+        'handler' трассы внешнего. Поддерживает обычные и async-функции,
+        исключения пробрасываются дальше.
+        """
+        name = function.__name__
+
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if self.directory is None:
+                    return await function(*args, **kwargs)
+                outer = _current_trace.get()
+                started = time.perf_counter()
+                if outer is not None:
+                    try:
+                        return await function(*args, **kwargs)
+                    finally:
+                        outer.add('handler', name,
+                                  time.perf_counter() - started)
+                trace = _Trace(name)
+                token = _current_trace.set(trace)
+                try:
+                    return await function(*args, **kwargs)
+                except Exception as error:
+                    trace.error = type(error).__name__
+                    raise
+                finally:
+                    _current_trace.reset(token)
+                    self._finish(trace)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if self.directory is None:
+                return function(*args, **kwargs)
+            outer = _current_trace.get()
+            started = time.perf_counter()
+            if outer is not None:
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    outer.add('handler', name, time.perf_counter() - started)
+            trace = _Trace(name)
+            token = _current_trace.set(trace)
+            try:
+                if self._profiling:
+                    return self._call_profiled(function, args, kwargs)
+                return function(*args, **kwargs)
+            except Exception as error:
+                trace.error = type(error).__name__
+                raise
+            finally:
+                _current_trace.reset(token)
+                self._finish(trace)
+        return wrapper
+
+    def observe(self, operation: str, name: str, duration: float) -> None:
+        """
+        Добавить операцию в трассу текущего обработчика (получатель
+        MetricsRegistry.add_listener).
+        """
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(operation, name, duration)
+
+    def flush(self) -> int:
+        """
+        Записать трассы из очереди.
+
+        Returns:
+            int: Количество записанных трасс.
+        """
+        records = list()
+        while self._traces:
+            records.append(self._traces.popleft())
+        if not records or self.directory is None:
+            return 0
+        path = os.path.join(self.directory,
+                            'slow-handlers-{0}.jsonl'.format(os.getpid()))
+        try:
+            with open(path, 'a', encoding='utf-8') as stream:
+                for trace, duration in records:
+                    stream.write(json.dumps(
+                        _trace_record(trace, duration),
+                        ensure_ascii=False) + '\n')
+        except OSError as error:
+            self.dropped += len(records)
+            logger.warning('Ошибка записи трасс обработчиков - {0}', error)
+            return 0
+        for trace, duration in records:
+            logger.warning('Медленный обработчик {0}: {1:.3f} с',
+                           trace.handler, duration)
+        self.written += len(records)
+        return len(records)
+
+    def snapshot(self, kind: str = SAMPLING,
+                 duration: Optional[float] = None
+                 ) -> Optional[threading.Thread]:
+        """
+        Начать снимок профиля в фоновом потоке.
+
+        Одновременно выполняется один снимок. Не ждет блокировок, поэтому
+        вызывается и из обработчика сигнала.
+
+        Args:
+            kind (str) = 'sampling': Вид снимка: 'sampling' или 'cprofile'.
+            duration (float) = None: Длительность в секундах, по умолчанию
+                snapshot_duration.
+
+        Raises:
+            ValueError: Если вид снимка неизвестен.
+
+        Returns:
+            Optional[threading.Thread]: Поток снимка или None, если
+                профилирование выключено или снимок уже идет.
+        """
+        if kind not in (SAMPLING, CPROFILE):
+            raise ValueError('Неизвестный вид снимка: {0}'.format(kind))
+        if self.directory is None or not self._snapshot_lock.acquire(
+                blocking=False):
+            return None
+        thread = threading.Thread(
+            target=self._run_snapshot,
+            args=(kind, duration or self.snapshot_duration),
+            name='profiling-snapshot', daemon=True)
+        thread.start()
+        return thread
+
+    def install_signal_handlers(self) -> bool:
+        """
+        Снимки по сигналам: SIGUSR1 - sampling, SIGUSR2 - cprofile.
+
+        Returns:
+            bool: False, если сигналов нет (Windows) или вызов не из
+                главного потока.
+        """
+        if not hasattr(signal, 'SIGUSR1') \
+                or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signal.SIGUSR1,
+                      lambda signum, frame: self.snapshot(SAMPLING))
+        signal.signal(signal.SIGUSR2,
+                      lambda signum, frame: self.snapshot(CPROFILE))
+        return True
+
+    def start(self) -> None:
+        """Запустить фоновую запись трасс (если каталог задан)."""
+        if self.directory is None or (self._worker is not None
+                                      and self._worker.is_alive()):
+            return
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._flush_loop,
+                                        name='profiling-flush', daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Остановить запись и снимок, записать оставшиеся трассы."""
+        self._stopped.set()
+        self._wake.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика: queued, written, dropped трасс и snapshots."""
+        return {'queued': len(self._traces), 'written': self.written,
+                'dropped': self.dropped, 'snapshots': self.snapshots}
+
+    def _finish(self, trace: _Trace) -> None:
+        duration = time.perf_counter() - trace.started
+        if duration < self.slow_threshold:
+            return
+        if len(self._traces) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._traces.append((trace, duration))
+        self._wake.set()
+
+    def _call_profiled(self, function: Callable, args, kwargs):
+        """Вызвать обработчик под cProfile-профилем своего потока."""
+        profile = self._enable_profile()
+        if profile is None:
+            return function(*args, **kwargs)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self._disable_profile(profile)
+
+    def _enable_profile(self) -> Optional[cProfile.Profile]:
+        """
+        Включить профиль текущего потока.
+
+        Ошибки профилирования не доходят до обработчика: он вызывается
+        без профиля.
+
+        Returns:
+            Optional[cProfile.Profile]: Профиль или None - вызывать без
+                профиля (снимок закончился, вложенный вызов, ошибка).
+        """
+        if getattr(self._local, 'active', False):
+            return None
+        with self._profile_lock:
+            if not self._profiling:
+                return None
+            profile = self._profiles.get(threading.get_ident())
+            if profile is None:
+                profile = self._profiles[threading.get_ident()] = \
+                    cProfile.Profile()
+            self._profiled_calls += 1
+        try:
+            profile.enable()
+        except Exception as error:
+            # например, в процессе уже активен другой профилировщик
+            with self._profile_lock:
+                self._profiled_calls -= 1
+                self._profiling = False
+                self._profiles.pop(threading.get_ident(), None)
+            logger.warning('cProfile-снимок остановлен - {0}', error)
+            return None
+        self._local.active = True
+        return profile
+
+    def _disable_profile(self, profile: cProfile.Profile) -> None:
+        try:
+            profile.disable()
+        except Exception as error:
+            logger.warning('Ошибка выключения cProfile - {0}', error)
+        finally:
+            self._local.active = False
+            with self._profile_lock:
+                self._profiled_calls -= 1
+
+    def _run_snapshot(self, kind: str, duration: float) -> None:
+        try:
+            if kind == SAMPLING:
+                path = self._sample(duration)
+            else:
+                path = self._profile(duration)
+            self.snapshots += 1
+            logger.info('Снимок профиля ({0}) записан в {1}', kind, path)
+        except Exception as error:
+            # снимок не должен ронять процесс или обработчики
+            logger.warning('Ошибка снимка профиля ({0}) - {1}', kind, error)
+        finally:
+            self._snapshot_lock.release()
+
+    def _sample(self, duration: float) -> str:
+        """Выборка стеков всех потоков, кроме своего."""
+        own = threading.get_ident()
+        stacks = collections.Counter()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline and not self._stopped.is_set():
+            names = {thread.ident: thread.name
+                     for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = list()
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append('{0} ({1}:{2})'.format(
+                        code.co_name, os.path.basename(code.co_filename),
+                        code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+        path = self._snapshot_path(SAMPLING, 'txt')
+        with open(path, 'w', encoding='utf-8') as stream:
+            for stack, count in stacks.most_common():
+                stream.write('{0} {1}\n'.format(stack, count))
+        return path
+
+    def _profile(self, duration: float) -> str:
+        """cProfile синхронных обработчиков на duration секунд."""
+        if PROCESS_WIDE_CPROFILE:
+            return self._profile_process(duration)
+        with self._profile_lock:
+            self._profiles = dict()
+            self._profiling = True
+        self._stopped.wait(duration)
+        with self._profile_lock:
+            self._profiling = False
+        # профили читаются только после выхода обработчиков из них
+        deadline = time.monotonic() + CPROFILE_DRAIN_TIMEOUT
+        while self._profiled_calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        profiles: List[cProfile.Profile] = list(self._profiles.values())
+        if not profiles:
+            # обработчики не вызывались, а pstats не читает пустой профиль
+            profile = cProfile.Profile()
+            profile.enable()
+            profile.disable()
+            profiles.append(profile)
+        path = self._snapshot_path(CPROFILE, 'prof')
+        pstats.Stats(*profiles).dump_stats(path)
+        return path
+
+    def _profile_process(self, duration: float) -> str:
+        """Один профиль всего процесса (Python 3.12+)."""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            self._stopped.wait(duration)
+        finally:
+            profile.disable()
+        path = self._snapshot_path(CPROFILE, 'prof')
+        profile.dump_stats(path)
+        return path
+
+    def _snapshot_path(self, kind: str, extension: str) -> str:
+        return os.path.join(self.directory, '{0}-{1}-{2}.{3}'.format(
+            kind, os.getpid(), time.strftime('%Y%m%d-%H%M%S'), extension))
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+
+def _trace_record(trace: _Trace, duration: float) -> Dict:
+    """Трасса в формате записи slow-handlers-<pid>.jsonl."""
+    totals = collections.defaultdict(float)
+    for operation, _, _, span_duration in trace.spans:
+        totals[operation] += span_duration
+    return {
+        'created_at': trace.created_at,
+        'pid': os.getpid(),
+        'thread': trace.thread,
+        'handler': trace.handler,
+        'duration': duration,
+        'error': trace.error,
+        'totals': dict(totals),
+        'spans': [{'operation': operation, 'name': name, 'offset': offset,
+                   'duration': span_duration}
+                  for operation, name, offset, span_duration in trace.spans],
+    }
+
+
+# общий для процесса профилировщик, каталог задает create_app
+profiler = Profiler()
+# замеры Telegram API и генерации попадают в трассу текущего обработчика
+metrics_registry.add_listener(profiler.observe)
@@ -0,0 +1,153 @@
+from typing import Optional, Tuple
+
+from loguru import logger
+from telebot import types
+
+from password_generator import CustomGenerationPassword, \
+    PasswordStrength, PasswordValidationError, score_password
+from password_generator.strength import AUTOMATIC_KEYSPACE_BITS, \
+    custom_keyspace_bits
+from .analytics import CUSTOM_MODE, recorder as analytics_recorder
+from .keyboards import AUTOMATIC_PASSWORD, CUSTOM_PASSWORD, CUSTOM_RETRY, \
+    START, keyboards
+
+
+HELLO_STICKER = 'HelloAnimatedSticker.tgs'
+HELLO_STICKER_FALLBACK = '👋'
+END_STICKER = 'EndAnimatedSticker.tgs'
+END_STICKER_FALLBACK = '😎'
+
+BUTTONS_MESSAGE = 'Выберите и нажмите на более предпочтительный'
+PASSWORD_LENGTH_MESSAGE = ('Введите введите общую длину пароля от 8 до 32 '
+                           '(включительно).')
+DIGITS_ONLY_MESSAGE = 'Введите пожалуйста цифрами.'
+USER_SEQUENCE_MESSAGE = ('Введите последовательность не превышающую'
+                         ' общую длину пароля.\n'
+                         'Например - (любимый бренд или марка вашего авто)\n\n'
+                         'Пароль должен содержать латинские буквы и/или '
+                         'цифры.')
+REDIRECT_TO_START_MESSAGE = 'Для генерации пароля введите - /start'
+
+
+def hello_message(first_name: str) -> str:
+    """Приветствие для стартового диалога."""
+    return 'Hello, {0}\nМеня зовут Gerry Password.\n\n' \
+           'Я подберу для вас пароль!\n' \
+           'В автоматическом или кастомном режиме.'.format(first_name)
+
+
+def start_buttons() -> types.InlineKeyboardMarkup:
+    """Клавиатура выбора режима генерации."""
+    return keyboards.get(START)
+
+
+def password_message(password: str,
+                     strength: Optional[PasswordStrength] = None) -> str:
+    """
+    Сообщение с готовым паролем.
+
+    Args:
+        password (str): Пароль.
+        strength (PasswordStrength) = None: Оценка надежности, если
+            передана - добавляется под паролем.
+
+    Returns:
+        str: Текст сообщения.
+    """
+    text = 'Ваш пароль:\n\n{0}'.format(password)
+    if strength is not None:
+        text += '\n\nНадежность: {0}, ≈{1:.0f} бит'.format(strength.label,
+                                                          strength.bits)
+    return text
+
+
+def automatic_password_message(password: str) -> str:
+    """Сообщение с автоматическим паролем и его оценкой надежности."""
+    return password_message(password, score_password(
+        password, keyspace_bits=AUTOMATIC_KEYSPACE_BITS))
+
+
+def ok_message(text: str) -> str:
+    """Сообщение после нажатия кнопки 'OK!'."""
+    return '*{0}*\n\nКлассный выбор!'.format(text)
+
+
+def user_password_answer_buttons(
+        automatic_selection: bool = False,
+        custom_selection: bool = False) -> 'types.InlineKeyboardMarkup':
+    """
+    Клавиатура с кнопками: 'OK' и 'Повтор генерации'.
+    Кнопка 'Повтор генерации':
+        меняется callback_data в зависимости от выбора:
+        auto = True или custom = True
+
+    Args:
+        automatic_selection (bool) = False: Если = True - кнопки
+            для автоматической генерации пароля.
+        custom_selection (bool) = False: Если = True - кнопки
+            для кастомной генерации пароля.
+
+    Returns:
+         Класс 'InlineKeyboardMarkup' с 2-мя кнопками (общий для всех
+         ответов, изменять нельзя).
+    """
+    if automatic_selection:
+        return keyboards.get(AUTOMATIC_PASSWORD)
+    if custom_selection:
+        return keyboards.get(CUSTOM_PASSWORD)
+    return types.InlineKeyboardMarkup()
+
+
+def parse_password_length(text: str) -> Optional[int]:
+    """
+    Получить общую длину пароля из сообщения пользователя.
+
+    Args:
+        text (str): Текст сообщения.
+
+    Returns:
+        Optional[int]: Длина пароля или None, если введены не цифры.
+    """
+    try:
+        return int(text)
+    except (TypeError, ValueError) as error_message:
+        logger.warning('Ошибка ввода от пользователя - {0}', error_message)
+        return None
+
+
+def custom_password_reply(
+        password_length: int,
+        user_sequence: str) -> Tuple[str, types.InlineKeyboardMarkup]:
+    """
+    Сгенерировать кастомный пароль и ответ пользователю.
+
+    Args:
+        password_length (int): Длина пароля от пользователя.
+        user_sequence (str): Последовательность от пользователя.
+
+    Returns:
+        Tuple[str, InlineKeyboardMarkup]: Текст ответа и клавиатура:
+            пароль с кнопками 'OK'/'Повтор генерации' или текст ошибки
+            с кнопкой 'Ввести данные заново'.
+    """
+    # последовательность - часть пароля, в лог не пишется
+    logger.info('Введенная длина - "{0}" от пользователя', password_length)
+    generation = CustomGenerationPassword(
+        password_length=password_length,
+        user_sequence=user_sequence
+    )
+    with analytics_recorder.track(CUSTOM_MODE, password_length) as event:
+        try:
+            ready_password = generation.generate_password()
+        except PasswordValidationError as error:
+            # текст ошибки может содержать символы последовательности
+            logger.warning('Ошибка ввода от пользователя - {0}', error.code)
+            event['error'] = error.code
+            return str(error), keyboards.get(CUSTOM_RETRY)
+        event['branch'] = generation.find_branch()
+        strength = score_password(
+            ready_password, brand=user_sequence,
+            keyspace_bits=custom_keyspace_bits(password_length,
+                                               user_sequence))
+    markup = user_password_answer_buttons(custom_selection=True)
+    return password_message(ready_password, strength), markup
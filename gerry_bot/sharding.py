@@ -0,0 +1,281 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+from telebot import apihelper, types
+
+
+# ключи Update, в которых есть сообщение с чатом
+MESSAGE_KEYS = ('message', 'edited_message', 'channel_post',
+                'edited_channel_post')
+
+
+# номер процесса-обработчика, задается в _worker_main
+_worker_index: Optional[int] = None
+
+
+def worker_index() -> Optional[int]:
+    """Номер текущего процесса-обработчика или None вне обработчика."""
+    return _worker_index
+
+
+def shard_log_path(path: str, index: int) -> str:
+    """
+    Файл журнала процесса-обработчика: logs/bot.log -> logs/bot.shard-0.log.
+
+    Номер процесса, а не pid: перезапущенный процесс продолжает тот же
+    файл, ротацию и сжатие каждого файла выполняет один процесс.
+    """
+    root, extension = os.path.splitext(path)
+    return '{0}.shard-{1}{2}'.format(root, index, extension)
+
+
+def default_worker_count(workers: int = 0) -> int:
+    """Количество процессов: заданное или по числу ядер процессора."""
+    if workers > 0:
+        return workers
+    return os.cpu_count() or 1
+
+
+def update_chat_id(update: Dict) -> int:
+    """
+    Чат, к которому относится Update в формате JSON Bot API.
+
+    Для нажатий inline-кнопок берется чат сообщения с кнопкой, для
+    Update без чата - пользователь, иначе 0.
+    """
+    for key in MESSAGE_KEYS:
+        message = update.get(key)
+        if message is not None:
+            return message['chat']['id']
+    callback_query = update.get('callback_query')
+    if callback_query is not None:
+        message = callback_query.get('message')
+        if message is not None:
+            return message['chat']['id']
+        return callback_query['from']['id']
+    for value in update.values():
+        if isinstance(value, dict) and 'from' in value:
+            return value['from']['id']
+    return 0
+
+
+def shard_for(chat_id: int, workers: int) -> int:
+    """Номер процесса для чата: один чат всегда в одном процессе."""
+    return chat_id % workers
+
+
+def _worker_main(index: int, updates, processed,
+                 bot_factory: Callable) -> None:
+    """
+    Цикл процесса-обработчика.
+
+    Args:
+        index (int): Номер процесса.
+        updates (multiprocessing.Queue): Пакеты Update в формате JSON,
+            None - завершить работу.
+        processed (multiprocessing.Array): Счетчики обработанных Update.
+        bot_factory (Callable): Функция без аргументов, возвращающая бота
+            с зарегистрированными обработчиками.
+    """
+    global _worker_index
+    _worker_index = index
+    bot = bot_factory()
+    if getattr(bot, 'threaded', False):
+        # обработчики выполняются в этом потоке: Update считается
+        # обработанным после их завершения, Update чата идут по порядку
+        logger.warning('Shard worker {0}: бот переведен в threaded=False',
+                       index)
+        bot.threaded = False
+    logger.debug('Shard worker {0} started, pid {1}', index, os.getpid())
+    while True:
+        batch = updates.get()
+        if batch is None:
+            break
+        try:
+            bot.process_new_updates(
+                [types.Update.de_json(update) for update in batch])
+        except Exception as error_message:
+            logger.exception(error_message)
+        with processed.get_lock():
+            processed[index] += len(batch)
+
+
+class ShardSupervisor:
+    """
+    Распределение Update по процессам-обработчикам.
+
+    Update получаются один раз в процессе-супервизоре и передаются
+    процессу с номером chat_id % workers, поэтому состояние кастомного
+    диалога чата всегда в одном процессе. Упавший процесс перезапускается
+    при следующей проверке; пакеты, ожидавшие в его очереди, теряются.
+
+    Args:
+        bot_factory (Callable): Функция верхнего уровня модуля без
+            аргументов, возвращающая бота (вызывается в процессе).
+        workers (int): Количество процессов.
+        start_method (str) = 'spawn': Способ запуска процессов
+            multiprocessing.
+    """
+    def __init__(self, bot_factory: Callable, workers: int,
+                 start_method: str = 'spawn') -> None:
+        if workers <= 0:
+            raise ValueError('Количество процессов должно быть больше 0.')
+        self.bot_factory = bot_factory
+        self.workers = workers
+        self.restarts = 0
+        self.dispatched = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._processed = self._context.Array('q', workers)
+        self._queues: List = [None] * workers
+        self._processes: List = [None] * workers
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Запустить все процессы."""
+        for index in range(self.workers):
+            self._start_worker(index)
+
+    def dispatch(self, updates: List[Dict]) -> None:
+        """
+        Передать пакет Update процессам.
+
+        Update одного процесса отправляются одним сообщением очереди,
+        порядок Update внутри чата сохраняется.
+        """
+        batches: Dict[int, List[Dict]] = dict()
+        for update in updates:
+            shard = shard_for(update_chat_id(update), self.workers)
+            batches.setdefault(shard, []).append(update)
+        with self._lock:
+            for shard, batch in batches.items():
+                self._queues[shard].put(batch)
+            self.dispatched += len(updates)
+
+    def check_workers(self) -> int:
+        """
+        Перезапустить завершившиеся процессы.
+
+        Returns:
+            int: Количество перезапущенных процессов.
+        """
+        restarted = 0
+        with self._lock:
+            for index, process in enumerate(self._processes):
+                if process is not None and not process.is_alive():
+                    logger.error('Shard worker {0} exited with code {1}, '
+                                 'restarting', index, process.exitcode)
+                    self._queues[index].cancel_join_thread()
+                    self._start_worker(index)
+                    self.restarts += 1
+                    restarted += 1
+        return restarted
+
+    def wait_processed(self, timeout: float) -> bool:
+        """Дождаться обработки всех переданных Update."""
+        deadline = time.monotonic() + timeout
+        while self.processed() < self.dispatched:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def processed(self) -> int:
+        """Количество обработанных Update во всех процессах."""
+        with self._processed.get_lock():
+            return sum(self._processed)
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики супервизора."""
+        return {
+            'workers': self.workers,
+            'restarts': self.restarts,
+            'dispatched': self.dispatched,
+            'processed': self.processed(),
+        }
+
+    def stop(self, timeout: float = 5) -> None:
+        """Завершить процессы после обработки их очередей."""
+        with self._lock:
+            for queue in self._queues:
+                if queue is not None:
+                    queue.put(None)
+            for process in self._processes:
+                if process is None:
+                    continue
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+
+    def _start_worker(self, index: int) -> None:
+        """Запустить процесс с новой очередью (вызывается под _lock)."""
+        # очередь упавшего процесса не переиспользуется: он мог
+        # завершиться, удерживая ее блокировку
+        self._queues[index] = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._queues[index], self._processed,
+                  self.bot_factory),
+            name='shard-worker-{0}'.format(index),
+            daemon=True)
+        process.start()
+        self._processes[index] = process
+
+
+def poll_updates(fetch_updates: Callable, supervisor: ShardSupervisor,
+                 stop_event: Optional[threading.Event] = None,
+                 error_delay: float = 1) -> None:
+    """
+    Получать Update и передавать их супервизору.
+
+    Args:
+        fetch_updates (Callable): Функция offset -> список Update в
+            формате JSON (getUpdates).
+        supervisor (ShardSupervisor): Супервизор процессов.
+        stop_event (threading.Event) = None: Событие остановки.
+        error_delay (float) = 1: Пауза после ошибки получения Update.
+    """
+    offset = None
+    while stop_event is None or not stop_event.is_set():
+        supervisor.check_workers()
+        try:
+            updates = fetch_updates(offset)
+        except Exception as error_message:
+            logger.exception(error_message)
+            time.sleep(error_delay)
+            continue
+        if updates:
+            offset = updates[-1]['update_id'] + 1
+            supervisor.dispatch(updates)
+
+
+def run_sharded(token: str, bot_factory: Callable, workers: int,
+                long_polling_timeout: int = 20) -> None:
+    """
+    Запустить бота в sharded-режиме: getUpdates в текущем процессе,
+    обработка в workers процессах.
+
+    Args:
+        token (str): Токен бота.
+        bot_factory (Callable): Функция верхнего уровня модуля,
+            возвращающая бота с обработчиками.
+        workers (int): Количество процессов (0 - по числу ядер).
+        long_polling_timeout (int) = 20: Таймаут long polling, секунды.
+    """
+    supervisor = ShardSupervisor(bot_factory, default_worker_count(workers))
+    supervisor.start()
+    logger.debug('Sharded mode with {0} workers', supervisor.workers)
+
+    def fetch_updates(offset: Optional[int]) -> List[Dict]:
+        return apihelper.get_updates(
+            token, offset=offset, long_polling_timeout=long_polling_timeout)
+
+    try:
+        poll_updates(fetch_updates, supervisor)
+    finally:
+        supervisor.stop()
+        logger.debug('Shard supervisor stats - {0}', supervisor.stats())
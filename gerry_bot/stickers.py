@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import threading
+from typing import BinaryIO, Dict, Iterable, Optional
+
+from telebot import apihelper
+
+
+class StickerCache:
+    """
+    Кэш telegram file_id для стикеров из static/stickers.
+
+    Стикер загружается в Telegram один раз, полученный file_id сохраняется
+    в JSON-файл и дальше стикер отправляется по file_id. Повторная загрузка
+    выполняется только если Telegram отклонил сохраненный file_id.
+
+    Args:
+        stickers_dir (str): Каталог с файлами стикеров.
+        cache_path (str): Путь к JSON-файлу с file_id.
+    """
+    def __init__(self, stickers_dir: str, cache_path: str) -> None:
+        self.stickers_dir = stickers_dir
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._file_ids = self._load()
+        self._contents: Dict[str, bytes] = dict()
+
+    def preload(self, sticker_names: Iterable[str]) -> None:
+        """
+        Прочитать файлы стикеров в память один раз при запуске.
+
+        Загрузка стикера в Telegram (первая или после устаревшего file_id)
+        дальше не обращается к диску. Отсутствующие файлы пропускаются -
+        при отправке такого стикера будет FileNotFoundError.
+
+        Args:
+            sticker_names (Iterable[str]): Имена файлов стикеров.
+        """
+        for sticker_name in sticker_names:
+            path_to_sticker = os.path.join(self.stickers_dir, sticker_name)
+            try:
+                with open(path_to_sticker, mode='rb') as sticker:
+                    self._contents[sticker_name] = sticker.read()
+            except FileNotFoundError:
+                continue
+
+    def send_sticker(self, bot, chat_id: int, sticker_name: str):
+        """
+        Отправить стикер по file_id, при необходимости загрузив файл.
+
+        Args:
+            bot: Экземпляр telebot.TeleBot.
+            chat_id (int): Идентификатор чата.
+            sticker_name (str): Имя файла стикера, например
+                'HelloAnimatedSticker.tgs'.
+
+        Raises:
+            FileNotFoundError: Если файл стикера не найден.
+
+        Returns:
+            Отправленное сообщение.
+        """
+        file_id = self.get_file_id(sticker_name)
+        if file_id is not None:
+            try:
+                return bot.send_sticker(chat_id, file_id)
+            except apihelper.ApiTelegramException as error:
+                if error.error_code != 400:
+                    raise
+                # file_id устарел - загружаем файл заново
+                self.forget(sticker_name)
+
+        with self._open(sticker_name) as sticker:
+            message = bot.send_sticker(chat_id, sticker)
+        if getattr(message, 'sticker', None) is not None:
+            self.remember(sticker_name, message.sticker.file_id)
+        return message
+
+    async def send_sticker_async(self, bot, chat_id: int, sticker_name: str):
+        """
+        Отправить стикер через AsyncTeleBot (аналог send_sticker).
+
+        Args:
+            bot: Экземпляр telebot.async_telebot.AsyncTeleBot.
+            chat_id (int): Идентификатор чата.
+            sticker_name (str): Имя файла стикера.
+
+        Raises:
+            FileNotFoundError: Если файл стикера не найден.
+
+        Returns:
+            Отправленное сообщение.
+        """
+        file_id = self.get_file_id(sticker_name)
+        if file_id is not None:
+            try:
+                return await bot.send_sticker(chat_id, file_id)
+            except Exception as error:
+                # у асинхронного клиента свой класс ApiTelegramException
+                if getattr(error, 'error_code', None) != 400:
+                    raise
+                self.forget(sticker_name)
+
+        with self._open(sticker_name) as sticker:
+            message = await bot.send_sticker(chat_id, sticker)
+        if getattr(message, 'sticker', None) is not None:
+            self.remember(sticker_name, message.sticker.file_id)
+        return message
+
+    def get_file_id(self, sticker_name: str) -> Optional[str]:
+        """Получить сохраненный file_id стикера."""
+        return self._file_ids.get(sticker_name)
+
+    def remember(self, sticker_name: str, file_id: str) -> None:
+        """Сохранить file_id стикера."""
+        with self._lock:
+            self._file_ids[sticker_name] = file_id
+            self._dump()
+
+    def forget(self, sticker_name: str) -> None:
+        """Удалить устаревший file_id стикера."""
+        with self._lock:
+            if self._file_ids.pop(sticker_name, None) is not None:
+                self._dump()
+
+    def _open(self, sticker_name: str) -> BinaryIO:
+        """Файл стикера: из памяти после preload, иначе с диска."""
+        content = self._contents.get(sticker_name)
+        if content is None:
+            return open(os.path.join(self.stickers_dir, sticker_name),
+                        mode='rb')
+        sticker = io.BytesIO(content)
+        # requests берет имя загружаемого файла из атрибута name
+        sticker.name = sticker_name
+        return sticker
+
+    def _load(self) -> Dict[str, str]:
+        """Прочитать file_id из JSON-файла."""
+        try:
+            with open(self.cache_path, encoding='utf-8') as cache_file:
+                file_ids = json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            return dict()
+        if not isinstance(file_ids, dict):
+            return dict()
+        return file_ids
+
+    def _dump(self) -> None:
+        """Атомарно записать file_id в JSON-файл."""
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # файл кэша общий для процессов sharded-режима: у каждого свой
+        # временный файл, os.replace атомарен
+        temporary_path = '{0}.{1}.tmp'.format(self.cache_path, os.getpid())
+        with open(temporary_path, mode='w', encoding='utf-8') as cache_file:
+            json.dump(self._file_ids, cache_file, ensure_ascii=False,
+                      indent=2)
+        os.replace(temporary_path, self.cache_path)
@@ -0,0 +1,315 @@
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+from urllib3.exceptions import NewConnectionError
+
+
+# состояния предохранителя
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+TOO_MANY_REQUESTS = 429
+
+# методы без побочных эффектов: повтор после любой сетевой ошибки
+# безопасен. Остальные (sendMessage, editMessageText, ...) Telegram мог
+# уже выполнить, поэтому они повторяются, только если соединение не
+# установлено (запрос не отправлен).
+IDEMPOTENT_METHODS = frozenset(('getUpdates', 'getMe', 'getFile', 'getChat',
+                                'getWebhookInfo', 'getStickerSet'))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Запрос не отправлен: предохранитель разомкнут после серии ошибок."""
+
+
+class CircuitBreaker:
+    """
+    Предохранитель для запросов к Telegram.
+
+    После failure_threshold ошибок подряд (сетевые ошибки и ответы 5xx)
+    запросы не отправляются cooldown секунд. Затем пропускается один
+    пробный запрос: успех замыкает предохранитель, ошибка снова размыкает.
+
+    Args:
+        failure_threshold (int): Количество ошибок подряд до размыкания.
+        cooldown (float): Время в разомкнутом состоянии, секунды.
+        clock (Callable) = time.monotonic: Источник времени.
+    """
+    def __init__(self, failure_threshold: int, cooldown: float,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if failure_threshold < 1 or cooldown < 0:
+            raise ValueError('failure_threshold должен быть не меньше 1, '
+                             'cooldown - не меньше 0.')
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние: CLOSED, OPEN или HALF_OPEN."""
+        with self._lock:
+            if self._state == OPEN and self._cooled_down():
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Можно ли отправить запрос.
+
+        Returns:
+            bool: False - предохранитель разомкнут или пробный запрос
+                уже выполняется.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._cooled_down():
+                self._state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Запрос выполнен: сбросить счетчик ошибок."""
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        """Запрос завершился ошибкой."""
+        with self._lock:
+            self.failures += 1
+            if self._state == HALF_OPEN \
+                    or self.failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+
+    def _cooled_down(self) -> bool:
+        return self.clock() - self._opened_at >= self.cooldown
+
+
+class TelegramHttpClient:
+    """
+    HTTP-клиент Bot API для telebot.apihelper.CUSTOM_REQUEST_SENDER.
+
+    Все запросы идут через одну requests.Session с keep-alive пулом
+    соединений размером pool_size, поэтому send_message и send_sticker
+    не открывают новое TLS-соединение на каждый вызов. Ответ 429
+    повторяется через parameters.retry_after из ответа Telegram, если он
+    не больше backoff_max (иначе ответ сразу возвращается telebot, чтобы
+    не держать поток обработчика). Ошибки соединения и 5xx повторяются с
+    экспоненциальной задержкой со случайным джиттером, таймаут чтения -
+    только для IDEMPOTENT_METHODS. Серия ошибок размыкает CircuitBreaker.
+
+    Args:
+        pool_size (int): Размер пула соединений (по числу рабочих потоков).
+        connect_timeout (float): Таймаут соединения, секунды.
+        max_retries (int): Количество повторов после первой попытки.
+        backoff_base (float): Базовая задержка повтора, секунды.
+        backoff_max (float): Верхняя граница задержки, секунды.
+        breaker (CircuitBreaker): Предохранитель.
+        sleep (Callable) = time.sleep: Функция ожидания.
+    """
+    def __init__(self, pool_size: int, connect_timeout: float,
+                 max_retries: int, backoff_base: float, backoff_max: float,
+                 breaker: CircuitBreaker,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        if pool_size < 1 or max_retries < 0:
+            raise ValueError('pool_size должен быть не меньше 1, '
+                             'max_retries - не меньше 0.')
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker
+        self.sleep = sleep
+        self.retries = 0
+        self.session = requests.Session()
+        # pool_block - лишние потоки ждут соединение, а не открывают новое
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=0, pool_block=True)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def __call__(self, method: str, url: str, params: Optional[Dict] = None,
+                 files: Optional[Dict] = None, timeout=None,
+                 proxies: Optional[Dict] = None) -> requests.Response:
+        """
+        Выполнить запрос с повторами (сигнатура CUSTOM_REQUEST_SENDER).
+
+        Raises:
+            CircuitOpenError: Если предохранитель разомкнут.
+            requests.RequestException: Если сетевая ошибка повторилась
+                max_retries раз или неидемпотентный запрос мог быть
+                отправлен (таймаут чтения, разрыв соединения).
+
+        Returns:
+            requests.Response: Последний ответ сервера.
+        """
+        timeout = self._timeout(timeout)
+        idempotent = _method_name(url) in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(
+                    'Telegram API недоступен, запрос {0} не отправлен'.format(
+                        _method_name(url)))
+            if attempt:
+                _rewind(files)
+            last_attempt = attempt == self.max_retries
+            try:
+                response = self.session.request(
+                    method, url, params=params, files=files, timeout=timeout,
+                    proxies=proxies)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                # таймаут чтения или разрыв после отправки: запрос,
+                # возможно, уже выполнен
+                if self._failed() or last_attempt or not (
+                        idempotent or _request_not_sent(error)):
+                    raise
+                delay = self.backoff(attempt)
+                logger.warning('Ошибка запроса {0} - {1}, повтор через {2:.2f}'
+                               ' с', _method_name(url), error, delay)
+            else:
+                if response.status_code == TOO_MANY_REQUESTS:
+                    # Telegram отвечает, сервер доступен - не ошибка сети
+                    self.breaker.record_success()
+                    delay = self.retry_after(response, attempt)
+                    if last_attempt or delay is None:
+                        return response
+                elif response.status_code >= 500:
+                    if self._failed() or last_attempt:
+                        return response
+                    delay = self.backoff(attempt)
+                else:
+                    self.breaker.record_success()
+                    return response
+                logger.warning('Ответ {0} на {1}, повтор через {2:.2f} с',
+                               response.status_code, _method_name(url), delay)
+            self.retries += 1
+            self.sleep(delay)
+
+    def backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным джиттером, секунды."""
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    def retry_after(self, response: requests.Response,
+                    attempt: int) -> Optional[float]:
+        """
+        Задержка перед повтором ответа 429.
+
+        Telegram передает retry_after в parameters тела ответа, к нему
+        добавляется небольшой джиттер, чтобы потоки не повторяли запрос
+        одновременно (задержка не превышает backoff_max). Без
+        retry_after используется backoff.
+
+        Returns:
+            Optional[float]: Задержка в секундах или None, если
+                retry_after больше backoff_max и повторять не нужно.
+        """
+        try:
+            retry_after = float(
+                response.json()['parameters']['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            return self.backoff(attempt)
+        if retry_after > self.backoff_max:
+            return None
+        return min(retry_after + random.uniform(0, self.backoff_base),
+                   self.backoff_max)
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики повторов и размыканий предохранителя."""
+        return {
+            'retries': self.retries,
+            'circuit_opened': self.breaker.opened,
+            'circuit_open': int(self.breaker.state == OPEN),
+        }
+
+    def close(self) -> None:
+        """Закрыть соединения пула."""
+        self.session.close()
+
+    def _failed(self) -> bool:
+        """
+        Отметить ошибку в предохранителе.
+
+        Returns:
+            bool: True - предохранитель разомкнулся, повторять не нужно.
+        """
+        self.breaker.record_failure()
+        return self.breaker.state == OPEN
+
+    def _timeout(self, timeout):
+        """Ограничить таймаут соединения, таймаут чтения оставить telebot."""
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            return min(connect_timeout, self.connect_timeout), read_timeout
+        if timeout is None:
+            return self.connect_timeout, None
+        return min(timeout, self.connect_timeout), timeout
+
+
+def _method_name(url: str) -> str:
+    """Имя метода Bot API без токена из url."""
+    return url.rsplit('/', 1)[-1]
+
+
+def _request_not_sent(error: requests.RequestException) -> bool:
+    """
+    Ошибка возникла до отправки запроса: таймаут или отказ соединения.
+
+    requests оборачивает ошибку urllib3 (MaxRetryError.reason), поэтому
+    причина ищется по цепочке исключения.
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    pending, seen = [error], set()
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, NewConnectionError):
+            return True
+        pending.extend((getattr(current, 'reason', None), current.__cause__,
+                        current.__context__))
+        pending.extend(argument for argument in current.args
+                       if isinstance(argument, BaseException))
+    return False
+
+
+def _rewind(files: Optional[Dict]) -> None:
+    """Вернуть загружаемые файлы в начало перед повтором запроса."""
+    for value in (files or {}).values():
+        stream = value[1] if isinstance(value, tuple) else value
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+
+
+def install_telegram_client(client: TelegramHttpClient,
+                            api_url: Optional[str] = None) -> None:
+    """
+    Отправлять запросы telebot через клиент.
+
+    Args:
+        client (TelegramHttpClient): Клиент Bot API.
+        api_url (str) = None: Шаблон адреса Bot API вида
+            'http://host:port/bot{0}/{1}' (например, локальный сервер).
+    """
+    apihelper.CUSTOM_REQUEST_SENDER = client
+    if api_url:
+        apihelper.API_URL = api_url
@@ -0,0 +1,234 @@
+import asyncio
+import collections
+import functools
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+
+THROTTLED_MESSAGE = 'Слишком много запросов, подождите немного.'
+
+
+class TokenBucketLimiter:
+    """
+    Ограничитель частоты запросов "token bucket" по ключу (пользователь).
+
+    На каждый активный ключ хранится два числа: остаток токенов и время
+    последнего обращения. Ключи без обращений дольше idle_ttl удаляются:
+    OrderedDict упорядочен по последнему обращению, поэтому неактивные
+    ключи всегда в начале и очистка стоит O(1) на вызов.
+
+    Args:
+        rate (float): Скорость пополнения, токенов в секунду.
+        capacity (float): Размер корзины (допустимая серия запросов).
+        idle_ttl (float): Через сколько секунд простоя забыть ключ.
+    """
+    def __init__(self, rate: float, capacity: float, idle_ttl: float) -> None:
+        if rate <= 0 or capacity < 1 or idle_ttl <= 0:
+            raise ValueError(
+                'rate и idle_ttl должны быть больше 0, capacity - не меньше 1.')
+        self.rate = rate
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self._buckets = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key: Hashable) -> bool:
+        """
+        Проверить и списать токен для ключа.
+
+        Returns:
+            bool: True - запрос разрешен, False - ограничен.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = self.capacity
+            else:
+                tokens = min(self.capacity,
+                             bucket[0] + (now - bucket[1]) * self.rate)
+                self._buckets.move_to_end(key)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = [tokens, now]
+        return allowed
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict_idle(self, now: float) -> None:
+        """Удалить ключи без обращений дольше idle_ttl."""
+        while self._buckets:
+            _, last_seen = next(iter(self._buckets.values()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._buckets.popitem(last=False)
+
+
+class Throttle:
+    """
+    Общий ограничитель для обработчиков бота.
+
+    Ограничивает частоту запросов пользователя и склеивает повторные
+    нажатия той же inline-кнопки, пока предыдущее еще обрабатывается.
+    Отклоненное нажатие получает дешевый answer_callback_query вместо
+    повторной генерации. На отклоненное сообщение (в том числе шаг
+    кастомного диалога - его состояние не меняется) пользователь
+    получает throttled_text один раз до следующего разрешенного запроса,
+    чтобы поток сообщений не превращался в поток ответов.
+
+    Args:
+        limiter (TokenBucketLimiter): Ограничитель частоты.
+        answer_callback (Callable): bot.answer_callback_query.
+        throttled_text (str) = THROTTLED_MESSAGE: Текст для пользователя
+            при превышении частоты.
+        send_message (Callable) = None: bot.send_message для ответа на
+            отклоненное сообщение; без него сообщения отбрасываются
+            молча.
+    """
+    def __init__(self, limiter: TokenBucketLimiter, answer_callback: Callable,
+                 throttled_text: str = THROTTLED_MESSAGE,
+                 send_message: Optional[Callable] = None) -> None:
+        self.limiter = limiter
+        self.answer_callback = answer_callback
+        self.throttled_text = throttled_text
+        self.send_message = send_message
+        self.throttled = 0
+        self.coalesced = 0
+        self._in_flight = set()
+        # ключи, уже получившие throttled_text, по времени ответа
+        self._notified = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def callback(self, function: Callable) -> Callable:
+        """Декоратор для обработчиков inline-кнопок (CallbackQuery)."""
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(call, *args, **kwargs):
+                in_flight_key, reply = self._enter_callback(call)
+                if in_flight_key is None:
+                    await self.answer_callback(call.id, **reply)
+                    return None
+                try:
+                    return await function(call, *args, **kwargs)
+                finally:
+                    self._leave(in_flight_key)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(call, *args, **kwargs):
+            in_flight_key, reply = self._enter_callback(call)
+            if in_flight_key is None:
+                self.answer_callback(call.id, **reply)
+                return None
+            try:
+                return function(call, *args, **kwargs)
+            finally:
+                self._leave(in_flight_key)
+        return wrapper
+
+    def message(self, function: Callable) -> Callable:
+        """
+        Декоратор для обработчиков сообщений: лишние не обрабатываются,
+        пользователь получает throttled_text.
+        """
+        if asyncio.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(message, *args, **kwargs):
+                if not self._allow(_user_key(message)):
+                    if self._should_notify(_user_key(message)):
+                        await self.send_message(message.chat.id,
+                                                self.throttled_text)
+                    return None
+                return await function(message, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(message, *args, **kwargs):
+            if not self._allow(_user_key(message)):
+                if self._should_notify(_user_key(message)):
+                    self.send_message(message.chat.id, self.throttled_text)
+                return None
+            return function(message, *args, **kwargs)
+        return wrapper
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики ограниченных и склеенных запросов."""
+        return {
+            'throttled': self.throttled,
+            'coalesced': self.coalesced,
+            'active_users': len(self.limiter),
+        }
+
+    def _enter_callback(self, call):
+        """
+        Решить, выполнять ли обработчик нажатия.
+
+        Returns:
+            tuple: (ключ выполняемого нажатия, None) или
+                (None, аргументы answer_callback_query).
+        """
+        in_flight_key = (call.message.chat.id, call.message.message_id,
+                         call.data)
+        with self._lock:
+            if in_flight_key in self._in_flight:
+                self.coalesced += 1
+                return None, {}
+        if not self._allow(_user_key(call)):
+            return None, {'text': self.throttled_text}
+        with self._lock:
+            if in_flight_key in self._in_flight:
+                self.coalesced += 1
+                return None, {}
+            self._in_flight.add(in_flight_key)
+        return in_flight_key, None
+
+    def _leave(self, in_flight_key) -> None:
+        """Отметить нажатие обработанным."""
+        with self._lock:
+            self._in_flight.discard(in_flight_key)
+
+    def _allow(self, key: Hashable) -> bool:
+        """Спросить ограничитель и посчитать отказ."""
+        if self.limiter.allow(key):
+            if self._notified:
+                with self._lock:
+                    self._notified.pop(key, None)
+            return True
+        with self._lock:
+            self.throttled += 1
+        return False
+
+    def _should_notify(self, key: Hashable) -> bool:
+        """
+        Решить, отвечать ли на отклоненное сообщение.
+
+        Returns:
+            bool: True - первый отказ ключу после разрешенного запроса.
+        """
+        if self.send_message is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            # как и в TokenBucketLimiter, старые ключи всегда в начале
+            while self._notified:
+                notified_at = next(iter(self._notified.values()))
+                if now - notified_at < self.limiter.idle_ttl:
+                    break
+                self._notified.popitem(last=False)
+            if key in self._notified:
+                return False
+            self._notified[key] = now
+        return True
+
+
+def _user_key(update) -> Hashable:
+    """Ключ ограничения: пользователь, а если его нет - чат."""
+    user = getattr(update, 'from_user', None)
+    if user is not None:
+        return user.id
+    return update.message.chat.id if hasattr(update, 'data') \
+        else update.chat.id
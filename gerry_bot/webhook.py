@@ -0,0 +1,114 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from loguru import logger
+from telebot import types
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    """Принять Update от Telegram и передать его в пул обработчиков."""
+
+    def do_POST(self) -> None:
+        """Обработать POST-запрос с Update в формате JSON."""
+        if self.path != self.server.webhook_path:
+            self.send_error(HTTPStatus.FORBIDDEN)
+            return
+
+        content_length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(content_length)
+        try:
+            update = types.Update.de_json(json.loads(body.decode('utf-8')))
+        except (ValueError, KeyError, TypeError) as error_message:
+            logger.warning('Некорректный Update - {0}', error_message)
+            self.send_error(HTTPStatus.BAD_REQUEST)
+            return
+
+        # отвечаем сразу, обработка идет в пуле потоков
+        self.server.submit_update(update)
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        """Перенаправить журнал http.server в loguru."""
+        # аргументы вычисляются, только если DEBUG включен
+        logger.opt(lazy=True).debug('Webhook {0} - {1}',
+                                    self.address_string,
+                                    lambda: format % args)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    Локальный HTTP-сервер для webhook-режима бота.
+
+    Обработчики выполняются в потоках сервера (workers), поэтому бот
+    должен быть создан с threaded=False; threaded-бот переключается.
+
+    Args:
+        bot: Экземпляр telebot.TeleBot.
+        host (str): Адрес, на котором слушает сервер.
+        port (int): Порт (0 - выбрать свободный).
+        webhook_path (str): Путь, на который Telegram присылает Update.
+        workers (int): Количество потоков обработки Update.
+    """
+    daemon_threads = True
+
+    def __init__(self, bot, host: str, port: int, webhook_path: str,
+                 workers: int) -> None:
+        if workers <= 0:
+            raise ValueError('Количество потоков должно быть больше 0.')
+        super().__init__((host, port), WebhookRequestHandler)
+        if getattr(bot, 'threaded', False):
+            # иначе process_new_updates только ставит обработчики в пул
+            # telebot, а workers потоков и перехват ошибок не работают
+            logger.warning('Webhook: бот переведен в threaded=False')
+            bot.threaded = False
+        self.bot = bot
+        self.webhook_path = webhook_path
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='webhook')
+
+    def submit_update(self, update: types.Update) -> None:
+        """Передать Update боту в пуле потоков."""
+        self.executor.submit(self._process_update, update)
+
+    def _process_update(self, update: types.Update) -> None:
+        """Обработать Update, не роняя поток пула."""
+        try:
+            self.bot.process_new_updates([update])
+        except Exception as error_message:
+            logger.exception(error_message)
+
+    def server_close(self) -> None:
+        """Закрыть сокет и дождаться обработки принятых Update."""
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def serve_webhook(bot, host: str, port: int, webhook_path: str, workers: int,
+                  webhook_url: Optional[str] = None) -> None:
+    """
+    Запустить бота в webhook-режиме.
+
+    Args:
+        bot: Экземпляр telebot.TeleBot.
+        host (str): Адрес локального сервера.
+        port (int): Порт локального сервера.
+        webhook_path (str): Путь, на который Telegram присылает Update.
+        workers (int): Количество потоков обработки Update.
+        webhook_url (str) = None: Публичный адрес webhook. Если указан -
+            регистрируется в Telegram.
+    """
+    if webhook_url:
+        bot.remove_webhook()
+        bot.set_webhook(url=webhook_url)
+    server = WebhookServer(bot, host, port, webhook_path, workers)
+    logger.debug('Webhook server on {0}:{1}{2}',
+                 host, server.server_address[1], webhook_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -1 +1,14 @@
-from .config import BOT_TOKEN
+from .config import get_config, load_config
+
+
+def __getattr__(name: str):
+    """
+    Настройка как атрибут пакета: from gerry_bot_config import BOT_TOKEN.
+
+    Окружение и .env читаются при первом обращении, а не при импорте.
+    """
+    config = get_config()
+    if name in config:
+        return config[name]
+    raise AttributeError(
+        "module 'gerry_bot_config' has no attribute '{0}'".format(name))
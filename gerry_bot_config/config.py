@@ -1,9 +1,140 @@
 import os
+from typing import Any, Dict, Mapping, Optional
 
-from dotenv import load_dotenv
 
+def _flag(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes')
 
-load_dotenv()
 
-# your bot token from environment variables
-BOT_TOKEN = os.getenv('BOT_TOKEN')
+def load_config(environ: Optional[Mapping[str, str]] = None,
+                dotenv: bool = True) -> Dict[str, Any]:
+    """
+    Прочитать настройки бота из переменных окружения.
+
+    Args:
+        environ (Mapping) = None: Переменные окружения, по умолчанию
+            os.environ.
+        dotenv (bool) = True: Сначала загрузить файл .env.
+
+    Returns:
+        Dict[str, Any]: Настройки по именам переменных окружения.
+    """
+    if dotenv:
+        # python-dotenv нужен только при чтении настроек
+        from dotenv import load_dotenv
+        load_dotenv()
+    env = os.environ if environ is None else environ
+    webhook_workers = int(env.get('WEBHOOK_WORKERS', '4'))
+    return {
+        # your bot token from environment variables
+        'BOT_TOKEN': env.get('BOT_TOKEN'),
+
+        # pool of ready automatic passwords
+        'PASSWORD_POOL_SIZE': int(env.get('PASSWORD_POOL_SIZE', '500')),
+        'PASSWORD_POOL_LOW_WATER_MARK': int(
+            env.get('PASSWORD_POOL_LOW_WATER_MARK', '100')),
+        'PASSWORD_POOL_STATS': _flag(env.get('PASSWORD_POOL_STATS', 'true')),
+        # file of the Bloom filter of issued automatic passwords: a repeat
+        # is regenerated; empty - no de-duplication
+        'PASSWORD_DEDUP_PATH': env.get('PASSWORD_DEDUP_PATH', ''),
+        'PASSWORD_DEDUP_CAPACITY': int(
+            env.get('PASSWORD_DEDUP_CAPACITY', '10000000')),
+        'PASSWORD_DEDUP_ERROR_RATE': float(
+            env.get('PASSWORD_DEDUP_ERROR_RATE', '1e-5')),
+
+        # stickers and the cache of their telegram file_id
+        'STICKERS_DIR': env.get('STICKERS_DIR', 'static/stickers'),
+        'STICKER_CACHE_PATH': env.get('STICKER_CACHE_PATH',
+                                      'static/stickers/file_ids.json'),
+
+        # webhook mode (python main.py --mode webhook)
+        'WEBHOOK_HOST': env.get('WEBHOOK_HOST', '127.0.0.1'),
+        'WEBHOOK_PORT': int(env.get('WEBHOOK_PORT', '8443')),
+        'WEBHOOK_PATH': env.get('WEBHOOK_PATH', '/telegram-webhook'),
+        'WEBHOOK_URL': env.get('WEBHOOK_URL'),
+        'WEBHOOK_WORKERS': webhook_workers,
+
+        # async mode (python main.py --mode async)
+        'ASYNC_GENERATION_WORKERS': int(
+            env.get('ASYNC_GENERATION_WORKERS', '4')),
+
+        # state of the custom password dialog: 'memory' or 'sqlite'
+        'DIALOG_STORE': env.get('DIALOG_STORE', 'memory'),
+        'DIALOG_STORE_PATH': env.get('DIALOG_STORE_PATH', 'dialogs.sqlite3'),
+        'DIALOG_TTL': float(env.get('DIALOG_TTL', '900')),
+        'DIALOG_MAX_SIZE': int(env.get('DIALOG_MAX_SIZE', '10000')),
+
+        # /metrics endpoint in Prometheus text format
+        'METRICS_ENABLED': _flag(env.get('METRICS_ENABLED', 'false')),
+        'METRICS_HOST': env.get('METRICS_HOST', '127.0.0.1'),
+        'METRICS_PORT': int(env.get('METRICS_PORT', '9100')),
+
+        # generation events (mode, length, branch, latency, error; no
+        # passwords or user sequences) in SQLite, flushed in batches
+        'ANALYTICS_ENABLED': _flag(env.get('ANALYTICS_ENABLED', 'false')),
+        'ANALYTICS_PATH': env.get('ANALYTICS_PATH', 'analytics.sqlite3'),
+        'ANALYTICS_FLUSH_INTERVAL': float(
+            env.get('ANALYTICS_FLUSH_INTERVAL', '5')),
+        'ANALYTICS_BATCH_SIZE': int(env.get('ANALYTICS_BATCH_SIZE', '500')),
+        'ANALYTICS_MAX_QUEUE': int(env.get('ANALYTICS_MAX_QUEUE', '100000')),
+
+        # opt-in profiling: traces of handlers slower than the threshold
+        # (seconds) and on-demand snapshots written to PROFILING_DIR;
+        # kill -USR1 <pid> - sampling, kill -USR2 <pid> - cProfile
+        'PROFILING_ENABLED': _flag(env.get('PROFILING_ENABLED', 'false')),
+        'PROFILING_DIR': env.get('PROFILING_DIR', 'profiles'),
+        'PROFILING_SLOW_THRESHOLD': float(
+            env.get('PROFILING_SLOW_THRESHOLD', '1')),
+        'PROFILING_SNAPSHOT_DURATION': float(
+            env.get('PROFILING_SNAPSHOT_DURATION', '30')),
+        'PROFILING_SAMPLE_INTERVAL': float(
+            env.get('PROFILING_SAMPLE_INTERVAL', '0.005')),
+        'PROFILING_MAX_QUEUE': int(env.get('PROFILING_MAX_QUEUE', '1000')),
+
+        # logging: LOG_FORMAT is 'text' or 'json'
+        'LOG_PATH': env.get('LOG_PATH', 'logs/bot.log'),
+        'LOG_LEVEL': env.get('LOG_LEVEL', 'INFO'),
+        'LOG_FORMAT': env.get('LOG_FORMAT', 'text'),
+        'LOG_ROTATION': env.get('LOG_ROTATION', '1 week'),
+        'LOG_RETENTION': int(env.get('LOG_RETENTION', '4')),
+        'LOG_COMPRESSION': env.get('LOG_COMPRESSION', 'zip'),
+        'LOG_CONSOLE': _flag(env.get('LOG_CONSOLE', 'false')),
+
+        # per-user token bucket in front of the handlers
+        'RATE_LIMIT_RATE': float(env.get('RATE_LIMIT_RATE', '1')),
+        'RATE_LIMIT_BURST': float(env.get('RATE_LIMIT_BURST', '5')),
+        'RATE_LIMIT_IDLE_TTL': float(env.get('RATE_LIMIT_IDLE_TTL', '600')),
+
+        # outbound Bot API client: keep-alive pool, retries and circuit
+        # breaker; the pool is sized for the webhook workers plus the
+        # polling thread
+        'TELEGRAM_API_URL': env.get('TELEGRAM_API_URL'),
+        'TELEGRAM_POOL_SIZE': int(
+            env.get('TELEGRAM_POOL_SIZE', str(webhook_workers + 1))),
+        'TELEGRAM_CONNECT_TIMEOUT': float(
+            env.get('TELEGRAM_CONNECT_TIMEOUT', '5')),
+        'TELEGRAM_MAX_RETRIES': int(env.get('TELEGRAM_MAX_RETRIES', '3')),
+        'TELEGRAM_BACKOFF_BASE': float(
+            env.get('TELEGRAM_BACKOFF_BASE', '0.5')),
+        'TELEGRAM_BACKOFF_MAX': float(env.get('TELEGRAM_BACKOFF_MAX', '30')),
+        'TELEGRAM_BREAKER_THRESHOLD': int(
+            env.get('TELEGRAM_BREAKER_THRESHOLD', '5')),
+        'TELEGRAM_BREAKER_COOLDOWN': float(
+            env.get('TELEGRAM_BREAKER_COOLDOWN', '30')),
+
+        # sharded mode (python main.py --mode sharded): 0 - one worker per
+        # CPU core; worker N logs to LOG_PATH with a .shard-N suffix and
+        # serves its metrics on METRICS_PORT + 1 + N
+        'SHARD_WORKERS': int(env.get('SHARD_WORKERS', '0')),
+    }
+
+
+_config: Optional[Dict[str, Any]] = None
+
+
+def get_config() -> Dict[str, Any]:
+    """Настройки процесса: читаются из окружения при первом обращении."""
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
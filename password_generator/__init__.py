@@ -1 +1,9 @@
 from .generator import AutomaticPasswordGeneration, CustomGenerationPassword
+from .pool import PasswordPool
+from .validation import PasswordValidationError, validate_user_data
+from .strength import PasswordStrength, audit_passwords, score_many, \
+    score_password
+from .dedup import BloomFilter, PasswordExhaustedError, \
+    UniquePasswordGeneration
+from .rng import RandomSource, SeededRandomSource, SystemRandomSource, \
+    get_random_source, set_random_source
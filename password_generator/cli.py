@@ -0,0 +1,261 @@
+import argparse
+import collections
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional
+
+from .dedup import BloomFilter, PasswordExhaustedError, \
+    UniquePasswordGeneration
+from .generator import AutomaticPasswordGeneration, CustomGenerationPassword
+from .validation import validate_user_data
+
+
+AUTOMATIC_MODE = 'auto'
+CUSTOM_MODE = 'custom'
+
+LINES_FORMAT = 'lines'
+JSONL_FORMAT = 'jsonl'
+
+DEFAULT_BATCH_SIZE = 10000
+# буфер записи: один пакет паролей уходит в файл несколькими write
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def create_generation(mode: str, password_length: Optional[int] = None,
+                      user_sequence: Optional[str] = None):
+    """
+    Генератор бота для режима.
+
+    Args:
+        mode (str): 'auto' - AutomaticPasswordGeneration, 'custom' -
+            CustomGenerationPassword.
+        password_length (int) = None: Общая длина кастомного пароля.
+        user_sequence (str) = None: Последовательность кастомного пароля.
+    """
+    if mode == CUSTOM_MODE:
+        return CustomGenerationPassword(password_length=password_length,
+                                        user_sequence=user_sequence)
+    return AutomaticPasswordGeneration(auto_gen=True)
+
+
+def generate_batch(mode: str, count: int,
+                   password_length: Optional[int] = None,
+                   user_sequence: Optional[str] = None) -> List[str]:
+    """
+    Сгенерировать пакет паролей генератором бота (см. create_generation).
+
+    Raises:
+        PasswordValidationError: Если данные кастомного пароля
+            некорректны.
+    """
+    return create_generation(mode, password_length,
+                             user_sequence).generate_many(count)
+
+
+def render_batch(passwords: List[str], output_format: str) -> bytes:
+    """
+    Пакет паролей в формате вывода: строка на пароль или JSON Lines
+    вида {"password": "..."}.
+
+    Сгенерированная часть пароля - латиница, цифры и '-', поэтому JSON
+    собирается одной склейкой, если последовательность пользователя
+    не требует экранирования.
+    """
+    if not passwords:
+        return b''
+    if output_format == LINES_FORMAT:
+        text = '\n'.join(passwords)
+    elif all(json.dumps(password, ensure_ascii=False)[1:-1] == password
+             for password in (passwords[0], passwords[-1])):
+        # все пароли пакета начинаются с одной последовательности
+        text = '{"password": "' + '"}\n{"password": "'.join(
+            passwords) + '"}'
+    else:
+        text = '\n'.join(json.dumps({'password': password},
+                                    ensure_ascii=False)
+                         for password in passwords)
+    return (text + '\n').encode('utf-8')
+
+
+def _render_generated_batch(mode: str, count: int,
+                            password_length: Optional[int],
+                            user_sequence: Optional[str],
+                            output_format: str) -> bytes:
+    """Сгенерировать и отформатировать пакет (вызывается в процессе)."""
+    return render_batch(generate_batch(mode, count, password_length,
+                                       user_sequence), output_format)
+
+
+def _batch_sizes(count: int, batch_size: int) -> Iterator[int]:
+    for start in range(0, count, batch_size):
+        yield min(batch_size, count - start)
+
+
+def _map_batches(function, arguments: tuple, sizes: Iterator[int],
+                 workers: int) -> Iterator:
+    """
+    Результаты function(mode, size, *arguments) по порядку пакетов,
+    при workers > 1 - в пуле процессов.
+    """
+    mode = arguments[0]
+    if workers <= 1:
+        for size in sizes:
+            yield function(mode, size, *arguments[1:])
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for size in sizes:
+            pending.append(executor.submit(function, mode, size,
+                                           *arguments[1:]))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_passwords(mode: str, count: int,
+                     password_length: Optional[int] = None,
+                     user_sequence: Optional[str] = None,
+                     output_format: str = LINES_FORMAT,
+                     batch_size: int = DEFAULT_BATCH_SIZE,
+                     workers: int = 1,
+                     seen: Optional[BloomFilter] = None) -> Iterator[bytes]:
+    """
+    Отформатированные пакеты паролей по порядку.
+
+    В памяти одновременно не больше 2 * workers пакетов, поэтому расход
+    памяти не зависит от count. При workers > 1 пакеты генерируются
+    в пуле процессов (secrets в каждом процессе берет случайность
+    из ОС независимо).
+
+    Args:
+        mode (str): 'auto' или 'custom'.
+        count (int): Общее количество паролей.
+        password_length (int) = None: Общая длина кастомного пароля.
+        user_sequence (str) = None: Последовательность кастомного пароля.
+        output_format (str) = 'lines': 'lines' или 'jsonl'.
+        batch_size (int) = 10000: Паролей в пакете.
+        workers (int) = 1: Количество процессов генерации.
+        seen (BloomFilter) = None: Фильтр выданных паролей, пароли
+            проверяются в основном процессе, повторы генерируются заново.
+            Пакет отмечается в фильтре, когда потребитель его записал
+            (запросил следующий) или запись на нем прервалась.
+
+    Raises:
+        PasswordExhaustedError: Если невыданных паролей не хватает.
+
+    Yields:
+        bytes: Пакет паролей в кодировке UTF-8.
+    """
+    sizes = _batch_sizes(count, batch_size)
+    if seen is None:
+        yield from _map_batches(
+            _render_generated_batch,
+            (mode, password_length, user_sequence, output_format),
+            sizes, workers)
+        return
+
+    unique = UniquePasswordGeneration(
+        create_generation(mode, password_length, user_sequence), seen)
+    for passwords in _map_batches(
+            generate_batch, (mode, password_length, user_sequence), sizes,
+            workers):
+        # при исчерпании ошибка до отметки: фильтр не теряет пароли
+        passwords = unique.filter(passwords, len(passwords), mark=False)
+        try:
+            yield render_batch(passwords, output_format)
+        finally:
+            # прерванная запись (BrokenPipeError) могла передать часть
+            # пакета читателю - такой пакет тоже считается выданным
+            unique.mark(passwords)
+
+
+def write_passwords(stream: BinaryIO, batches: Iterator[bytes]) -> int:
+    """
+    Записать пакеты в поток.
+
+    Returns:
+        int: Количество записанных байт.
+    """
+    written = 0
+    for chunk in batches:
+        stream.write(chunk)
+        written += len(chunk)
+    stream.flush()
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Сгенерировать пароли и вывести их в stdout или в файл."""
+    parser = argparse.ArgumentParser(
+        prog='python -m password_generator',
+        description='Пакетная генерация паролей в формате бота.')
+    parser.add_argument('mode', choices=(AUTOMATIC_MODE, CUSTOM_MODE),
+                        help='auto - 3 блока через "-", custom - '
+                             'последовательность пользователя и хвост.')
+    parser.add_argument('--count', type=int, default=1)
+    parser.add_argument('--length', type=int,
+                        help='Общая длина кастомного пароля (8-32).')
+    parser.add_argument('--sequence',
+                        help='Последовательность кастомного пароля.')
+    parser.add_argument('--format', dest='output_format',
+                        choices=(LINES_FORMAT, JSONL_FORMAT),
+                        default=LINES_FORMAT)
+    parser.add_argument('--output', help='Файл вывода, по умолчанию stdout.')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Количество процессов, 0 - по числу ядер.')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--unique',
+                        help='Файл фильтра выданных паролей: повторы '
+                             'прошлых запусков генерируются заново.')
+    parser.add_argument('--unique-capacity', type=int, default=10000000,
+                        help='Емкость нового файла фильтра.')
+    arguments = parser.parse_args(argv)
+
+    if arguments.count < 0 or arguments.batch_size < 1:
+        parser.error('--count и --batch-size должны быть положительными')
+    if arguments.mode == CUSTOM_MODE:
+        if arguments.length is None or arguments.sequence is None:
+            parser.error('для custom нужны --length и --sequence')
+        error = validate_user_data(password_length=arguments.length,
+                                   user_sequence=arguments.sequence)
+        if error is not None:
+            parser.error(str(error))
+    elif arguments.length is not None or arguments.sequence is not None:
+        parser.error('--length и --sequence задаются только для custom')
+
+    seen = None
+    if arguments.unique:
+        seen = BloomFilter(arguments.unique,
+                           capacity=arguments.unique_capacity)
+    batches = stream_passwords(
+        arguments.mode, arguments.count,
+        password_length=arguments.length,
+        user_sequence=arguments.sequence,
+        output_format=arguments.output_format,
+        batch_size=arguments.batch_size,
+        workers=arguments.workers or os.cpu_count() or 1,
+        seen=seen)
+    try:
+        if arguments.output:
+            with open(arguments.output, 'wb',
+                      buffering=WRITE_BUFFER_SIZE) as stream:
+                write_passwords(stream, batches)
+        else:
+            write_passwords(sys.stdout.buffer, batches)
+    except BrokenPipeError:
+        # вывод закрыт раньше (например, '| head'): остаток не нужен
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    except PasswordExhaustedError as error:
+        print(error, file=sys.stderr)
+        return 1
+    finally:
+        # пакет прерванной записи отмечается до закрытия фильтра
+        batches.close()
+        if seen is not None:
+            seen.close()
+    return 0
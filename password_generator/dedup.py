@@ -0,0 +1,290 @@
+import hashlib
+import math
+import mmap
+import os
+import random
+import secrets
+import struct
+import threading
+from typing import Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: файл не разделяется между процессами
+    fcntl = None
+
+
+# заголовок файла: сигнатура, число блоков, емкость, число хэшей,
+# выдано паролей, ключ хэша
+_HEADER = struct.Struct('<8sQQIxxxxQ16s')
+_HEADER_SIZE = 64
+_MAGIC = b'GERRYBF1'
+_COUNT_OFFSET = 32
+# блок фильтра - 512 бит (одна кэш-линия): все биты пароля в одном блоке
+BLOCK_BYTES = 64
+BLOCK_BITS = BLOCK_BYTES * 8
+# маска битов пароля - объединение масок из _PATTERN_TABLES таблиц
+# по 2 ** _PATTERN_BITS случайных масок: несколько обращений к таблицам
+# вместо цикла по хэш-функциям
+_PATTERN_TABLES = 3
+_PATTERN_BITS = 11
+_MAX_HASHES = 30
+_BLOCK_OVERHEAD = 1.2
+
+
+class PasswordExhaustedError(RuntimeError):
+    """Не удалось получить невыданный пароль за max_attempts попыток."""
+
+
+class BloomFilter:
+    """
+    Блочный фильтр Блума выданных паролей в файле, отображенном в память.
+
+    В фильтре хранятся не пароли, а биты ключевого хэша BLAKE2b, поэтому
+    файл не раскрывает пароли. Ложноположительный ответ (пароль еще
+    не выдавался, а фильтр считает его выданным) возможен с вероятностью
+    порядка error_rate и стоит одной лишней генерации;
+    ложноотрицательных ответов нет. Фильтр на capacity паролей занимает
+    1.2 * -capacity * ln(error_rate) / ln(2)^2 бит: около 3.6 байт
+    на пароль при error_rate=1e-5 (на практике около 3e-5
+    ложноположительных при заполнении до capacity).
+
+    Все биты пароля лежат в одном 64-байтном блоке, а маска битов
+    собирается из таблиц случайных масок, построенных по ключу файла:
+    проверка - один хэш, одно чтение блока и несколько обращений
+    к таблицам.
+
+    Файл отображается через mmap и сохраняется ядром, отдельной записи
+    на диск не нужно. При shared=True добавление блокирует блок фильтра
+    (fcntl.lockf), и один файл могут использовать несколько процессов.
+
+    Args:
+        path (str): Путь к файлу фильтра. Если файл есть - параметры
+            берутся из него.
+        capacity (int) = 10000000: Ожидаемое количество паролей.
+        error_rate (float) = 1e-5: Доля ложноположительных ответов при
+            capacity паролях.
+        shared (bool) = True: Файл используют несколько процессов.
+
+    Raises:
+        ValueError: Если файл не является фильтром или параметры
+            некорректны.
+    """
+    def __init__(self, path: str, capacity: int = 10000000,
+                 error_rate: float = 1e-5, shared: bool = True) -> None:
+        self.path = path
+        self.shared = shared and fcntl is not None
+        self._lock = threading.Lock()
+        self._file = open(path, 'a+b')
+        try:
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() == 0:
+                self._create(capacity, error_rate)
+            self._open()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _create(self, capacity: int, error_rate: float) -> None:
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError('capacity должна быть > 0, error_rate - '
+                             'в интервале (0, 1)')
+        bits_per_password = -math.log(error_rate) / math.log(2) ** 2
+        hashes = min(_MAX_HASHES,
+                     max(1, round(bits_per_password * math.log(2))))
+        # блочный фильтр дает больше ложноположительных ответов, чем
+        # обычный того же размера: +20% памяти
+        blocks = math.ceil(capacity * bits_per_password * _BLOCK_OVERHEAD
+                           / BLOCK_BITS)
+        self._file.write(_HEADER.pack(_MAGIC, blocks, capacity, hashes, 0,
+                                      secrets.token_bytes(16)).ljust(
+            _HEADER_SIZE, b'\0'))
+        # нулевые блоки - разреженный файл
+        self._file.truncate(_HEADER_SIZE + blocks * BLOCK_BYTES)
+        self._file.flush()
+
+    def _open(self) -> None:
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.blocks, self.capacity, self.hashes, _, self._key = \
+            _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or len(self._map) != (
+                _HEADER_SIZE + self.blocks * BLOCK_BYTES):
+            self._map.close()
+            raise ValueError('{0} - не файл фильтра паролей'.format(
+                self.path))
+        self._hasher = hashlib.blake2b(digest_size=16, key=self._key)
+        # таблицы масок зависят только от ключа и одинаковы во всех
+        # процессах
+        generator = random.Random(self._key)
+        self._patterns = list()
+        for table in range(_PATTERN_TABLES):
+            bits = (self.hashes + table) // _PATTERN_TABLES
+            self._patterns.append([
+                sum(1 << bit
+                    for bit in generator.sample(range(BLOCK_BITS), bits))
+                for _ in range(1 << _PATTERN_BITS)])
+
+    def _locate(self, password: str):
+        """Смещение блока и маска битов пароля."""
+        hasher = self._hasher.copy()
+        hasher.update(password.encode('utf-8'))
+        digest = int.from_bytes(hasher.digest(), 'little')
+        block = (digest & 0xFFFFFFFFFFFFFFFF) % self.blocks
+        first, second, third = self._patterns
+        digest >>= 64
+        mask = first[digest & 0x7FF] | second[digest >> 11 & 0x7FF] | \
+            third[digest >> 22 & 0x7FF]
+        return _HEADER_SIZE + block * BLOCK_BYTES, mask
+
+    def __contains__(self, password: str) -> bool:
+        """Пароль (вероятно) уже выдавался."""
+        offset, mask = self._locate(password)
+        block = int.from_bytes(self._map[offset:offset + BLOCK_BYTES],
+                               'little')
+        return block & mask == mask
+
+    def add(self, password: str) -> bool:
+        """
+        Отметить пароль выданным.
+
+        Returns:
+            bool: False - пароль (вероятно) уже выдавался, фильтр
+                не изменился.
+        """
+        offset, mask = self._locate(password)
+        with self._lock:
+            if self.shared:
+                fcntl.lockf(self._file, fcntl.LOCK_EX, BLOCK_BYTES, offset)
+            try:
+                block = int.from_bytes(
+                    self._map[offset:offset + BLOCK_BYTES], 'little')
+                if block & mask == mask:
+                    return False
+                self._map[offset:offset + BLOCK_BYTES] = (
+                    block | mask).to_bytes(BLOCK_BYTES, 'little')
+            finally:
+                if self.shared:
+                    fcntl.lockf(self._file, fcntl.LOCK_UN, BLOCK_BYTES,
+                                offset)
+            # счетчик приблизительный при нескольких процессах
+            struct.pack_into('<Q', self._map, _COUNT_OFFSET, len(self) + 1)
+        return True
+
+    def __len__(self) -> int:
+        """Количество отмеченных паролей."""
+        return struct.unpack_from('<Q', self._map, _COUNT_OFFSET)[0]
+
+    def flush(self) -> None:
+        """Записать изменения на диск."""
+        self._map.flush()
+
+    def close(self) -> None:
+        """Записать изменения и закрыть файл."""
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+
+
+class UniquePasswordGeneration:
+    """
+    Генератор без повторов: каждый пароль отмечается в фильтре, а уже
+    выданный (или ложноположительный) генерируется заново.
+
+    generate_password и generate_many отмечают пароли сразу. В пуле бота
+    это значит, что пароли отмечаются при пополнении, а не при выдаче:
+    после перезапуска до size паролей пула пропадают, но ни один пароль
+    не выдается дважды. Кто может выдать пароли позже (cli), проверяет
+    их через filter(mark=False) и отмечает через mark.
+
+    Args:
+        generation: Генератор с методами generate_password и generate_many.
+        seen (BloomFilter): Фильтр выданных паролей.
+        max_attempts (int) = 100: Количество повторных генераций, после
+            которого пространство паролей считается исчерпанным.
+    """
+    def __init__(self, generation, seen: BloomFilter,
+                 max_attempts: int = 100) -> None:
+        self.generation = generation
+        self.seen = seen
+        self.max_attempts = max_attempts
+        self.regenerated = 0
+
+    def generate_password(self) -> str:
+        """
+        Сгенерировать невыданный пароль.
+
+        Raises:
+            PasswordExhaustedError: Если за max_attempts попыток все
+                пароли уже выдавались.
+        """
+        for _ in range(self.max_attempts):
+            password = self.generation.generate_password()
+            if self.seen.add(password):
+                return password
+            self.regenerated += 1
+        raise PasswordExhaustedError(
+            'Не удалось сгенерировать невыданный пароль.')
+
+    def generate_many(self, count: int) -> List[str]:
+        """
+        Сгенерировать count невыданных паролей пакетами.
+
+        Raises:
+            PasswordExhaustedError: Если за max_attempts пакетов
+                не набралось count паролей.
+        """
+        return self.filter(self.generation.generate_many(count), count)
+
+    def filter(self, passwords: List[str], count: int,
+               mark: bool = True) -> List[str]:
+        """
+        Оставить невыданные пароли и догенерировать недостающие до count.
+
+        Args:
+            passwords (List[str]): Пакет паролей.
+            count (int): Нужное количество паролей.
+            mark (bool) = True: Отметить пароли выданными. False - только
+                проверить (и убрать повторы внутри пакета), отметить их
+                потом через mark.
+
+        Raises:
+            PasswordExhaustedError: Если за max_attempts пакетов
+                не набралось count паролей. При mark=False фильтр
+                не изменяется.
+        """
+        if mark:
+            accept = self.seen.add
+        else:
+            pending = set()
+
+            def accept(password: str) -> bool:
+                if password in pending or password in self.seen:
+                    return False
+                pending.add(password)
+                return True
+
+        unique = [password for password in passwords if accept(password)]
+        for _ in range(self.max_attempts):
+            missing = count - len(unique)
+            if missing <= 0:
+                return unique
+            self.regenerated += missing
+            unique.extend(
+                password
+                for password in self.generation.generate_many(missing)
+                if accept(password))
+        if len(unique) < count:
+            raise PasswordExhaustedError(
+                'Не удалось сгенерировать {0} невыданных паролей.'.format(
+                    count))
+        return unique
+
+    def mark(self, passwords: List[str]) -> None:
+        """Отметить выданными пароли, проверенные filter(mark=False)."""
+        for password in passwords:
+            self.seen.add(password)
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика фильтра: issued, regenerated, capacity."""
+        return {'issued': len(self.seen), 'regenerated': self.regenerated,
+                'capacity': self.seen.capacity}
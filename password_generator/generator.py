@@ -1,44 +1,84 @@
-import random
-import string
-from typing import List
+from typing import List, Optional
+
+from .rng import RandomSource
+from .template import CHARACTER_CLASSES, PasswordTemplate, \
+    compile_template
+from .validation import find_invalid_characters, has_digit, \
+    validate_user_data
+
+
+# блок из 6 символов: согласная, гласная, согласная, ...; одна буква
+# в верхнем регистре, первый или последний символ - цифра
+BLOCK_PATTERN = 'cvccvc'
+BLOCK_LAYOUT = tuple(tuple(CHARACTER_CLASSES[name]) for name in BLOCK_PATTERN)
+BLOCK_LENGTH = len(BLOCK_LAYOUT)
+BLOCK_SEPARATOR = '-'
+
+# форма блока = позиция заглавной буквы (0..5) * 2 + сторона цифры (0 | 1)
+BLOCK_SHAPES = BLOCK_LENGTH * 2
+
+
+def block_template(blocks: int, prefix: str = '') -> PasswordTemplate:
+    """
+    Встроенный шаблон из blocks блоков через '-'.
+
+    Args:
+        blocks (int): Количество блоков.
+        prefix (str) = '': Литералы перед первым блоком.
+    """
+    return compile_template(
+        prefix + BLOCK_SEPARATOR.join([BLOCK_PATTERN] * blocks),
+        random_uppercase=True, random_edge_digit=True)
+
+
+# встроенные шаблоны генераторов
+BLOCK_TEMPLATE = block_template(1)
+AUTOMATIC_TEMPLATE = block_template(3)
+# хвост кастомного пароля после последовательности пользователя:
+# '-' и 6 блоков, обрезанные до остаточной длины
+CUSTOM_TAIL_TEMPLATE = block_template(6, prefix=BLOCK_SEPARATOR)
+# ветки генерации хвоста кастомного пароля по остаточной длине
+BRANCH_DIGIT = 'digit'
+BRANCH_LETTER_DIGIT = 'letter_digit'
+BRANCH_SEPARATOR_LETTER_DIGIT = 'separator_letter_digit'
+BRANCH_BLOCKS = 'blocks'
+# короткие хвосты: цифра, буква с цифрой
+CUSTOM_SHORT_TAIL_TEMPLATES = {
+    BRANCH_DIGIT: compile_template('d'),
+    BRANCH_LETTER_DIGIT: compile_template('ld'),
+    BRANCH_SEPARATOR_LETTER_DIGIT: compile_template(BLOCK_SEPARATOR + 'ld'),
+}
 
 
 class PasswordGeneratorMixin:
     """Миксин - генератор паролей."""
 
     @classmethod
-    def create_sequence(cls) -> str:
-        """Создать последовательность."""
-        vowels = ('a', 'e', 'i', 'o', 'u', 'y')
-        consonants = ('b', 'c', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm',
-                      'n', 'p', 'q', 'r', 's', 't', 'v', 'w', 'x', 'z')
-        random_digit = random.choice(tuple(string.digits))
-
-        # генерируем полную последовательность из букв
-        sequence = list()
-        for _ in range(2):
-            part_of_sequence = [
-                random.choice(consonants) if index % 2 != 0 else random.choice(
-                    vowels)
-                for index in range(1, 4)
-            ]
-            sequence.extend(part_of_sequence)
-
-        # заменяем одну рандомную букву на верхний регистр
-        letter_from_sequence = random.choice(sequence)
-        index_letter = sequence.index(letter_from_sequence)
-        sequence[index_letter] = letter_from_sequence.upper()
-
-        # заменяем в начале или на конце последовательности букву на цифру
-        # 1 - в начало  2 - в конец
-        choice = random.randrange(1, 3)
-        if choice == 1:
-            sequence[0] = random_digit
-        elif choice == 2:
-            sequence[len(sequence) - 1] = random_digit
-
-        sequence_to_string = ''.join(sequence)
-        return sequence_to_string
+    def create_sequence(cls, rng: Optional[RandomSource] = None) -> str:
+        """Создать последовательность (блок BLOCK_TEMPLATE)."""
+        return BLOCK_TEMPLATE.generate(rng=rng)
+
+    @classmethod
+    def create_many_sequences(
+            cls, count: int,
+            rng: Optional[RandomSource] = None) -> List[str]:
+        """
+        Создать count последовательностей одним пакетом.
+
+        Формат совпадает с create_sequence: 6 символов, одна цифра в начале
+        или в конце и не больше одной заглавной буквы. Позиция заглавной
+        буквы выбирается равномерно; если она совпала с позицией цифры
+        (2 из BLOCK_SHAPES форм), цифра заменяет ее и в блоке нет
+        заглавных букв.
+
+        Args:
+            count (int): Количество последовательностей.
+            rng (RandomSource) = None: Источник случайности.
+
+        Returns:
+            List[str]: Последовательности.
+        """
+        return BLOCK_TEMPLATE.generate_many(count, rng=rng)
 
 
 class AutomaticPasswordGeneration(PasswordGeneratorMixin):
@@ -47,9 +87,13 @@ class AutomaticPasswordGeneration(PasswordGeneratorMixin):
 
     Args:
         auto_gen (bool) = False: Инициализирует класс = True.
+        rng (RandomSource) = None: Источник случайности, по умолчанию -
+            rng.get_random_source() на момент генерации.
     """
-    def __init__(self, auto_gen: bool = False) -> None:
+    def __init__(self, auto_gen: bool = False,
+                 rng: Optional[RandomSource] = None) -> None:
         self.auto_gen = auto_gen
+        self.rng = rng
 
     def generate_password(self) -> str:
         """
@@ -62,12 +106,25 @@ class AutomaticPasswordGeneration(PasswordGeneratorMixin):
         if not self.__user_command_check():
             raise NameError('Неправильно инициирован класс.')
 
-        password_by_parts = [
-            self.create_sequence()
-            for _ in range(3)
-        ]
-        ready_password = '-'.join(password_by_parts)
-        return ready_password
+        return AUTOMATIC_TEMPLATE.generate(rng=self.rng)
+
+    def generate_many(self, count: int) -> List[str]:
+        """
+        Сгенерировать count полных паролей одним пакетом.
+
+        Args:
+            count (int): Количество паролей.
+
+        Raises:
+            NameError('Неправильно инициирован класс.'):
+                Если неправильно инициирован класс.
+
+        Returns:
+            List[str]: Пароли в формате generate_password.
+        """
+        if not self.__user_command_check():
+            raise NameError('Неправильно инициирован класс.')
+        return AUTOMATIC_TEMPLATE.generate_many(count, rng=self.rng)
 
     def __user_command_check(self) -> bool:
         """Проверить - пользователь выбрал автоматическую генерацию пароля."""
@@ -83,58 +140,78 @@ class CustomGenerationPassword(PasswordGeneratorMixin):
     Args:
         password_length (int): Длина пароля пользователя.
         user_sequence (str): Последовательность пользователя.
+        rng (RandomSource) = None: Источник случайности, по умолчанию -
+            rng.get_random_source() на момент генерации.
     """
-    def __init__(self, password_length: int, user_sequence: str) -> None:
+    def __init__(self, password_length: int, user_sequence: str,
+                 rng: Optional[RandomSource] = None) -> None:
         self.password_length = password_length
         self.user_sequence = user_sequence
+        self.rng = rng
 
     def generate_password(self) -> str:
         """
         Сгенерировать полный пароль с учетом последовательности от пользователя
         """
-        random_letters = random.choice(string.ascii_lowercase)
-        random_digit = random.choice(string.digits)
         ready_password = None
-
-        # сформировать пароль в зависимости от остаточной длины
         if self.__general_validation_of_data_from_user():
-            remaining_length = self.find_remaining_password_length()
-            if remaining_length == 1:
-                ready_password = '{0}{1}'.format(
-                    self.user_sequence,
-                    random_digit
-                )
-            elif remaining_length < 3:
-                ready_password = '{0}{1}{2}'.format(
-                    self.user_sequence,
-                    random_letters,
-                    random_digit
-                )
-            elif remaining_length == 3:
-                ready_password = '{0}-{1}{2}'.format(
-                    self.user_sequence,
-                    random_letters,
-                    random_digit
-                )
-            else:
-                password_by_parts = [
-                    self.create_sequence()
-                    for _ in range(6)
-                ]
-                ready_password = '{0}-{1}'.format(
-                    self.user_sequence,
-                    '-'.join(password_by_parts)
-                )[:self.password_length]
-
-            if not self.check_for_numbers_in_sequence(sequence=ready_password):
-                sequence_without_last_character = list(ready_password)
-                sequence_without_last_character.pop()
-                ready_password = '{0}{1}'.format(
-                    ''.join(sequence_without_last_character),
-                    random_digit
-                )
+            ready_password = self.user_sequence + \
+                self.__tail_template().generate(rng=self.rng)
         return ready_password
 
+    def generate_many(self, count: int) -> List[str]:
+        """
+        Сгенерировать count паролей с последовательностью пользователя.
+
+        Данные пользователя проверяются один раз, случайность для всех
+        паролей берется пакетно.
+
+        Args:
+            count (int): Количество паролей.
+
+        Returns:
+            List[str]: Пароли в формате generate_password.
+        """
+        self.__general_validation_of_data_from_user()
+        return [self.user_sequence + tail
+                for tail in self.__tail_template().generate_many(
+                    count, rng=self.rng)]
+
+    def __tail_template(self) -> PasswordTemplate:
+        """
+        Встроенный шаблон хвоста пароля по остаточной длине.
+
+        Хвост генерируется ровно нужной длины. Если в последовательности
+        пользователя нет цифры, она есть в хвосте по построению шаблона
+        (ensure_digit), а не заменой последнего символа после генерации.
+        """
+        branch = self.find_branch()
+        if branch == BRANCH_BLOCKS:
+            template = CUSTOM_TAIL_TEMPLATE.prefix(
+                self.find_remaining_password_length())
+        else:
+            template = CUSTOM_SHORT_TAIL_TEMPLATES[branch]
+        if self.check_for_numbers_in_sequence(sequence=self.user_sequence):
+            return template
+        return template.prefix(template.length, ensure_digit=True)
+
+    def find_branch(self) -> str:
+        """
+        Найти ветку генерации хвоста по остаточной длине пароля.
+
+        Returns:
+            str: Одна из BRANCH_DIGIT, BRANCH_LETTER_DIGIT,
+                BRANCH_SEPARATOR_LETTER_DIGIT, BRANCH_BLOCKS.
+        """
+        remaining_length = self.find_remaining_password_length()
+        if remaining_length == 1:
+            return BRANCH_DIGIT
+        if remaining_length < 3:
+            return BRANCH_LETTER_DIGIT
+        if remaining_length == 3:
+            return BRANCH_SEPARATOR_LETTER_DIGIT
+        return BRANCH_BLOCKS
+
     def find_remaining_password_length(self):
         """Найти оставшуюся длину пароля."""
         remaining_length = self.password_length - len(self.user_sequence)
@@ -154,17 +231,7 @@ class CustomGenerationPassword(PasswordGeneratorMixin):
                 Пустой - если некорректные символы не найдены,
                 С некорректными символами - если некорректные символы найдены.
         """
-        char_whitespace = list(string.whitespace)
-        invalid_characters = [
-            '?', '#', '<', '>', '%', '@', '/', '\\', '~', '`', '"', ':',
-        ]
-        invalid_characters.extend(char_whitespace)
-
-        found_invalid_characters = [
-            symbol for symbol in sequence
-            if symbol in invalid_characters
-        ]
-        return found_invalid_characters
+        return find_invalid_characters(sequence)
 
     @classmethod
     def check_for_numbers_in_sequence(cls, sequence: str) -> bool:
@@ -174,59 +241,18 @@ class CustomGenerationPassword(PasswordGeneratorMixin):
         Args:
             sequence (str): Последовательность для проверки.
         """
-        digits = list(string.digits)
-        digit_in_sequence = any(
-            map(lambda symbol: symbol in digits, sequence)
-        )
-        return digit_in_sequence
+        return has_digit(sequence)
 
     def __general_validation_of_data_from_user(self) -> bool:
-        """Общая проверка на валидность данных от пользователя."""
-        if not self.__check_number_of_characters_for_validity():
-            raise ValueError(
-                'Длина пароля должна быть в интервале от 8 до 32'
-            )
-        if not self.__check_incorrect_sequence_length_from_user():
-            raise ValueError(
-                'Длина введенной последовательности больше общей длины пароля.'
-            )
-        if not self.__check_sequence_for_cyrillic_characters():
-            raise ValueError(
-                'Недопустима последовательность содержащая кириллицу.'
-            )
-        invalid_characters = self.check_for_invalid_characters_in_sequence(
-            sequence=self.user_sequence
-        )
-        if len(invalid_characters) > 0:
-            raise ValueError(
-                '{0} - недопустимые символы в последовательности.'.format(
-                    invalid_characters
-                )
-            )
-        return True
-
-    def __check_number_of_characters_for_validity(self) -> bool:
-        """Проверить количество символов на валидность."""
-        minimum_length = 8
-        maximum_length = 32
-        if minimum_length <= self.password_length <= maximum_length:
-            return True
-        return False
-
-    def __check_incorrect_sequence_length_from_user(self) -> bool:
-        """Проверить - корректную длину введенной последовательности."""
-        if len(self.user_sequence) > self.password_length:
-            return False
-        return True
+        """
+        Общая проверка на валидность данных от пользователя.
 
-    def __check_sequence_for_cyrillic_characters(self):
-        """Проверить последовательность пользователя на символы кириллицы."""
-        alphabet = ["а", "б", "в", "г", "д", "е", "ё", "ж", "з", "и", "й", "к",
-                    "л", "м", "н", "о", "п", "р", "с", "т", "у", "ф", "х", "ц",
-                    "ч", "ш", "щ", "ъ", "ы", "ь", "э", "ю", "я"]
-        cyrillic_characters_in_sequence = any(
-            map(lambda symbol: symbol.lower() in alphabet, self.user_sequence)
-        )
-        if cyrillic_characters_in_sequence:
-            return False
+        Raises:
+            PasswordValidationError: Если данные некорректны (код ошибки
+                в атрибуте code).
+        """
+        error = validate_user_data(password_length=self.password_length,
+                                   user_sequence=self.user_sequence)
+        if error is not None:
+            raise error
         return True
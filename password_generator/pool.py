@@ -0,0 +1,122 @@
+import collections
+import threading
+from typing import Dict
+
+
+class PasswordPool:
+    """
+    Ограниченный потокобезопасный пул заранее сгенерированных паролей.
+
+    Фоновый поток пополняет пул пакетом (generate_many), когда количество
+    паролей опускается ниже нижней границы. Каждый пароль выдается ровно
+    один раз: извлечение из deque атомарно.
+
+    Args:
+        generation: Генератор с методами generate_password и generate_many.
+        size (int): Максимальное количество паролей в пуле.
+        low_water_mark (int): Нижняя граница, ниже которой пул пополняется.
+        collect_stats (bool) = True: Считать попадания и промахи.
+    """
+    def __init__(self, generation, size: int, low_water_mark: int,
+                 collect_stats: bool = True) -> None:
+        if size <= 0:
+            raise ValueError('Размер пула должен быть больше 0.')
+        if not 0 <= low_water_mark < size:
+            raise ValueError(
+                'Нижняя граница пула должна быть в интервале от 0 до {0}'
+                ' (не включительно).'.format(size))
+        self.generation = generation
+        self.size = size
+        self.low_water_mark = low_water_mark
+        self.collect_stats = collect_stats
+        self.hits = 0
+        self.misses = 0
+
+        self._passwords = collections.deque()
+        self._stats_lock = threading.Lock()
+        # один пополняющий поток за раз: иначе два fill посчитают одну
+        # нехватку и пул превысит size
+        self._fill_lock = threading.Lock()
+        self._refill_needed = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def start(self) -> None:
+        """Запустить фоновое пополнение пула."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._refill_loop,
+                                        name='password-pool-refill',
+                                        daemon=True)
+        self._worker.start()
+        self._refill_needed.set()
+
+    def stop(self, timeout: float = None) -> None:
+        """Остановить фоновое пополнение пула."""
+        self._stopped.set()
+        self._refill_needed.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+
+    def get(self) -> str:
+        """
+        Выдать пароль из пула.
+
+        Если пул пуст - пароль генерируется на месте (промах).
+
+        Returns:
+            str: Пароль, который больше не будет выдан.
+        """
+        try:
+            password = self._passwords.popleft()
+            hit = True
+        except IndexError:
+            password = self.generation.generate_password()
+            hit = False
+
+        if self.collect_stats:
+            with self._stats_lock:
+                if hit:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        if len(self._passwords) < self.low_water_mark or not hit:
+            self._refill_needed.set()
+        return password
+
+    def fill(self) -> int:
+        """
+        Дополнить пул до максимального размера.
+
+        Returns:
+            int: Количество добавленных паролей.
+        """
+        with self._fill_lock:
+            missing = self.size - len(self._passwords)
+            if missing <= 0:
+                return 0
+            self._passwords.extend(self.generation.generate_many(missing))
+        return missing
+
+    def stats(self) -> Dict[str, int]:
+        """Текущий размер пула и счетчики попаданий/промахов."""
+        with self._stats_lock:
+            return {
+                'size': len(self._passwords),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __len__(self) -> int:
+        return len(self._passwords)
+
+    def _refill_loop(self) -> None:
+        """Пополнять пул по сигналу до остановки."""
+        while not self._stopped.is_set():
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            if self._stopped.is_set():
+                break
+            self.fill()
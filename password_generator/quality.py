@@ -0,0 +1,463 @@
+import argparse
+import array
+import collections
+import math
+import string
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .generator import BLOCK_LAYOUT, BLOCK_LENGTH, BLOCK_SEPARATOR, \
+    BLOCK_SHAPES, AutomaticPasswordGeneration, CustomGenerationPassword, \
+    PasswordGeneratorMixin
+from .strength import AUTOMATIC_KEYSPACE_BITS, block_collision_keyspace, \
+    block_keyspace, custom_keyspace_bits
+
+
+# ожидаемое распределение символа в каждой позиции пароля
+PositionModel = List[Dict[str, float]]
+
+# хэши для поиска повторов раскладываются по корзинам по младшим битам
+DUPLICATE_BUCKETS = 256
+
+_EPSILON = 1e-15
+_TINY = 1e-300
+
+
+class PositionResult(NamedTuple):
+    """
+    Результат критерия хи-квадрат для одной позиции пароля.
+
+    Attributes:
+        position (int): Позиция символа.
+        statistic (float): Статистика хи-квадрат.
+        dof (int): Число степеней свободы (0 - позиция фиксирована).
+        p_value (float): Вероятность получить такое же или большее
+            отклонение от ожидаемого распределения.
+        unexpected (int): Символы, которых не может быть в позиции.
+    """
+    position: int
+    statistic: float
+    dof: int
+    p_value: float
+    unexpected: int
+
+
+class QualityReport(NamedTuple):
+    """
+    Сводка статистической проверки генератора.
+
+    Attributes:
+        count (int): Количество проверенных паролей.
+        positions (List[PositionResult]): Результаты по позициям.
+        duplicates (int): Повторившиеся пароли (сверх первого вхождения).
+        expected_duplicates (Optional[float]): Ожидаемое количество
+            повторов (None - пространство генератора неизвестно).
+    """
+    count: int
+    positions: List[PositionResult]
+    duplicates: int
+    expected_duplicates: Optional[float]
+
+    @property
+    def duplicate_rate(self) -> float:
+        """Доля повторившихся паролей."""
+        return self.duplicates / self.count if self.count else 0.0
+
+    @property
+    def min_p_value(self) -> float:
+        """Наименьшее p-value среди позиций с выбором символа."""
+        return min((result.p_value for result in self.positions
+                    if result.dof), default=1.0)
+
+    def passed(self, alpha: float = 1e-6) -> bool:
+        """
+        Проверить, что отклонений от модели не найдено.
+
+        Порог alpha делится на количество позиций (поправка Бонферрони).
+        Повторы сравниваются с ожидаемыми по парадоксу дней рождения:
+        допускается ожидание плюс 6 стандартных отклонений.
+
+        Args:
+            alpha (float) = 1e-6: Уровень значимости на весь пароль.
+        """
+        tested = sum(1 for result in self.positions if result.dof) or 1
+        if any(result.unexpected for result in self.positions):
+            return False
+        if self.min_p_value < alpha / tested:
+            return False
+        if self.expected_duplicates is None:
+            return True
+        return self.duplicates <= (self.expected_duplicates
+                                   + 6 * math.sqrt(self.expected_duplicates)
+                                   + 1)
+
+
+def _gamma_series(a: float, x: float) -> float:
+    """Регуляризованная нижняя неполная гамма-функция P(a, x), ряд."""
+    term = total = 1.0 / a
+    denominator = a
+    while abs(term) > abs(total) * _EPSILON:
+        denominator += 1
+        term *= x / denominator
+        total += term
+    return total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def _gamma_continued_fraction(a: float, x: float) -> float:
+    """Регуляризованная верхняя неполная гамма-функция Q(a, x), дробь."""
+    b = x + 1 - a
+    c = 1 / _TINY
+    d = 1 / b
+    result = d
+    step = 1
+    while True:
+        an = -step * (step - a)
+        b += 2
+        d = an * d + b
+        d = d if abs(d) > _TINY else _TINY
+        c = b + an / c
+        c = c if abs(c) > _TINY else _TINY
+        d = 1 / d
+        delta = d * c
+        result *= delta
+        if abs(delta - 1) < _EPSILON:
+            break
+        step += 1
+    return result * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def chi_square_p_value(statistic: float, dof: int) -> float:
+    """
+    p-value критерия хи-квадрат: Q(dof / 2, statistic / 2).
+
+    Args:
+        statistic (float): Статистика хи-квадрат.
+        dof (int): Число степеней свободы (больше 0).
+
+    Returns:
+        float: Вероятность получить статистику не меньше данной.
+    """
+    if statistic <= 0:
+        return 1.0
+    a = dof / 2
+    x = statistic / 2
+    if x < a + 1:
+        return max(1.0 - _gamma_series(a, x), 0.0)
+    return _gamma_continued_fraction(a, x)
+
+
+def chi_square(observed: Dict[str, int], expected: Dict[str, float],
+               count: int) -> PositionResult:
+    """
+    Сравнить частоты символов позиции с ожидаемым распределением.
+
+    Args:
+        observed (Dict[str, int]): Количество каждого символа.
+        expected (Dict[str, float]): Вероятность каждого символа.
+        count (int): Всего символов в позиции.
+
+    Returns:
+        PositionResult: Результат без номера позиции (position = -1).
+    """
+    unexpected = sum(number for character, number in observed.items()
+                     if character not in expected)
+    statistic = 0.0
+    for character, probability in expected.items():
+        expected_number = probability * count
+        statistic += ((observed.get(character, 0) - expected_number) ** 2
+                      / expected_number)
+    dof = len(expected) - 1
+    p_value = chi_square_p_value(statistic, dof) if dof else 1.0
+    return PositionResult(position=-1, statistic=statistic, dof=dof,
+                          p_value=p_value, unexpected=unexpected)
+
+
+def _uniform(alphabet: Iterable[str], weight: float = 1.0
+             ) -> Dict[str, float]:
+    alphabet = tuple(alphabet)
+    return {character: weight / len(alphabet) for character in alphabet}
+
+
+def _add(distribution: Dict[str, float], other: Dict[str, float]) -> None:
+    for character, probability in other.items():
+        distribution[character] = distribution.get(character, 0.0) \
+            + probability
+
+
+def block_model(length: int, digit_fixup: bool = False) -> PositionModel:
+    """
+    Распределения первых length символов блока create_sequence.
+
+    Перебираются все 12 равновероятных форм блока (позиция заглавной
+    буквы и сторона цифры).
+
+    Args:
+        length (int): Количество символов блока (до 6).
+        digit_fixup (bool) = False: Если в этих символах нет цифры,
+            последний заменяется случайной цифрой (как в
+            CustomGenerationPassword).
+
+    Returns:
+        PositionModel: Распределения по позициям.
+    """
+    model = [dict() for _ in range(length)]
+    weight = 1 / BLOCK_SHAPES
+    for shape in range(BLOCK_SHAPES):
+        upper_position, digit_side = divmod(shape, 2)
+        digit_position = BLOCK_LENGTH - 1 if digit_side else 0
+        for position in range(length):
+            letters = BLOCK_LAYOUT[position]
+            if position == digit_position or (
+                    digit_fixup and position == length - 1
+                    and digit_position >= length):
+                alphabet = string.digits
+            elif position == upper_position:
+                alphabet = (letter.upper() for letter in letters)
+            else:
+                alphabet = letters
+            _add(model[position], _uniform(alphabet, weight))
+    return model
+
+
+def blocks_model(length: int, digit_fixup: bool = False) -> PositionModel:
+    """
+    Распределения строки из блоков через '-', обрезанной до length.
+
+    Args:
+        length (int): Длина строки.
+        digit_fixup (bool) = False: См. block_model (имеет значение,
+            только если в строке нет полного блока).
+    """
+    stride = BLOCK_LENGTH + 1
+    full_blocks, rest = divmod(length, stride)
+    model = list()
+    for _ in range(full_blocks):
+        model.extend(block_model(BLOCK_LENGTH))
+        model.append({BLOCK_SEPARATOR: 1.0})
+    model.extend(block_model(min(rest, BLOCK_LENGTH),
+                             digit_fixup=digit_fixup and not full_blocks
+                             and rest < BLOCK_LENGTH))
+    return model
+
+
+def automatic_model() -> PositionModel:
+    """Распределения автоматического пароля (3 блока)."""
+    return blocks_model(BLOCK_LENGTH * 3 + 2)
+
+
+def custom_model(password_length: int, user_sequence: str) -> PositionModel:
+    """
+    Распределения пароля CustomGenerationPassword.
+
+    Args:
+        password_length (int): Длина пароля.
+        user_sequence (str): Последовательность пользователя.
+    """
+    model = [{character: 1.0} for character in user_sequence]
+    remaining_length = password_length - len(user_sequence)
+    digits = _uniform(string.digits)
+    if remaining_length == 1:
+        return model + [digits]
+    letters = _uniform(string.ascii_lowercase)
+    if remaining_length < 3:
+        return model + [letters, digits]
+    if remaining_length == 3:
+        return model + [{BLOCK_SEPARATOR: 1.0}, letters, digits]
+    has_digit = any(character in string.digits for character in user_sequence)
+    return model + [{BLOCK_SEPARATOR: 1.0}] + blocks_model(
+        remaining_length - 1, digit_fixup=not has_digit)
+
+
+def custom_collision_bits(password_length: int, user_sequence: str) -> float:
+    """
+    log2 эффективного пространства кастомного пароля для оценки повторов
+    (1 / вероятность совпадения двух паролей).
+
+    Args:
+        password_length (int): Длина пароля.
+        user_sequence (str): Последовательность пользователя.
+    """
+    remaining_length = password_length - len(user_sequence)
+    if remaining_length <= 3:
+        # буква и цифра выбираются равномерно
+        return custom_keyspace_bits(password_length, user_sequence)
+    has_digit = any(character in string.digits for character in user_sequence)
+    return math.log2(block_collision_keyspace(remaining_length - 1,
+                                              digit_fixup=not has_digit))
+
+
+class QualityAccumulator:
+    """
+    Потоковая статистика паролей: частоты символов по позициям и повторы.
+
+    Пакет паролей склеивается в одну строку, и k-я позиция всех паролей
+    берется срезом с шагом длины пароля - частоты считаются Counter по
+    строке целиком. Для поиска повторов хранятся только 64-битные хэши
+    паролей в массивах по корзинам (8 байт на пароль), множество
+    строится по одной корзине за раз.
+
+    Args:
+        model (PositionModel): Ожидаемые распределения по позициям.
+        track_duplicates (bool) = True: Считать повторы.
+    """
+    def __init__(self, model: PositionModel,
+                 track_duplicates: bool = True) -> None:
+        self.model = model
+        self.length = len(model)
+        self.count = 0
+        self.counters = [collections.Counter() for _ in model]
+        self.track_duplicates = track_duplicates
+        self._buckets = [array.array('q')
+                         for _ in range(DUPLICATE_BUCKETS)]
+
+    def update(self, passwords: List[str]) -> None:
+        """
+        Добавить пакет паролей.
+
+        Raises:
+            ValueError: Если длина пароля не совпадает с моделью.
+        """
+        if not passwords:
+            return
+        joined = ''.join(passwords)
+        if len(joined) != self.length * len(passwords):
+            raise ValueError('Длина паролей должна быть {0}.'.format(
+                self.length))
+        for position, counter in enumerate(self.counters):
+            counter.update(joined[position::self.length])
+        if self.track_duplicates:
+            buckets = self._buckets
+            mask = DUPLICATE_BUCKETS - 1
+            for value in map(hash, passwords):
+                buckets[value & mask].append(value)
+        self.count += len(passwords)
+
+    def duplicates(self) -> int:
+        """Количество повторов (сверх первого вхождения)."""
+        return sum(len(bucket) - len(set(bucket))
+                   for bucket in self._buckets)
+
+    def report(self, keyspace_bits: Optional[float] = None
+               ) -> QualityReport:
+        """
+        Посчитать критерии по накопленной статистике.
+
+        Args:
+            keyspace_bits (float) = None: log2 эффективного пространства
+                генератора (1 / вероятность совпадения двух паролей) для
+                ожидаемого количества повторов.
+        """
+        positions = [
+            chi_square(counter, expected, self.count)._replace(
+                position=position)
+            for position, (counter, expected)
+            in enumerate(zip(self.counters, self.model))]
+        expected_duplicates = None
+        if keyspace_bits is not None and self.track_duplicates:
+            keyspace = 2.0 ** keyspace_bits
+            if self.count < keyspace * 1e-6:
+                # n * (n - 1) / 2K - точная формула здесь теряет точность
+                expected_duplicates = (self.count * (self.count - 1)
+                                       / (2 * keyspace))
+            else:
+                # n - K * (1 - (1 - 1 / K) ** n)
+                expected_duplicates = self.count + keyspace * math.expm1(
+                    self.count * math.log1p(-1 / keyspace))
+        return QualityReport(
+            count=self.count, positions=positions,
+            duplicates=self.duplicates() if self.track_duplicates else 0,
+            expected_duplicates=expected_duplicates)
+
+
+def check_generator(generate_many: Callable[[int], List[str]],
+                    model: PositionModel, count: int,
+                    batch_size: int = 100000,
+                    keyspace_bits: Optional[float] = None,
+                    track_duplicates: bool = True) -> QualityReport:
+    """
+    Сгенерировать count паролей пакетами и проверить их статистику.
+
+    Args:
+        generate_many (Callable[[int], List[str]]): Пакетный генератор.
+        model (PositionModel): Ожидаемые распределения по позициям.
+        count (int): Количество паролей.
+        batch_size (int) = 100000: Размер пакета.
+        keyspace_bits (float) = None: log2 эффективного пространства
+            генератора (см. QualityAccumulator.report).
+        track_duplicates (bool) = True: Считать повторы.
+
+    Returns:
+        QualityReport: Сводка проверки.
+    """
+    accumulator = QualityAccumulator(model, track_duplicates)
+    remaining = count
+    while remaining > 0:
+        batch = min(batch_size, remaining)
+        accumulator.update(generate_many(batch))
+        remaining -= batch
+    return accumulator.report(keyspace_bits)
+
+
+def _sources(arguments: argparse.Namespace) -> Dict[str, tuple]:
+    """Проверяемые генераторы: имя -> (генератор, модель, пространство)."""
+    automatic = AutomaticPasswordGeneration(auto_gen=True)
+    custom = CustomGenerationPassword(password_length=arguments.length,
+                                      user_sequence=arguments.sequence)
+    return {
+        'sequences': (PasswordGeneratorMixin.create_many_sequences,
+                      block_model(BLOCK_LENGTH),
+                      math.log2(block_keyspace(BLOCK_LENGTH))),
+        'create_sequence': (
+            lambda count: [PasswordGeneratorMixin.create_sequence()
+                           for _ in range(count)],
+            block_model(BLOCK_LENGTH),
+            math.log2(block_keyspace(BLOCK_LENGTH))),
+        'automatic': (automatic.generate_many, automatic_model(),
+                      AUTOMATIC_KEYSPACE_BITS),
+        'custom': (custom.generate_many,
+                   custom_model(arguments.length, arguments.sequence),
+                   custom_collision_bits(arguments.length,
+                                         arguments.sequence)),
+    }
+
+
+def main() -> None:
+    """Проверить статистику генератора и вывести отчет."""
+    parser = argparse.ArgumentParser(
+        prog='python -m password_generator.quality',
+        description='Статистическая проверка генераторов паролей.')
+    parser.add_argument('--source', default='automatic',
+                        choices=('automatic', 'sequences', 'custom',
+                                 'create_sequence'),
+                        help='create_sequence - поштучный генератор '
+                             '(медленно).')
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=100000)
+    parser.add_argument('--length', type=int, default=20,
+                        help='Длина пароля для --source custom.')
+    parser.add_argument('--sequence', default='kadabra',
+                        help='Последовательность для --source custom.')
+    parser.add_argument('--alpha', type=float, default=1e-6)
+    arguments = parser.parse_args()
+
+    generate_many, model, keyspace_bits = _sources(arguments)[
+        arguments.source]
+    started = time.perf_counter()
+    report = check_generator(generate_many, model, arguments.count,
+                             batch_size=arguments.batch_size,
+                             keyspace_bits=keyspace_bits)
+    elapsed = time.perf_counter() - started
+
+    for result in report.positions:
+        print('{0:>3} chi2={1:>10.2f} dof={2:>3} p={3:.4g}{4}'.format(
+            result.position, result.statistic, result.dof, result.p_value,
+            ' unexpected={0}'.format(result.unexpected)
+            if result.unexpected else ''))
+    print('passwords: {0}, duplicates: {1} (expected {2:.3g}), '
+          '{3:.2f} s'.format(report.count, report.duplicates,
+                             report.expected_duplicates, elapsed))
+    print('PASSED' if report.passed(arguments.alpha) else 'FAILED')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import abc
+import itertools
+import os
+import random
+import threading
+import weakref
+from typing import Iterator, Optional, Sequence
+
+
+# байты случайности запрашиваются у источника блоками этого размера
+DEFAULT_BUFFER_SIZE = 4096
+
+
+class RandomSource(abc.ABC):
+    """
+    Источник случайных байтов для генераторов паролей.
+
+    Каждый поток читает свой буфер: байты запрашиваются у источника
+    блоками buffer_size (один системный вызов на блок), потоки не делят
+    состояние и не ждут друг друга. После fork буферы сбрасываются,
+    поэтому процессы пула не повторяют байты родителя.
+
+    Подклассы реализуют random_bytes.
+
+    Args:
+        buffer_size (int) = 4096: Размер блока буфера потока.
+    """
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.buffer_size = buffer_size
+        self._local = threading.local()
+        _SOURCES.add(self)
+
+    @abc.abstractmethod
+    def random_bytes(self, size: int) -> bytes:
+        """Получить size байтов у источника (без буфера)."""
+
+    def _stream(self) -> Iterator[int]:
+        while True:
+            yield from self.random_bytes(self.buffer_size)
+
+    def byte_iterator(self) -> Iterator[int]:
+        """Итератор случайных байтов (0..255) буфера текущего потока."""
+        try:
+            return self._local.iterator
+        except AttributeError:
+            iterator = self._local.iterator = self._stream()
+            return iterator
+
+    def token_bytes(self, size: int) -> bytes:
+        """
+        Получить size случайных байтов.
+
+        Короткие запросы обслуживаются из буфера потока, длинные (от
+        buffer_size) - одним запросом к источнику.
+        """
+        if size >= self.buffer_size:
+            return self.random_bytes(size)
+        return bytes(itertools.islice(self.byte_iterator(), size))
+
+    def randbelow(self, n: int) -> int:
+        """Равномерное целое в [0, n) без смещения по модулю."""
+        if n <= 0:
+            raise ValueError('n должно быть больше 0')
+        if n <= 256:
+            # один байт буфера без срезов
+            next_byte = self.byte_iterator().__next__
+            limit = 256 - 256 % n
+            value = next_byte()
+            while value >= limit:
+                value = next_byte()
+            return value % n
+        bits = (n - 1).bit_length()
+        size = (bits + 7) // 8
+        while True:
+            value = int.from_bytes(self.token_bytes(size), 'big') >> (
+                size * 8 - bits)
+            if value < n:
+                return value
+
+    def choice(self, sequence: Sequence):
+        """Случайный элемент непустой последовательности."""
+        return sequence[self.randbelow(len(sequence))]
+
+    def _reset(self) -> None:
+        self._local = threading.local()
+
+
+class SystemRandomSource(RandomSource):
+    """Криптографический источник: os.urandom (как secrets)."""
+
+    def random_bytes(self, size: int) -> bytes:
+        return os.urandom(size)
+
+
+class SeededRandomSource(RandomSource):
+    """
+    Детерминированный источник для тестов и воспроизведения: одинаковый
+    seed дает одинаковые пароли при одинаковой последовательности
+    вызовов в одном потоке. Не криптографический.
+
+    Args:
+        seed: Начальное значение random.Random.
+        buffer_size (int) = 256: Размер блока буфера потока.
+    """
+    def __init__(self, seed, buffer_size: int = 256) -> None:
+        super().__init__(buffer_size)
+        self._random = random.Random(seed)
+
+    def random_bytes(self, size: int) -> bytes:
+        return self._random.getrandbits(size * 8).to_bytes(size, 'little')
+
+
+_SOURCES = weakref.WeakSet()
+
+
+def _reset_sources() -> None:
+    for source in list(_SOURCES):
+        source._reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_sources)
+
+
+_default_source: RandomSource = SystemRandomSource()
+
+
+def get_random_source() -> RandomSource:
+    """Источник случайности по умолчанию для всех генераторов."""
+    return _default_source
+
+
+def set_random_source(source: Optional[RandomSource]) -> RandomSource:
+    """
+    Заменить источник по умолчанию (None - криптографический).
+
+    Returns:
+        RandomSource: Предыдущий источник.
+    """
+    global _default_source
+    previous = _default_source
+    _default_source = source if source is not None else SystemRandomSource()
+    return previous
@@ -0,0 +1,409 @@
+import bisect
+import collections
+import functools
+import itertools
+import math
+import re
+import string
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from .generator import BLOCK_LAYOUT, BLOCK_LENGTH, BLOCK_SHAPES
+
+
+# классы символов и их размеры для оценки по алфавиту
+CHARACTER_CLASSES = (
+    (frozenset(string.ascii_lowercase), len(string.ascii_lowercase)),
+    (frozenset(string.ascii_uppercase), len(string.ascii_uppercase)),
+    (frozenset(string.digits), len(string.digits)),
+    (frozenset(string.punctuation + ' '), len(string.punctuation) + 1),
+)
+# размер алфавита для символов вне ASCII (эмодзи, другие языки)
+OTHER_CHARACTERS_SIZE = 100
+_DIGITS = frozenset(string.digits)
+_ASCII_CHARACTERS = frozenset(string.ascii_letters + string.digits
+                              + string.punctuation + ' ')
+
+# последовательности клавиш и символов для поиска "прогулок"
+KEYBOARD_SEQUENCES = ('qwertyuiop', 'asdfghjkl', 'zxcvbnm',
+                      '1234567890', '0123456789', string.ascii_lowercase)
+MINIMUM_WALK_LENGTH = 3
+
+# уровни надежности: (верхняя граница в битах, уровень)
+STRENGTH_LEVELS = ((28, 'очень слабый'), (36, 'слабый'), (60, 'средний'),
+                   (128, 'надежный'))
+STRONGEST_LEVEL = 'очень надежный'
+
+_REPEAT = re.compile(r'(.)\1{2,}')
+
+
+def _walk_pattern() -> str:
+    """
+    Регулярное выражение для троек соседних клавиш/символов.
+
+    Тройки собраны в дерево по первым двум символам ('a(?:b[c]|s[d])'),
+    так regex проверяет в каждой позиции только подходящие ветки - это
+    в 2 с лишним раза быстрее простого перечисления троек.
+    """
+    tree: Dict[str, Dict[str, set]] = dict()
+    for keys in KEYBOARD_SEQUENCES:
+        for sequence in (keys, keys[::-1]):
+            for index in range(len(sequence) - MINIMUM_WALK_LENGTH + 1):
+                first, second, third = sequence[
+                    index:index + MINIMUM_WALK_LENGTH]
+                tree.setdefault(first, dict()).setdefault(
+                    second, set()).add(third)
+    branches = '|'.join(
+        '{0}(?:{1})'.format(re.escape(first), '|'.join(
+            '{0}[{1}]'.format(re.escape(second),
+                              re.escape(''.join(sorted(thirds))))
+            for second, thirds in sorted(seconds.items())))
+        for first, seconds in sorted(tree.items()))
+    # просмотр вперед - тройки могут перекрываться ('abcd')
+    return '(?=(?:{0}))'.format(branches)
+
+
+_WALK = re.compile(_walk_pattern())
+
+
+class PasswordStrength(NamedTuple):
+    """
+    Оценка надежности пароля.
+
+    Attributes:
+        length (int): Длина пароля.
+        charset_size (int): Размер алфавита по найденным классам символов.
+        charset_bits (float): length * log2(charset_size).
+        shannon_bits (float): Энтропия Шеннона по частотам символов
+            пароля, умноженная на длину.
+        penalty_bits (float): Сколько бит снято за повторы, клавиатурные
+            последовательности и последовательность пользователя.
+        keyspace_bits (Optional[float]): log2 пространства шаблона,
+            по которому сгенерирован пароль (None - неизвестен).
+        bits (float): Итоговая оценка в битах.
+        level (int): Уровень от 0 (очень слабый) до 4 (очень надежный).
+        label (str): Название уровня.
+    """
+    length: int
+    charset_size: int
+    charset_bits: float
+    shannon_bits: float
+    penalty_bits: float
+    keyspace_bits: Optional[float]
+    bits: float
+    level: int
+    label: str
+
+
+@functools.lru_cache(maxsize=None)
+def _block_prefix_patterns(length: int,
+                           digit_fixup: bool = False) -> Dict[tuple, tuple]:
+    """
+    Наборы режимов первых length символов блока create_sequence.
+
+    Форма блока (позиция заглавной буквы и сторона цифры) задает режим
+    каждой позиции. Разные наборы режимов дают непересекающиеся строки.
+
+    Args:
+        length (int): Количество символов блока.
+        digit_fixup (bool) = False: Если в символах нет цифры, последний
+            заменяется цифрой (как в CustomGenerationPassword).
+
+    Returns:
+        Dict[tuple, tuple]: Набор режимов -> (количество форм блока,
+            количество строк).
+    """
+    patterns = dict()
+    for shape in range(BLOCK_SHAPES):
+        upper_position, digit_side = divmod(shape, 2)
+        digit_position = BLOCK_LENGTH - 1 if digit_side else 0
+        pattern = [
+            'digit' if position == digit_position
+            else 'upper' if position == upper_position else 'lower'
+            for position in range(length)]
+        if digit_fixup and pattern and 'digit' not in pattern:
+            pattern[-1] = 'digit'
+        pattern = tuple(pattern)
+        shapes, strings = patterns.get(pattern, (0, math.prod(
+            len(string.digits) if mode == 'digit'
+            else len(BLOCK_LAYOUT[position])
+            for position, mode in enumerate(pattern))))
+        patterns[pattern] = (shapes + 1, strings)
+    return patterns
+
+
+def _block_prefix_keyspace(length: int, digit_fixup: bool = False) -> int:
+    """Количество различных первых length символов блока."""
+    return sum(strings for _, strings in _block_prefix_patterns(
+        length, digit_fixup).values())
+
+
+def _block_prefix_collision(length: int, digit_fixup: bool = False) -> float:
+    """Вероятность совпадения первых length символов двух блоков."""
+    return sum((shapes / BLOCK_SHAPES) ** 2 / strings
+               for shapes, strings in _block_prefix_patterns(
+                   length, digit_fixup).values())
+
+
+def block_keyspace(length: int, digit_fixup: bool = False) -> int:
+    """
+    Пространство шаблона: первые length символов блоков create_sequence,
+    соединенных через '-'.
+
+    Args:
+        length (int): Длина строки из блоков.
+        digit_fixup (bool) = False: Если в строке нет цифры, последний
+            символ заменяется цифрой (возможно, только без полного блока).
+
+    Returns:
+        int: Количество различных строк.
+    """
+    full_blocks, rest = divmod(max(length, 0), BLOCK_LENGTH + 1)
+    return (_block_prefix_keyspace(BLOCK_LENGTH) ** full_blocks
+            * _block_prefix_keyspace(min(rest, BLOCK_LENGTH),
+                                     digit_fixup and not full_blocks))
+
+
+def block_collision_keyspace(length: int,
+                             digit_fixup: bool = False) -> float:
+    """
+    Эффективное пространство строки из блоков: 1 / вероятность
+    совпадения двух строк.
+
+    Формы блока дают строки с разной вероятностью (цифра выбирается из
+    10 символов, согласная - из 20), поэтому для оценки повторов
+    эффективное пространство меньше block_keyspace.
+
+    Args:
+        length (int): Длина строки из блоков.
+        digit_fixup (bool) = False: См. block_keyspace.
+    """
+    full_blocks, rest = divmod(max(length, 0), BLOCK_LENGTH + 1)
+    return 1 / (_block_prefix_collision(BLOCK_LENGTH) ** full_blocks
+                * _block_prefix_collision(min(rest, BLOCK_LENGTH),
+                                          digit_fixup and not full_blocks))
+
+
+# автоматический пароль - 3 блока через '-'
+AUTOMATIC_KEYSPACE_BITS = math.log2(block_keyspace(BLOCK_LENGTH * 3 + 2))
+
+
+def custom_keyspace_bits(password_length: int, user_sequence: str) -> float:
+    """
+    log2 пространства случайной части кастомного пароля.
+
+    Последовательность пользователя известна и в пространство не входит.
+    Ветки совпадают с CustomGenerationPassword.generate_password.
+
+    Args:
+        password_length (int): Длина пароля.
+        user_sequence (str): Последовательность пользователя.
+    """
+    remaining_length = password_length - len(user_sequence)
+    if remaining_length == 1:
+        return math.log2(len(string.digits))
+    if remaining_length <= 3:
+        return math.log2(len(string.ascii_lowercase) * len(string.digits))
+    has_digit = not _DIGITS.isdisjoint(user_sequence)
+    return math.log2(block_keyspace(remaining_length - 1,
+                                    digit_fixup=not has_digit))
+
+
+def strength_level(bits: float) -> int:
+    """Уровень надежности (0..4) по оценке в битах."""
+    for level, (upper_bound, _) in enumerate(STRENGTH_LEVELS):
+        if bits < upper_bound:
+            return level
+    return len(STRENGTH_LEVELS)
+
+
+def strength_label(level: int) -> str:
+    """Название уровня надежности."""
+    if level < len(STRENGTH_LEVELS):
+        return STRENGTH_LEVELS[level][1]
+    return STRONGEST_LEVEL
+
+
+def _charset_size(password: str) -> int:
+    """Размер алфавита по классам символов, найденным в пароле."""
+    characters = set(password)
+    size = 0
+    for characters_class, class_size in CHARACTER_CLASSES:
+        if not characters.isdisjoint(characters_class):
+            size += class_size
+    if not characters <= _ASCII_CHARACTERS:
+        size += OTHER_CHARACTERS_SIZE
+    return size
+
+
+def _count_log_count(count: int) -> float:
+    """count * log2(count) из таблицы (0 для 0)."""
+    if count >= len(_COUNT_LOG_COUNT):
+        _COUNT_LOG_COUNT.extend(
+            value * math.log2(value)
+            for value in range(len(_COUNT_LOG_COUNT), count * 2))
+    return _COUNT_LOG_COUNT[count]
+
+
+_COUNT_LOG_COUNT = [0.0] + [value * math.log2(value)
+                            for value in range(1, 65)]
+
+
+def _shannon_bits(password: str) -> float:
+    """Энтропия Шеннона частот символов, умноженная на длину."""
+    length = len(password)
+    if not length:
+        return 0.0
+    return _count_log_count(length) - sum(
+        map(_count_log_count, collections.Counter(password).values()))
+
+
+def score_many(passwords: Sequence[str], brand: Optional[str] = None,
+               keyspace_bits: Optional[float] = None
+               ) -> List[PasswordStrength]:
+    """
+    Оценить надежность пакета паролей.
+
+    Пароли склеиваются в одну строку через '\\n', и повторы,
+    клавиатурные последовательности и brand ищутся скомпилированными
+    регулярными выражениями за один проход по всему пакету. Для
+    каждого пароля остаются только операции над множеством его символов.
+
+    Символы внутри найденного шаблона (кроме первого; brand - целиком)
+    не добавляют log2(charset_size) бит, сам шаблон добавляет log2 своей
+    длины. Если известно пространство генератора (keyspace_bits), оценка
+    не превышает его.
+
+    Args:
+        passwords (Sequence[str]): Пароли без символа '\\n'.
+        brand (str) = None: Последовательность пользователя (бренд),
+            поиск без учета регистра.
+        keyspace_bits (float) = None: log2 пространства шаблона, по
+            которому сгенерированы пароли.
+
+    Raises:
+        ValueError: Если пароль содержит '\\n'.
+
+    Returns:
+        List[PasswordStrength]: Оценки в порядке паролей.
+    """
+    if not passwords:
+        return []
+    joined = '\n'.join(passwords)
+    if joined.count('\n') != len(passwords) - 1:
+        raise ValueError('Пароль не может содержать перевод строки.')
+    offsets = list(itertools.accumulate(
+        (len(password) + 1 for password in passwords[:-1]), initial=0))
+    lowered = joined.lower()
+
+    # по индексу пароля: маска символов внутри шаблонов и биты шаблонов
+    covered: Dict[int, bytearray] = dict()
+    pattern_bits: Dict[int, float] = dict()
+
+    def add_span(start: int, end: int, skip_first: bool) -> None:
+        index = bisect.bisect_right(offsets, start) - 1
+        offset = offsets[index]
+        mask = covered.get(index)
+        if mask is None:
+            mask = covered[index] = bytearray(len(passwords[index]))
+        first = start - offset + (1 if skip_first else 0)
+        mask[first:end - offset] = b'\x01' * (end - offset - first)
+        pattern_bits[index] = pattern_bits.get(index, 0.0) + math.log2(
+            end - start)
+
+    for match in _REPEAT.finditer(joined):
+        add_span(match.start(), match.end(), skip_first=True)
+
+    # тройки, начинающиеся подряд, - одна длинная последовательность
+    walk_start = previous_start = None
+    for match in _WALK.finditer(lowered):
+        start = match.start()
+        if walk_start is not None and start != previous_start + 1:
+            add_span(walk_start, previous_start + MINIMUM_WALK_LENGTH,
+                     skip_first=True)
+            walk_start = None
+        if walk_start is None:
+            walk_start = start
+        previous_start = start
+    if walk_start is not None:
+        add_span(walk_start, previous_start + MINIMUM_WALK_LENGTH,
+                 skip_first=True)
+
+    if brand:
+        for match in re.finditer(re.escape(brand.lower()), lowered):
+            add_span(match.start(), match.end(), skip_first=False)
+
+    scores = list()
+    for index, password in enumerate(passwords):
+        length = len(password)
+        charset_size = _charset_size(password)
+        bits_per_character = math.log2(charset_size) if charset_size else 0.0
+        charset_bits = length * bits_per_character
+        mask = covered.get(index)
+        if mask is None:
+            effective_bits = charset_bits
+        else:
+            effective_bits = ((length - mask.count(1)) * bits_per_character
+                              + pattern_bits[index])
+        bits = effective_bits if keyspace_bits is None \
+            else min(effective_bits, keyspace_bits)
+        level = strength_level(bits)
+        scores.append(PasswordStrength(
+            length=length,
+            charset_size=charset_size,
+            charset_bits=charset_bits,
+            shannon_bits=_shannon_bits(password),
+            penalty_bits=max(charset_bits - effective_bits, 0.0),
+            keyspace_bits=keyspace_bits,
+            bits=bits,
+            level=level,
+            label=strength_label(level)))
+    return scores
+
+
+def score_password(password: str, brand: Optional[str] = None,
+                   keyspace_bits: Optional[float] = None) -> PasswordStrength:
+    """Оценить надежность одного пароля (см. score_many)."""
+    return score_many([password], brand=brand, keyspace_bits=keyspace_bits)[0]
+
+
+def audit_passwords(passwords: Iterable[str], batch_size: int = 10000,
+                    brand: Optional[str] = None) -> Dict[str, float]:
+    """
+    Сводная оценка большого количества паролей (например, строк файла).
+
+    Пароли читаются пакетами по batch_size, в памяти одновременно
+    только один пакет.
+
+    Args:
+        passwords (Iterable[str]): Пароли.
+        batch_size (int) = 10000: Размер пакета.
+        brand (str) = None: Последовательность пользователя.
+
+    Returns:
+        Dict[str, float]: count, min_bits, mean_bits, max_bits,
+            penalized (пароли со снятыми битами) и количество паролей
+            по уровням ('level_0' ... 'level_4').
+    """
+    summary = {'count': 0, 'min_bits': math.inf, 'mean_bits': 0.0,
+               'max_bits': 0.0, 'penalized': 0}
+    levels = [0] * (len(STRENGTH_LEVELS) + 1)
+    total_bits = 0.0
+    iterator = iter(passwords)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        for score in score_many(batch, brand=brand):
+            total_bits += score.bits
+            summary['min_bits'] = min(summary['min_bits'], score.bits)
+            summary['max_bits'] = max(summary['max_bits'], score.bits)
+            summary['penalized'] += score.penalty_bits > 0
+            levels[score.level] += 1
+        summary['count'] += len(batch)
+    if summary['count']:
+        summary['mean_bits'] = total_bits / summary['count']
+    else:
+        summary['min_bits'] = 0.0
+    for level, count in enumerate(levels):
+        summary['level_{0}'.format(level)] = count
+    return summary
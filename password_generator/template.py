@@ -0,0 +1,511 @@
+import functools
+import itertools
+import math
+import string
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .rng import RandomSource, get_random_source
+
+
+VOWELS = ('a', 'e', 'i', 'o', 'u', 'y')
+CONSONANTS = ('b', 'c', 'd', 'f', 'g', 'h', 'j', 'k', 'l', 'm',
+              'n', 'p', 'q', 'r', 's', 't', 'v', 'w', 'x', 'z')
+
+# классы символов шаблона: заглавная буква класса - тот же алфавит
+# в верхнем регистре
+CHARACTER_CLASSES: Dict[str, str] = {
+    'c': ''.join(CONSONANTS),
+    'v': ''.join(VOWELS),
+    'l': string.ascii_lowercase,
+    'd': string.digits,
+}
+CHARACTER_CLASSES.update({
+    name.upper(): alphabet.upper()
+    for name, alphabet in list(CHARACTER_CLASSES.items())
+    if name != 'd'})
+# символ после '\\' в шаблоне - литерал, даже если это имя класса
+ESCAPE = '\\'
+
+# режимы символа блока: класс шаблона, верхний регистр, цифра
+_BASE_MODE = 0
+_UPPER_MODE = 1
+_DIGIT_MODE = 2
+_DIGITS = frozenset(string.digits)
+
+
+@functools.lru_cache(maxsize=None)
+def _rejection_tables(size: int) -> tuple:
+    """
+    Подготовить таблицы для равномерной выборки индексов из байтов.
+
+    Args:
+        size (int): Размер алфавита (от 1 до 256).
+
+    Returns:
+        tuple: Отбрасываемые байты и таблица перевода байта в индекс.
+    """
+    limit = 256 - 256 % size
+    rejected = bytes(range(limit, 256))
+    to_index = bytes(value % size for value in range(256))
+    return rejected, to_index
+
+
+def draw_indices(count: int, size: int,
+                 rng: Optional[RandomSource] = None) -> bytes:
+    """
+    Получить count равномерно распределенных индексов в диапазоне [0, size).
+
+    Случайность берется крупными буферами источника rng, байты вне
+    кратного size диапазона отбрасываются (без смещения по модулю), а
+    перевод в индексы выполняется одним вызовом bytes.translate.
+
+    Args:
+        count (int): Количество индексов.
+        size (int): Размер алфавита (от 1 до 256).
+        rng (RandomSource) = None: Источник случайности, по умолчанию -
+            get_random_source().
+
+    Returns:
+        bytes: Строка байтов длиной count, каждый байт - индекс.
+    """
+    token_bytes = (rng or get_random_source()).token_bytes
+    rejected, to_index = _rejection_tables(size)
+    buffer = b''
+    while len(buffer) < count:
+        missing = count - len(buffer)
+        # запас на отброшенные байты, чтобы обычно хватало одного буфера
+        chunk = token_bytes(missing + missing // 8 + 16)
+        buffer += chunk.translate(None, rejected)
+    return buffer[:count].translate(to_index)
+
+
+def _draw_table(items: Sequence) -> Tuple[Sequence, int]:
+    """
+    Таблица выбора элемента по одному случайному байту.
+
+    Returns:
+        Tuple[Sequence, int]: Элементы, повторенные до границы выборки,
+            и граница: байт меньше границы - индекс в таблице, иначе
+            байт отбрасывается. Граница 0 - элемент один, байт не нужен.
+    """
+    if len(items) == 1:
+        return items, 0
+    limit = 256 - 256 % len(items)
+    return (items * (256 // len(items)))[:limit], limit
+
+
+def _parse(pattern: str) -> List[Tuple[bool, str]]:
+    """
+    Разобрать шаблон на символы.
+
+    Returns:
+        List[Tuple[bool, str]]: (класс ли это, имя класса или литерал).
+
+    Raises:
+        ValueError: Если шаблон пустой, заканчивается на '\\' или
+            содержит не-ASCII или управляющий символ.
+    """
+    if not pattern:
+        raise ValueError('Шаблон пароля не может быть пустым.')
+    tokens = list()
+    characters = iter(pattern)
+    for character in characters:
+        if character == ESCAPE:
+            character = next(characters, None)
+            if character is None:
+                raise ValueError(
+                    'Шаблон не может заканчиваться на "{0}".'.format(ESCAPE))
+            tokens.append((False, character))
+        else:
+            tokens.append((character in CHARACTER_CLASSES, character))
+    # управляющие символы запрещены и потому, что generate_many делит
+    # пакет по '\n'
+    if not all(character.isascii() and character.isprintable()
+               for _, character in tokens):
+        raise ValueError('Шаблон пароля должен состоять из печатных ASCII '
+                         'символов.')
+    return tokens
+
+
+def _block_shapes(classes: str, random_uppercase: bool,
+                  random_edge_digit: bool) -> List[Tuple[int, ...]]:
+    """
+    Формы блока: режим каждого символа для каждого равновероятного
+    выбора позиций заглавной буквы и цифры.
+
+    Args:
+        classes (str): Классы символов блока.
+        random_uppercase (bool): Одна буква блока в верхнем регистре,
+            позиция выбирается равномерно среди строчных классов.
+        random_edge_digit (bool): Первый или последний символ блока
+            заменяется цифрой (цифра важнее заглавной буквы).
+
+    Returns:
+        List[Tuple[int, ...]]: Формы блока.
+    """
+    upper_positions = [None]
+    if random_uppercase:
+        upper_positions = [
+            position for position, name in enumerate(classes)
+            if name.islower()] or upper_positions
+    digit_positions = [None]
+    if random_edge_digit:
+        digit_positions = [0, len(classes) - 1]
+    shapes = list()
+    for upper_position, digit_position in itertools.product(
+            upper_positions, digit_positions):
+        shapes.append(tuple(
+            _DIGIT_MODE if position == digit_position
+            else _UPPER_MODE if position == upper_position else _BASE_MODE
+            for position in range(len(classes))))
+    return shapes
+
+
+class _Position:
+    """
+    План генерации одного символа пакетом.
+
+    Режимы символа используют общий размер индекса (НОК размеров
+    алфавитов), поэтому байт "смещение режима + индекс" переводится в
+    символ одной таблицей. Если это не помещается в байт, режимы
+    генерируются отдельно и выбираются по маске.
+
+    Args:
+        segment (int): Номер блока, формы которого задают режим.
+        alphabets (Tuple[str, ...]): Алфавиты по номеру режима (класс,
+            верхний регистр, цифры).
+        shape_modes (Tuple[int, ...]): Режим символа по номеру формы.
+    """
+    def __init__(self, segment: int, alphabets: Tuple[str, ...],
+                 shape_modes: Tuple[int, ...]) -> None:
+        self.segment = segment
+        self.modes = sorted(set(shape_modes))
+        self.alphabet = alphabets[self.modes[0]]
+        self.size = 1
+        for mode in self.modes:
+            size = len(alphabets[mode])
+            self.size = self.size * size // math.gcd(self.size, size)
+        self.masked = self.size * len(self.modes) > 256
+        if len(self.modes) == 1:
+            self.characters = _alphabet_table(self.alphabet)
+            return
+        if self.masked:
+            self.masks = [
+                bytes(0xff if shape < len(shape_modes)
+                      and shape_modes[shape] == mode else 0
+                      for shape in range(256))
+                for mode in self.modes]
+            self.tables = [(len(alphabets[mode]),
+                            _alphabet_table(alphabets[mode]))
+                           for mode in self.modes]
+            return
+        offsets = {mode: number * self.size
+                   for number, mode in enumerate(self.modes)}
+        self.offsets = bytes(
+            offsets[shape_modes[shape]] if shape < len(shape_modes) else 0
+            for shape in range(256))
+        characters = bytearray(256)
+        for mode, offset in offsets.items():
+            alphabet = alphabets[mode]
+            for index in range(self.size):
+                characters[offset + index] = ord(
+                    alphabet[index % len(alphabet)])
+        self.characters = bytes(characters)
+
+    def render(self, count: int, shapes: Optional[bytes],
+               rng: RandomSource) -> bytes:
+        """Сгенерировать символ для count паролей."""
+        if len(self.modes) == 1:
+            if len(self.alphabet) == 1:
+                return self.alphabet.encode('ascii') * count
+            return draw_indices(count, len(self.alphabet), rng).translate(
+                self.characters)
+        if self.masked:
+            combined = 0
+            for mask, (size, table) in zip(self.masks, self.tables):
+                characters = draw_indices(count, size, rng).translate(table)
+                combined |= (int.from_bytes(characters, 'big')
+                             & int.from_bytes(shapes.translate(mask), 'big'))
+            return combined.to_bytes(count, 'big')
+        # смещение режима и индекс складываются без переноса между байтами
+        combined = (int.from_bytes(shapes.translate(self.offsets), 'big')
+                    + int.from_bytes(draw_indices(count, self.size, rng),
+                                     'big'))
+        return combined.to_bytes(count, 'big').translate(self.characters)
+
+
+@functools.lru_cache(maxsize=None)
+def _alphabet_table(alphabet: str) -> bytes:
+    """Таблица перевода 'индекс -> символ алфавита'."""
+    table = bytearray(256)
+    table[:len(alphabet)] = alphabet.encode('ascii')
+    return bytes(table)
+
+
+# блок шаблона: алфавиты позиций по режимам и формы блока
+_Block = Tuple[Tuple[Tuple[str, str, str], ...], List[Tuple[int, ...]]]
+
+
+def _always_has_digit(block: _Block) -> bool:
+    """Есть ли цифра в каждой форме блока."""
+    alphabets, shapes = block
+    return all(
+        any(set(alphabets[position][mode]) <= _DIGITS
+            for position, mode in enumerate(shape))
+        for shape in shapes)
+
+
+class PasswordTemplate:
+    """
+    Скомпилированный шаблон пароля.
+
+    Шаблон - строка из классов символов (c - согласная, v - гласная,
+    l - буква, d - цифра; C, V, L - те же буквы в верхнем регистре) и
+    литералов (любой другой символ или символ после '\\'). Блок -
+    непрерывная последовательность классов между литералами, к каждому
+    блоку применяются правила:
+    random_uppercase - одна буква блока в верхнем регистре,
+    random_edge_digit - первый или последний символ блока - цифра.
+
+    При компиляции для каждого блока перечисляются равновероятные формы,
+    а для каждой позиции готовятся алфавиты и таблицы перевода, поэтому
+    генерация не разбирает шаблон.
+
+    Args:
+        pattern (str): Шаблон, например 'Cvcvcd-cvcvcv-dvcvcv'.
+        random_uppercase (bool) = False: Правило заглавной буквы блока.
+        random_edge_digit (bool) = False: Правило цифры блока.
+
+    Raises:
+        ValueError: Если шаблон некорректен.
+    """
+    def __init__(self, pattern: str, random_uppercase: bool = False,
+                 random_edge_digit: bool = False) -> None:
+        self.pattern = pattern
+        self.random_uppercase = random_uppercase
+        self.random_edge_digit = random_edge_digit
+        self.ensure_digit = False
+        # длина, если шаблон получен через prefix
+        self.prefix_length: Optional[int] = None
+
+        # блок: алфавиты позиций по режимам и список форм блока,
+        # литерал - блок из одной позиции с одной формой
+        blocks: List[_Block] = list()
+        for is_class, group in itertools.groupby(_parse(pattern),
+                                                 key=lambda token: token[0]):
+            names = ''.join(name for _, name in group)
+            if not is_class:
+                blocks.extend((((literal,) * 3,), [(_BASE_MODE,)])
+                              for literal in names)
+                continue
+            shapes = _block_shapes(names, random_uppercase,
+                                   random_edge_digit)
+            if len(shapes) > 256:
+                raise ValueError('Слишком длинный блок в шаблоне пароля.')
+            alphabets = tuple((CHARACTER_CLASSES[name],
+                               CHARACTER_CLASSES[name].upper(), string.digits)
+                              for name in names)
+            blocks.append((alphabets, shapes))
+        self._compile(blocks)
+
+    def _compile(self, blocks: List[_Block]) -> None:
+        """Подготовить формы сегментов и планы позиций."""
+        self._blocks = blocks
+        self._prefixes: Dict[Tuple[int, bool], PasswordTemplate] = dict()
+        # сегмент - список форм блока, форма - алфавиты его символов
+        self.segments: List[List[Tuple[str, ...]]] = list()
+        self._positions: List[_Position] = list()
+        # таблицы выбора формы и символов для поштучной генерации
+        self._draws: List[Tuple[Sequence, int]] = list()
+        for segment, (alphabets, shapes) in enumerate(blocks):
+            self.segments.append([
+                tuple(alphabets[position][mode]
+                      for position, mode in enumerate(shape))
+                for shape in shapes])
+            self._draws.append(_draw_table([
+                tuple(map(_draw_table, shape_alphabets))
+                for shape_alphabets in self.segments[-1]]))
+            for position, position_alphabets in enumerate(alphabets):
+                self._positions.append(_Position(
+                    segment, position_alphabets,
+                    tuple(shape[position] for shape in shapes)))
+        self.length = len(self._positions)
+
+    def __repr__(self) -> str:
+        representation = 'PasswordTemplate({0!r}, random_uppercase={1}, ' \
+                         'random_edge_digit={2})'.format(
+                             self.pattern, self.random_uppercase,
+                             self.random_edge_digit)
+        if self.prefix_length is not None:
+            representation += '.prefix({0}, ensure_digit={1})'.format(
+                self.prefix_length, self.ensure_digit)
+        return representation
+
+    def prefix(self, length: int,
+               ensure_digit: bool = False) -> 'PasswordTemplate':
+        """
+        Шаблон из первых length символов (результат кэшируется).
+
+        Обрезанный шаблон генерирует ровно length символов: последний
+        блок обрезается вместе со своими формами.
+
+        Args:
+            length (int): Длина префикса.
+            ensure_digit (bool) = False: Цифра в префиксе по построению:
+                если нет блока, где цифра есть в каждой форме, формы
+                последнего блока без цифры получают цифру последним
+                символом.
+
+        Raises:
+            ValueError: Если length больше длины шаблона или цифру
+                нельзя гарантировать (префикс кончается литералом).
+
+        Returns:
+            PasswordTemplate: Обрезанный шаблон (self, если обрезать
+                нечего).
+        """
+        if not 0 <= length <= self.length:
+            raise ValueError('Длина должна быть в интервале от 0 до {0}'
+                             ' (включительно).'.format(self.length))
+        key = (length, ensure_digit)
+        template = self._prefixes.get(key)
+        if template is not None:
+            return template
+
+        blocks = list()
+        remaining = length
+        for alphabets, shapes in self._blocks:
+            if not remaining:
+                break
+            blocks.append((alphabets[:remaining],
+                           [shape[:remaining] for shape in shapes]))
+            remaining -= len(blocks[-1][0])
+        if ensure_digit and any(map(_always_has_digit, blocks)):
+            # цифра уже есть в каждом пароле
+            template = self.prefix(length)
+            self._prefixes[key] = template
+            return template
+        if ensure_digit:
+            if not blocks or blocks[-1][0][-1][_DIGIT_MODE] != string.digits:
+                # префикс пустой или кончается литералом
+                raise ValueError('Шаблон не может гарантировать цифру.')
+            alphabets, shapes = blocks[-1]
+            blocks[-1] = (alphabets, [
+                shape if _always_has_digit((alphabets, [shape]))
+                else shape[:-1] + (_DIGIT_MODE,)
+                for shape in shapes])
+
+        if blocks == self._blocks:
+            template = self
+        else:
+            template = PasswordTemplate.__new__(PasswordTemplate)
+            template.pattern = self.pattern
+            template.random_uppercase = self.random_uppercase
+            template.random_edge_digit = self.random_edge_digit
+            template.ensure_digit = ensure_digit
+            template.prefix_length = length
+            template._compile(blocks)
+        self._prefixes[key] = template
+        return template
+
+    def generate(self, length: Optional[int] = None,
+                 rng: Optional[RandomSource] = None) -> str:
+        """
+        Сгенерировать один пароль (первые length символов шаблона).
+
+        Форма блока и каждый символ выбираются одним байтом буфера
+        потока (байты вне границы таблицы отбрасываются).
+
+        Args:
+            length (int) = None: Длина, по умолчанию длина шаблона.
+            rng (RandomSource) = None: Источник случайности, по умолчанию
+                - get_random_source().
+
+        Raises:
+            ValueError: Если length больше длины шаблона.
+        """
+        if length is not None and length != self.length:
+            return self.prefix(length).generate(rng=rng)
+        next_byte = (rng or get_random_source()).byte_iterator().__next__
+        characters = list()
+        append = characters.append
+        for shapes, limit in self._draws:
+            if limit:
+                value = next_byte()
+                while value >= limit:
+                    value = next_byte()
+                shape = shapes[value]
+            else:
+                shape = shapes[0]
+            for alphabet, limit in shape:
+                if limit:
+                    value = next_byte()
+                    while value >= limit:
+                        value = next_byte()
+                    append(alphabet[value])
+                else:
+                    append(alphabet)
+        return ''.join(characters)
+
+    def generate_many(self, count: int, length: Optional[int] = None,
+                      rng: Optional[RandomSource] = None) -> List[str]:
+        """
+        Сгенерировать count паролей пакетом (по столбцам).
+
+        Для каждого блока один раз выбираются формы всех паролей, каждая
+        позиция генерируется для всех паролей сразу, и строки собираются
+        срезами одного bytearray.
+
+        Args:
+            count (int): Количество паролей.
+            length (int) = None: Длина, по умолчанию длина шаблона.
+            rng (RandomSource) = None: Источник случайности, по умолчанию
+                - get_random_source().
+
+        Raises:
+            ValueError: Если length больше длины шаблона.
+
+        Returns:
+            List[str]: Пароли.
+        """
+        if length is not None and length != self.length:
+            return self.prefix(length).generate_many(count, rng=rng)
+        if count <= 0:
+            return []
+        if not self.length:
+            return [''] * count
+        rng = rng or get_random_source()
+        shapes = {
+            segment: draw_indices(count, len(segment_shapes), rng)
+            for segment, segment_shapes in enumerate(self.segments)
+            if len(segment_shapes) > 1}
+        stride = self.length + 1
+        rendered = bytearray(count * stride)
+        for index, position in enumerate(self._positions):
+            rendered[index::stride] = position.render(
+                count, shapes.get(position.segment), rng)
+        rendered[self.length::stride] = b'\n' * count
+        return rendered.decode('ascii').split('\n')[:-1]
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(pattern: str, random_uppercase: bool = False,
+                     random_edge_digit: bool = False) -> PasswordTemplate:
+    """
+    Скомпилировать шаблон пароля (результат кэшируется).
+
+    Args:
+        pattern (str): Шаблон, например 'Cvcvcd-cvcvcv-dvcvcv'.
+        random_uppercase (bool) = False: Одна буква каждого блока
+            в верхнем регистре.
+        random_edge_digit (bool) = False: Первый или последний символ
+            каждого блока - цифра.
+
+    Raises:
+        ValueError: Если шаблон некорректен.
+
+    Returns:
+        PasswordTemplate: Шаблон, готовый к генерации.
+    """
+    return PasswordTemplate(pattern, random_uppercase=random_uppercase,
+                            random_edge_digit=random_edge_digit)
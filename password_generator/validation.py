@@ -0,0 +1,102 @@
+import re
+import string
+from typing import List, Optional
+
+
+MINIMUM_PASSWORD_LENGTH = 8
+MAXIMUM_PASSWORD_LENGTH = 32
+
+# коды ошибок проверки данных пользователя
+PASSWORD_LENGTH_OUT_OF_RANGE = 'password_length_out_of_range'
+SEQUENCE_TOO_LONG = 'sequence_too_long'
+CYRILLIC_IN_SEQUENCE = 'cyrillic_in_sequence'
+INVALID_CHARACTERS = 'invalid_characters'
+
+ERROR_MESSAGES = {
+    PASSWORD_LENGTH_OUT_OF_RANGE:
+        'Длина пароля должна быть в интервале от 8 до 32',
+    SEQUENCE_TOO_LONG:
+        'Длина введенной последовательности больше общей длины пароля.',
+    CYRILLIC_IN_SEQUENCE:
+        'Недопустима последовательность содержащая кириллицу.',
+    INVALID_CHARACTERS:
+        '{0} - недопустимые символы в последовательности.',
+}
+
+CYRILLIC_CHARACTERS = frozenset(
+    'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+    'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ')
+INVALID_CHARACTERS_IN_SEQUENCE = frozenset(
+    '?#<>%@/\\~`":' + string.whitespace)
+
+# один проход по последовательности: кириллица или недопустимый символ
+_CHARACTER_CLASSIFIER = re.compile(
+    '(?P<cyrillic>[{0}])|(?P<invalid>[{1}])'.format(
+        re.escape(''.join(sorted(CYRILLIC_CHARACTERS))),
+        re.escape(''.join(sorted(INVALID_CHARACTERS_IN_SEQUENCE)))))
+_INVALID_CHARACTER = re.compile('[{0}]'.format(
+    re.escape(''.join(sorted(INVALID_CHARACTERS_IN_SEQUENCE)))))
+_DIGIT = re.compile('[0-9]')
+
+
+class PasswordValidationError(ValueError):
+    """
+    Ошибка проверки данных пользователя.
+
+    Args:
+        code (str): Код ошибки (ключ ERROR_MESSAGES).
+        invalid_characters (List[str]) = None: Найденные недопустимые
+            символы (для кода INVALID_CHARACTERS).
+    """
+    def __init__(self, code: str,
+                 invalid_characters: Optional[List[str]] = None) -> None:
+        self.code = code
+        self.invalid_characters = invalid_characters or []
+        message = ERROR_MESSAGES[code]
+        if code == INVALID_CHARACTERS:
+            message = message.format(self.invalid_characters)
+        super().__init__(message)
+
+
+def find_invalid_characters(sequence: str) -> List[str]:
+    """Найти недопустимые символы в последовательности (в порядке ввода)."""
+    return _INVALID_CHARACTER.findall(sequence)
+
+
+def has_digit(sequence: str) -> bool:
+    """Проверить наличие цифры в последовательности."""
+    return _DIGIT.search(sequence) is not None
+
+
+def validate_user_data(
+        password_length: int,
+        user_sequence: str) -> Optional[PasswordValidationError]:
+    """
+    Проверить длину пароля и последовательность пользователя.
+
+    Символы последовательности классифицируются за один проход
+    скомпилированным регулярным выражением. Порядок проверок и тексты
+    ошибок совпадают с CustomGenerationPassword.
+
+    Args:
+        password_length (int): Длина пароля пользователя.
+        user_sequence (str): Последовательность пользователя.
+
+    Returns:
+        Optional[PasswordValidationError]: Первая найденная ошибка
+            или None, если данные корректны.
+    """
+    if not (MINIMUM_PASSWORD_LENGTH <= password_length
+            <= MAXIMUM_PASSWORD_LENGTH):
+        return PasswordValidationError(PASSWORD_LENGTH_OUT_OF_RANGE)
+    if len(user_sequence) > password_length:
+        return PasswordValidationError(SEQUENCE_TOO_LONG)
+
+    invalid_characters = list()
+    for match in _CHARACTER_CLASSIFIER.finditer(user_sequence):
+        if match.lastgroup == 'cyrillic':
+            return PasswordValidationError(CYRILLIC_IN_SEQUENCE)
+        invalid_characters.append(match.group())
+    if invalid_characters:
+        return PasswordValidationError(INVALID_CHARACTERS, invalid_characters)
+    return None
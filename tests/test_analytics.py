@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from loguru import logger
+
+from GerryPasswordBot.gerry_bot import replies
+from GerryPasswordBot.gerry_bot.analytics import EventRecorder, \
+    SQLiteEventStore, recorder
+
+
+class AnalyticsTestCase(unittest.TestCase):
+    """Хранилище событий во временном файле."""
+
+    def setUp(self):
+        """Создать хранилище SQLiteEventStore во временном каталоге."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'analytics.sqlite3')
+        self.store = SQLiteEventStore(self.path)
+
+    def tearDown(self):
+        """Закрыть хранилище и удалить временный каталог."""
+        self.store.close()
+        self.directory.cleanup()
+
+    def rows(self):
+        """Все события из файла базы отдельным соединением."""
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(
+                'SELECT mode, password_length, branch, error '
+                'FROM generation_events ORDER BY id').fetchall()
+        finally:
+            connection.close()
+
+
+class TestEventRecorder(AnalyticsTestCase):
+    """Проверка очереди событий и пакетной записи."""
+
+    def test_disabled_without_store(self):
+        """Без хранилища события не собираются."""
+        events = EventRecorder()
+        events.record('automatic', 0.01)
+        self.assertFalse(events.enabled)
+        self.assertEqual(0, events.stats()['queued'])
+
+    def test_flush(self):
+        """События записываются одним пакетом при flush."""
+        events = EventRecorder()
+        events.configure(self.store)
+        events.record('automatic', 0.01, password_length=20, branch='pool')
+        events.record('custom', 0.02, password_length=8, branch='digit')
+        self.assertEqual([], self.rows())
+        self.assertEqual(2, events.flush())
+        self.assertEqual([('automatic', 20, 'pool', None),
+                          ('custom', 8, 'digit', None)], self.rows())
+        self.assertEqual({'queued': 0, 'written': 2, 'dropped': 0,
+                          'failed': 0}, events.stats())
+
+    def test_track(self):
+        """track замеряет время и записывает имя исключения."""
+        events = EventRecorder()
+        events.configure(self.store)
+        with events.track('custom', 12) as event:
+            event['branch'] = 'blocks'
+        with self.assertRaises(RuntimeError):
+            with events.track('custom', 12):
+                raise RuntimeError
+        events.flush()
+        self.assertEqual([('custom', 12, 'blocks', None),
+                          ('custom', 12, None, 'RuntimeError')], self.rows())
+
+    def test_queue_is_bounded(self):
+        """Сверх max_queue события отбрасываются."""
+        events = EventRecorder(max_queue=3)
+        events.configure(self.store)
+        for _ in range(5):
+            events.record('automatic', 0.01)
+        self.assertEqual(3, events.stats()['queued'])
+        self.assertEqual(2, events.stats()['dropped'])
+
+    def test_background_flush(self):
+        """Фоновый поток пишет по batch_size, stop - остаток очереди."""
+        events = EventRecorder(flush_interval=60, batch_size=2)
+        events.configure(self.store)
+        events.start()
+        try:
+            events.record('automatic', 0.01)
+            events.record('automatic', 0.01)
+            deadline = time.monotonic() + 5
+            while not self.rows() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(2, len(self.rows()))
+            events.record('automatic', 0.01)
+        finally:
+            events.stop(timeout=5)
+        self.assertEqual(3, len(self.rows()))
+
+    def test_summary(self):
+        """Сводка группирует события по режиму, ветке и ошибке."""
+        events = EventRecorder()
+        events.configure(self.store)
+        for _ in range(3):
+            events.record('custom', 0.01, 8, 'digit')
+        events.record('custom', 0.03, 40, error='password_length_out_of_range')
+        events.flush()
+        summary = {(row['branch'], row['error']): row
+                   for row in self.store.summary()}
+        self.assertEqual(2, len(summary))
+        self.assertEqual(3, summary['digit', None]['count'])
+        self.assertAlmostEqual(0.01, summary['digit', None]['mean_latency'])
+        self.assertAlmostEqual(
+            0.03,
+            summary[None, 'password_length_out_of_range']['max_latency'])
+        self.assertEqual([], self.store.summary(since=time.time() + 60))
+
+
+class TestCustomPasswordEvents(AnalyticsTestCase):
+    """События и лог кастомной генерации не содержат секретов."""
+
+    def setUp(self):
+        """Подключить общий журнал событий и перехват лога."""
+        super().setUp()
+        recorder.configure(self.store)
+        self.messages = []
+        self.handler_id = logger.add(self.messages.append, level='DEBUG')
+
+    def tearDown(self):
+        """Отключить журнал событий и перехват лога."""
+        logger.remove(self.handler_id)
+        recorder.flush()
+        recorder.configure(None)
+        super().tearDown()
+
+    def test_sequence_is_not_recorded(self):
+        """Последовательность пользователя не попадает в лог и события."""
+        replies.custom_password_reply(12, 'kadabra')
+        replies.custom_password_reply(12, 'kadabra!?')
+        recorder.flush()
+        self.assertEqual([('custom', 12, 'blocks', None),
+                          ('custom', 12, None, 'invalid_characters')],
+                         self.rows())
+        self.assertTrue(self.messages)
+        for message in self.messages:
+            self.assertNotIn('kadabra', message)
+            self.assertNotIn('?', message.record['message'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from loguru import logger
+from telebot import apihelper, types
+
+from GerryPasswordBot.gerry_bot.app import GerryBot, create_app
+from GerryPasswordBot.gerry_bot.metrics import registry as metrics_registry
+from GerryPasswordBot.gerry_bot_config import load_config
+
+
+class RecordingSender:
+    """Заглушка Bot API: запоминает вызванные методы."""
+
+    def __init__(self):
+        self.methods = list()
+
+    def __call__(self, method, url, **kwargs):
+        self.methods.append(url.rsplit('/', 1)[-1])
+        return FakeResponse()
+
+
+class FakeResponse:
+    status_code = 200
+    text = ('{"ok": true, "result": {"message_id": 1, "date": 0, '
+            '"chat": {"id": 42, "type": "private"}}}')
+
+    def json(self):
+        return {'ok': True, 'result': {'message_id': 1, 'date': 0,
+                                       'chat': {'id': 42,
+                                                'type': 'private'}}}
+
+
+class TestCreateApp(unittest.TestCase):
+    """Проверка фабрики бота."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.environ = {
+            'BOT_TOKEN': '1:TEST',
+            'LOG_PATH': os.path.join(self.directory.name, 'bot.log'),
+            'STICKERS_DIR': self.directory.name,
+            'STICKER_CACHE_PATH': os.path.join(self.directory.name,
+                                               'file_ids.json'),
+            'PASSWORD_POOL_SIZE': '10',
+            'PASSWORD_POOL_LOW_WATER_MARK': '2',
+        }
+        self.saved = apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL
+
+    def tearDown(self):
+        apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL = self.saved
+        logger.remove()
+        self.directory.cleanup()
+
+    def test_missing_token(self):
+        """Без токена - понятная ошибка, а не бот None."""
+        del self.environ['BOT_TOKEN']
+        with self.assertRaises(ValueError):
+            create_app(load_config(self.environ, dotenv=False))
+
+    def test_recreated_app_replaces_metrics(self):
+        """Повторно созданный бот не дублирует gauge-метрики."""
+        for _ in range(2):
+            create_app(load_config(self.environ, dotenv=False))
+        samples = [line for line in metrics_registry.render().splitlines()
+                   if line.startswith('gerry_bot_telegram_retries ')]
+        self.assertEqual(['gerry_bot_telegram_retries 0'], samples)
+
+    def test_handlers_are_registered(self):
+        """Фабрика регистрирует обработчики и отвечает на /start."""
+        app = create_app(load_config(self.environ, dotenv=False))
+        self.assertIsInstance(app, GerryBot)
+        self.assertEqual(len(app.bot.message_handlers), 3)
+        self.assertEqual(len(app.bot.callback_query_handlers), 3)
+
+        sender = RecordingSender()
+        apihelper.CUSTOM_REQUEST_SENDER = sender
+        app.bot.threaded = False
+        app.bot.process_new_updates([types.Update.de_json({
+            'update_id': 1,
+            'message': {
+                'message_id': 1, 'date': 0, 'text': '/start',
+                'chat': {'id': 42, 'type': 'private'},
+                'from': {'id': 42, 'is_bot': False, 'first_name': 'Gerry'},
+                'entities': [{'type': 'bot_command', 'offset': 0,
+                              'length': 6}]}})])
+        # стикера нет в каталоге - вместо него эмодзи
+        self.assertEqual(sender.methods,
+                         ['sendMessage', 'sendMessage', 'sendMessage'])
+        app.stop()
+
+    def test_config_is_read_on_demand(self):
+        """Настройки читаются из переданного окружения."""
+        config = load_config({'SHARD_WORKERS': '3'}, dotenv=False)
+        self.assertEqual(config['SHARD_WORKERS'], 3)
+        self.assertIsNone(config['BOT_TOKEN'])
+        self.assertEqual(config['TELEGRAM_POOL_SIZE'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from GerryPasswordBot.gerry_bot.async_runtime import AsyncGerryBot
+from GerryPasswordBot.gerry_bot.dialogs import MemoryDialogStore, \
+    SQLiteDialogStore
+
+
+class FakeAsyncBot:
+    """Асинхронный бот, который запоминает вызовы Telegram API."""
+
+    def __init__(self):
+        self.calls = list()
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls.append(('send_message', chat_id, text))
+
+    async def edit_message_text(self, text, chat_id, message_id, **kwargs):
+        self.calls.append(('edit_message_text', chat_id, text))
+
+    async def send_sticker(self, chat_id, sticker):
+        raise FileNotFoundError(sticker)
+
+
+class ThreadRecordingStore(SQLiteDialogStore):
+    """SQLite-хранилище, которое запоминает потоки обращений."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def get(self, chat_id):
+        self.threads.add(threading.get_ident())
+        return super().get(chat_id)
+
+    def set(self, chat_id, state):
+        self.threads.add(threading.get_ident())
+        super().set(chat_id, state)
+
+    def pop(self, chat_id):
+        self.threads.add(threading.get_ident())
+        return super().pop(chat_id)
+
+
+class FakePool:
+    """Пул, который всегда выдает один и тот же пароль."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def get(self):
+        self.threads.add(threading.get_ident())
+        return 'aaaaa1-bbbbb2-ccccc3'
+
+
+class FakeStickerCache:
+    """Кэш стикеров без файлов."""
+
+    async def send_sticker_async(self, bot, chat_id, sticker_name):
+        raise FileNotFoundError(sticker_name)
+
+
+def message(text, chat_id=7):
+    """Сообщение пользователя."""
+    return SimpleNamespace(text=text, message_id=1,
+                           chat=SimpleNamespace(id=chat_id),
+                           from_user=SimpleNamespace(first_name='Gerry'))
+
+
+def callback(data, chat_id=7, text='Ваш пароль'):
+    """Нажатие inline-кнопки."""
+    return SimpleNamespace(data=data, message=message(text, chat_id))
+
+
+class TestAsyncGerryBot(unittest.TestCase):
+    """Проверка асинхронного runtime бота."""
+
+    def setUp(self):
+        """Создать бот с фейковым клиентом Telegram."""
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.fake_bot = FakeAsyncBot()
+        self.dialog_store = MemoryDialogStore(ttl=60, max_size=100)
+        self.pool = FakePool()
+        self.gerry_bot = AsyncGerryBot(self.fake_bot, self.pool,
+                                       FakeStickerCache(), self.dialog_store,
+                                       self.executor)
+
+    def tearDown(self):
+        """Остановить пул потоков."""
+        self.executor.shutdown(wait=True)
+
+    def test_start_message_order(self):
+        """Стартовый диалог: эмодзи, приветствие, кнопки - по порядку."""
+        asyncio.run(self.gerry_bot.start_message(message('/start')))
+        texts = [call[2] for call in self.fake_bot.calls]
+        self.assertEqual('👋', texts[0])
+        self.assertTrue(texts[1].startswith('Hello, Gerry'))
+        self.assertEqual('Выберите и нажмите на более предпочтительный',
+                         texts[2])
+
+    def test_automatic_password(self):
+        """Пароль из пула заменяет предыдущее сообщение."""
+        asyncio.run(self.gerry_bot.callback_automatic_password_generation(
+            callback('auto_gen')))
+        self.assertEqual(
+            [('edit_message_text', 7, 'Ваш пароль:\n\naaaaa1-bbbbb2-ccccc3'
+              '\n\nНадежность: средний, ≈56 бит')],
+            self.fake_bot.calls)
+        # промах пула генерирует пароль - не в потоке event loop
+        self.assertNotIn(threading.get_ident(), self.pool.threads)
+
+    def test_custom_dialog(self):
+        """Кастомный диалог: длина, последовательность, пароль."""
+        async def dialog():
+            await self.gerry_bot.callback_custom_password_generation(
+                callback('custom_gen'))
+            await self.gerry_bot.continue_custom_dialog(message('abc'))
+            await self.gerry_bot.continue_custom_dialog(message('12'))
+            await self.gerry_bot.continue_custom_dialog(message('kadabra'))
+
+        asyncio.run(dialog())
+        texts = [call[2] for call in self.fake_bot.calls]
+        self.assertEqual('Введите пожалуйста цифрами.', texts[1])
+        self.assertTrue(texts[3].startswith('Ваш пароль:\n\nkadabra'))
+        password = texts[3].split('\n')[2]
+        self.assertEqual(12, len(password))
+        self.assertIn('Надежность:', texts[3])
+        self.assertIsNone(self.dialog_store.get(7))
+
+    def test_sqlite_dialog_off_event_loop(self):
+        """SQLite-хранилище диалогов вызывается вне потока event loop."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = ThreadRecordingStore(
+            os.path.join(directory.name, 'dialogs.db'), ttl=60)
+        gerry_bot = AsyncGerryBot(self.fake_bot, FakePool(),
+                                  FakeStickerCache(), store, self.executor)
+
+        async def dialog():
+            await gerry_bot.continue_custom_dialog(message('hi'))
+            await gerry_bot.callback_custom_password_generation(
+                callback('custom_gen'))
+            await gerry_bot.continue_custom_dialog(message('12'))
+            await gerry_bot.continue_custom_dialog(message('kadabra'))
+
+        asyncio.run(dialog())
+        texts = [call[2] for call in self.fake_bot.calls]
+        # без диалога - перенаправление на /start
+        self.assertEqual('Для генерации пароля введите - /start', texts[0])
+        self.assertTrue(texts[3].startswith('Ваш пароль:\n\nkadabra'))
+        self.assertNotIn(threading.get_ident(), store.threads)
+
+    def test_ok_selection(self):
+        """Кнопка OK правит сообщение и отправляет стикер."""
+        asyncio.run(self.gerry_bot.callback_user_decision_is_ok(
+            callback('ok_selection', text='pass')))
+        self.assertIn(('edit_message_text', 7, '*pass*\n\nКлассный выбор!'),
+                      self.fake_bot.calls)
+        self.assertIn(('send_message', 7, '😎'), self.fake_bot.calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+from urllib.request import urlopen
+
+from GerryPasswordBot.benchmarks.bench_replay import AUTOMATIC, OK, START, \
+    FakeBotApiServer, ReplayState, dialog_steps, percentile, \
+    replay_load_test
+from GerryPasswordBot.benchmarks.runner import compare_results, \
+    load_results, run_benchmark, save_results
+
+
+class TestBenchmarkRunner(unittest.TestCase):
+    """Проверка раннера бенчмарков."""
+
+    def test_run_benchmark(self):
+        """Результат содержит время одного вызова и частоту."""
+        result = run_benchmark('noop', lambda: None, number=10, repeat=2)
+        self.assertEqual('noop', result['name'])
+        self.assertLessEqual(result['best'], result['mean'])
+        self.assertGreater(result['ops_per_second'], 0)
+
+    def test_save_load_and_compare(self):
+        """Два прогона сохраняются в JSON и сравниваются по имени."""
+        baseline = [{'name': 'a', 'best': 2.0}, {'name': 'b', 'best': 1.0}]
+        current = [{'name': 'a', 'best': 1.0}, {'name': 'c', 'best': 1.0}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            save_results(baseline, path)
+            comparison = compare_results(load_results(path), current)
+        self.assertEqual(
+            [{'name': 'a', 'baseline': 2.0, 'current': 1.0, 'speedup': 2.0}],
+            comparison)
+
+
+class TestReplay(unittest.TestCase):
+    """Проверка нагрузочного прогона против заглушки Bot API."""
+
+    def test_percentile(self):
+        """Перцентили с интерполяцией между соседними значениями."""
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(1.0, percentile(values, 0))
+        self.assertAlmostEqual(50.5, percentile(values, 50))
+        self.assertAlmostEqual(99.01, percentile(values, 99))
+        self.assertEqual(7.0, percentile([7.0], 95))
+
+    def test_dialog_steps(self):
+        """Сценарий начинается с /start и заканчивается ok_selection."""
+        rng = random.Random(0)
+        for _ in range(100):
+            steps = dialog_steps(rng)
+            self.assertIn(START, steps[:2])
+            self.assertEqual(OK, steps[-1])
+
+    def test_next_step_after_all_replies(self):
+        """Следующий Update чата появляется после всех ответов шага."""
+        state = ReplayState(concurrency=1)
+        state.run({1: [START, AUTOMATIC], 2: [AUTOMATIC]})
+        updates = state.get_updates(None, 100, 0)
+        self.assertEqual(1, len(updates))
+        self.assertEqual('/start', updates[0]['message']['text'])
+        for _ in range(3):
+            state.reply('sendMessage', 1)
+        updates = state.get_updates(2, 100, 0)
+        self.assertEqual('auto_gen', updates[0]['callback_query']['data'])
+        state.reply('editMessageText', 1)
+        self.assertEqual(2, state.get_updates(3, 100, 0)[0][
+            'callback_query']['message']['chat']['id'])
+        state.reply('sendMessage', 1)
+        state.reply('editMessageText', 2)
+        self.assertTrue(state.finished.is_set())
+        self.assertEqual(3, len(state.latencies))
+        self.assertEqual(1, state.unexpected)
+
+    def test_fake_server(self):
+        """Заглушка отвечает в формате Bot API и учитывает ответы."""
+        state = ReplayState(concurrency=1)
+        server = FakeBotApiServer(state)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = server.api_url.format('token', 'sendMessage')
+            with urlopen(url + '?chat_id=5&text=hi') as response:
+                body = json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertTrue(body['ok'])
+        self.assertEqual(5, body['result']['chat']['id'])
+        self.assertEqual(1, state.calls['sendMessage'])
+
+    def test_polling_replay(self):
+        """main.py в режиме polling отвечает на все шаги диалогов."""
+        result = replay_load_test('polling', chats=10, concurrency=5,
+                                  timeout=60)
+        self.assertEqual(0, result['unexpected_calls'])
+        self.assertLessEqual(result['p50'], result['p99'])
+        self.assertGreater(result['ops_per_second'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from GerryPasswordBot.password_generator.cli import main, render_batch, \
+    stream_passwords
+from GerryPasswordBot.password_generator.dedup import BloomFilter
+
+
+AUTOMATIC_REGEX = '^(?:[0-9][a-zA-Z]{5}|[a-zA-Z]{5}[0-9])' \
+                  '(?:-(?:[0-9][a-zA-Z]{5}|[a-zA-Z]{5}[0-9])){2}$'
+
+
+class TestPasswordCli(unittest.TestCase):
+    """Проверка пакетной генерации паролей из командной строки."""
+
+    def setUp(self):
+        """Временный файл вывода."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'passwords.txt')
+
+    def tearDown(self):
+        """Удалить временный каталог."""
+        self.directory.cleanup()
+
+    def read_lines(self):
+        """Строки файла вывода."""
+        with open(self.path, encoding='utf-8') as stream:
+            return stream.read().splitlines()
+
+    def test_automatic_lines(self):
+        """Пароли пишутся пакетами, по строке на пароль."""
+        self.assertEqual(0, main(['auto', '--count', '25', '--batch-size',
+                                  '10', '--output', self.path]))
+        passwords = self.read_lines()
+        self.assertEqual(25, len(passwords))
+        for password in passwords:
+            self.assertRegex(password, AUTOMATIC_REGEX)
+
+    def test_custom_jsonl(self):
+        """JSON Lines с кастомными паролями той же длины."""
+        main(['custom', '--length', '12', '--sequence', 'kadabra',
+              '--count', '7', '--format', 'jsonl', '--output', self.path])
+        records = [json.loads(line) for line in self.read_lines()]
+        self.assertEqual(7, len(records))
+        for record in records:
+            self.assertEqual(['password'], list(record))
+            self.assertEqual(12, len(record['password']))
+            self.assertTrue(record['password'].startswith('kadabra-'))
+
+    def test_workers(self):
+        """Пакеты из пула процессов идут по порядку и без потерь."""
+        batches = list(stream_passwords('auto', 45, batch_size=10,
+                                        workers=2))
+        self.assertEqual(5, len(batches))
+        self.assertEqual([10, 10, 10, 10, 5],
+                         [batch.count(b'\n') for batch in batches])
+
+    def test_unique_across_runs(self):
+        """С --unique пароли прошлых запусков не повторяются."""
+        seen_path = os.path.join(self.directory.name, 'issued.bloom')
+        argv = ['custom', '--length', '12', '--sequence', 'kadabra',
+                '--count', '300', '--unique', seen_path,
+                '--output', self.path]
+        self.assertEqual(0, main(argv))
+        passwords = self.read_lines()
+        self.assertEqual(0, main(argv))
+        passwords += self.read_lines()
+        self.assertEqual(600, len(set(passwords)))
+
+    def test_unique_marks_written_batches(self):
+        """Пакет отмечается выданным после записи, а не при генерации."""
+        seen = BloomFilter(os.path.join(self.directory.name, 'issued.bloom'),
+                           capacity=1000)
+        self.addCleanup(seen.close)
+        batches = stream_passwords('auto', 20, batch_size=10, seen=seen)
+        first = next(batches)
+        self.assertEqual(0, len(seen))
+        next(batches)
+        self.assertEqual(10, len(seen))
+        for password in first.decode().splitlines():
+            self.assertIn(password, seen)
+        batches.close()
+        self.assertEqual(20, len(seen))
+
+    def test_invalid_arguments(self):
+        """Некорректные данные - ошибка до генерации."""
+        for argv in (['custom', '--length', '40', '--sequence', 'kadabra'],
+                     ['custom', '--length', '12'],
+                     ['auto', '--sequence', 'kadabra'],
+                     ['auto', '--count', '-1']):
+            with self.subTest(argv=argv):
+                with contextlib.redirect_stderr(io.StringIO()):
+                    with self.assertRaises(SystemExit):
+                        main(argv + ['--output', self.path])
+
+    def test_render_escapes_jsonl(self):
+        """Символы, требующие экранирования, кодируются json."""
+        rendered = render_batch(['a\x01b1', 'пароль2'], 'jsonl')
+        self.assertEqual([{'password': 'a\x01b1'}, {'password': 'пароль2'}],
+                         [json.loads(line)
+                          for line in rendered.decode('utf-8').splitlines()])
+        self.assertEqual(b'', render_batch([], 'lines'))
+
+
+if __name__ == '__main__':
+    unittest.main()
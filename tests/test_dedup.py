@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+from GerryPasswordBot.password_generator.dedup import BloomFilter, \
+    PasswordExhaustedError, UniquePasswordGeneration
+from GerryPasswordBot.password_generator.generator import \
+    AutomaticPasswordGeneration, CustomGenerationPassword
+
+
+class RepeatingGeneration:
+    """Генератор, повторяющий пароли по кругу."""
+
+    def __init__(self, passwords):
+        self.passwords = passwords
+        self.index = 0
+
+    def generate_password(self) -> str:
+        password = self.passwords[self.index % len(self.passwords)]
+        self.index += 1
+        return password
+
+    def generate_many(self, count: int):
+        return [self.generate_password() for _ in range(count)]
+
+
+class DedupTestCase(unittest.TestCase):
+    """Фильтр во временном файле."""
+
+    def setUp(self):
+        """Временный каталог для файла фильтра."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'issued.bloom')
+
+    def tearDown(self):
+        """Удалить временный каталог."""
+        self.directory.cleanup()
+
+
+class TestBloomFilter(DedupTestCase):
+    """Проверка фильтра выданных паролей."""
+
+    def test_add_and_contains(self):
+        """Добавленный пароль найден, повторное добавление - False."""
+        seen = BloomFilter(self.path, capacity=1000)
+        self.assertNotIn('kadabra-1', seen)
+        self.assertTrue(seen.add('kadabra-1'))
+        self.assertIn('kadabra-1', seen)
+        self.assertFalse(seen.add('kadabra-1'))
+        self.assertEqual(1, len(seen))
+        seen.close()
+
+    def test_persisted(self):
+        """Фильтр и его параметры сохраняются в файле."""
+        passwords = AutomaticPasswordGeneration(
+            auto_gen=True).generate_many(1000)
+        seen = BloomFilter(self.path, capacity=10000, shared=False)
+        for password in passwords:
+            seen.add(password)
+        seen.close()
+
+        reopened = BloomFilter(self.path, capacity=1)
+        self.assertEqual(10000, reopened.capacity)
+        self.assertEqual(1000, len(reopened))
+        for password in passwords:
+            self.assertIn(password, reopened)
+        reopened.close()
+
+    def test_false_positive_rate(self):
+        """Ложноположительных ответов мало при заполнении до capacity."""
+        generation = AutomaticPasswordGeneration(auto_gen=True)
+        seen = BloomFilter(self.path, capacity=20000, error_rate=1e-3)
+        for password in generation.generate_many(20000):
+            seen.add(password)
+        false_positives = sum(password in seen
+                              for password in generation.generate_many(20000))
+        self.assertLess(false_positives, 200)
+        seen.close()
+
+    def test_invalid_file(self):
+        """Чужой файл - ошибка, а не порча."""
+        with open(self.path, 'wb') as stream:
+            stream.write(b'not a filter' * 10)
+        with self.assertRaises(ValueError):
+            BloomFilter(self.path)
+        with self.assertRaises(ValueError):
+            BloomFilter(os.path.join(self.directory.name, 'new'),
+                        error_rate=2)
+
+
+class TestUniquePasswordGeneration(DedupTestCase):
+    """Проверка генерации без повторов."""
+
+    def test_repeats_are_regenerated(self):
+        """Повторы заменяются новыми паролями."""
+        unique = UniquePasswordGeneration(
+            RepeatingGeneration(['a', 'b', 'a', 'c', 'b', 'd']),
+            BloomFilter(self.path, capacity=100))
+        self.assertEqual('a', unique.generate_password())
+        self.assertEqual(['b', 'c', 'd'], unique.generate_many(3))
+        self.assertEqual(2, unique.regenerated)
+        self.assertEqual(4, unique.stats()['issued'])
+
+    def test_exhausted(self):
+        """Все пароли выданы - ошибка после max_attempts попыток."""
+        generation = CustomGenerationPassword(password_length=8,
+                                              user_sequence='kadabra')
+        unique = UniquePasswordGeneration(
+            generation, BloomFilter(self.path, capacity=100),
+            max_attempts=500)
+        passwords = unique.generate_many(5) + [
+            unique.generate_password() for _ in range(5)]
+        self.assertEqual(10, len(set(passwords)))
+        with self.assertRaises(PasswordExhaustedError):
+            unique.generate_password()
+        with self.assertRaises(PasswordExhaustedError):
+            unique.generate_many(1)
+
+    def test_filter_without_mark(self):
+        """filter(mark=False) не меняет фильтр, даже при исчерпании."""
+        seen = BloomFilter(self.path, capacity=100)
+        seen.add('a')
+        unique = UniquePasswordGeneration(
+            RepeatingGeneration(['b', 'c']), seen, max_attempts=3)
+        self.assertEqual(['b', 'c'],
+                         unique.filter(['a', 'b', 'b'], 2, mark=False))
+        self.assertEqual(1, len(seen))
+        with self.assertRaises(PasswordExhaustedError):
+            unique.filter(['a'], 3, mark=False)
+        self.assertEqual(1, len(seen))
+        unique.mark(['b', 'c'])
+        self.assertEqual(3, len(seen))
+        self.assertNotIn('d', seen)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from GerryPasswordBot.gerry_bot.dialogs import MemoryDialogStore, \
+    SQLiteDialogStore, WAITING_PASSWORD_LENGTH, WAITING_USER_SEQUENCE, \
+    create_dialog_store
+
+
+class DialogStoreTestsMixin:
+    """Общие проверки для всех хранилищ состояния диалогов."""
+
+    def test_set_and_pop(self):
+        """Состояние сохраняется и забирается ровно один раз."""
+        state = {'step': WAITING_USER_SEQUENCE, 'password_length': 12}
+        self.store.set(1, state)
+        self.assertEqual(state, self.store.get(1))
+        self.assertEqual(state, self.store.pop(1))
+        self.assertIsNone(self.store.pop(1))
+        self.assertIsNone(self.store.get(1))
+
+    def test_state_expires(self):
+        """Брошенный диалог истекает по ttl."""
+        self.store.set(1, {'step': WAITING_PASSWORD_LENGTH})
+        time.sleep(0.15)
+        self.assertIsNone(self.store.get(1))
+        self.assertIsNone(self.store.pop(1))
+
+
+class TestMemoryDialogStore(DialogStoreTestsMixin, unittest.TestCase):
+    """Проверка хранилища диалогов в памяти."""
+
+    def setUp(self):
+        """Установить инстанс класса MemoryDialogStore."""
+        self.store = MemoryDialogStore(ttl=0.1, max_size=3)
+
+    def test_size_is_bounded(self):
+        """При переполнении вытесняются самые давние диалоги."""
+        for chat_id in range(10):
+            self.store.set(chat_id, {'step': WAITING_PASSWORD_LENGTH})
+        self.assertEqual(3, len(self.store))
+        self.assertIsNone(self.store.get(0))
+        self.assertIsNotNone(self.store.get(9))
+
+    def test_expired_dialogs_are_purged_on_write(self):
+        """Истекшие диалоги удаляются при следующей записи."""
+        for chat_id in range(3):
+            self.store.set(chat_id, {'step': WAITING_PASSWORD_LENGTH})
+        time.sleep(0.15)
+        self.store.set(100, {'step': WAITING_PASSWORD_LENGTH})
+        self.assertEqual(1, len(self.store))
+
+
+class TestSQLiteDialogStore(DialogStoreTestsMixin, unittest.TestCase):
+    """Проверка хранилища диалогов в SQLite."""
+
+    def setUp(self):
+        """Установить инстанс класса SQLiteDialogStore во временном файле."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dialogs.sqlite3')
+        self.store = SQLiteDialogStore(path=self.path, ttl=0.1)
+
+    def tearDown(self):
+        """Удалить временный каталог."""
+        self.directory.cleanup()
+
+    def test_state_is_shared_between_instances(self):
+        """Состояние видно другому процессу с тем же файлом."""
+        self.store.set(5, {'step': WAITING_PASSWORD_LENGTH})
+        other_store = SQLiteDialogStore(path=self.path, ttl=0.1)
+        self.assertEqual({'step': WAITING_PASSWORD_LENGTH},
+                         other_store.pop(5))
+        self.assertIsNone(self.store.get(5))
+
+    def test_concurrent_writes_are_counted(self):
+        """Записи из нескольких потоков не теряются в счетчике."""
+        store = SQLiteDialogStore(path=self.path, ttl=60, purge_every=7)
+
+        def write(chat_id):
+            for _ in range(50):
+                store.set(chat_id, {'step': WAITING_PASSWORD_LENGTH})
+
+        threads = [threading.Thread(target=write, args=(chat_id,))
+                   for chat_id in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(200, store._writes)
+        self.assertEqual(4, len(store))
+
+
+class TestCreateDialogStore(unittest.TestCase):
+    """Проверка выбора хранилища по настройке."""
+
+    def test_unknown_kind(self):
+        """Неизвестный тип хранилища вызывает ValueError."""
+        with self.assertRaises(ValueError):
+            create_dialog_store(kind='redis', path='', ttl=1, max_size=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
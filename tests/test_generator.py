@@ -33,6 +33,15 @@ class TestPasswordGeneratorMixin(unittest.TestCase):
         result = self.password.create_sequence()
         self.assertIsInstance(result, str)
 
+    def test_create_many_sequences(self):
+        """Пакет последовательностей: количество, длина и цифра."""
+        expected_count = 500
+        result = self.password.create_many_sequences(expected_count)
+        self.assertEqual(expected_count, len(result))
+        for sequence in result:
+            self.assertEqual(6, len(sequence))
+            self.assertTrue(sequence[0].isdigit() or sequence[-1].isdigit())
+
 
 class TestAutomaticPasswordGeneration(unittest.TestCase):
     """Проверка класса автоматической генерации паролей."""
@@ -74,6 +83,20 @@ class TestAutomaticPasswordGeneration(unittest.TestCase):
         self.assertEqual(
             'Неправильно инициирован класс.', error_message.exception.args[0])
 
+    def test_generate_many_passwords(self):
+        """Пакет паролей в формате generate_password."""
+        expected_count = 500
+        result = self.password.generate_many(expected_count)
+        self.assertEqual(expected_count, len(result))
+        for password in result:
+            self.assertEqual(20, len(password))
+            self.assertEqual(3, len(password.split('-')))
+
+    def test_generate_many_with_incorrectly_initiated_class(self):
+        """Пакетная генерация с неправильно инициированным классом."""
+        with self.assertRaises(NameError):
+            AutomaticPasswordGeneration().generate_many(10)
+
 
 class TestCustomPasswordGeneration(unittest.TestCase):
     """Проверка класса кастомной генерации паролей."""
@@ -235,6 +258,16 @@ class TestCustomPasswordGeneration(unittest.TestCase):
         result = self.password.find_remaining_password_length()
         self.assertEqual(expected_length, result)
 
+    def test_find_branch(self):
+        """Ветка генерации хвоста по остаточной длине."""
+        for password_length, expected_branch in (
+                (8, 'digit'), (9, 'letter_digit'),
+                (10, 'separator_letter_digit'), (11, 'blocks')):
+            password = CustomGenerationPassword(
+                password_length=password_length,
+                user_sequence=self.user_sequence)
+            self.assertEqual(expected_branch, password.find_branch())
+
     def test_digit_in_sequence(self):
         """Цифра в последовательности."""
         result = self.password.check_for_numbers_in_sequence(
@@ -324,6 +357,30 @@ class TestCustomPasswordGeneration(unittest.TestCase):
         result = password.generate_password()
         self.assertEqual(expected_password_length, len(result))
 
+    def test_generate_many_for_every_password_length(self):
+        """Пакет паролей корректной длины с цифрой для длин от 8 до 32."""
+        for password_length in range(8, 33):
+            password = CustomGenerationPassword(
+                password_length=password_length,
+                user_sequence=self.user_sequence
+            )
+            result = password.generate_many(50)
+            self.assertEqual(50, len(result))
+            for ready_password in result:
+                self.assertEqual(password_length, len(ready_password))
+                self.assertTrue(ready_password.startswith(self.user_sequence))
+                self.assertTrue(password.check_for_numbers_in_sequence(
+                    sequence=ready_password))
+
+    def test_generate_many_with_invalid_data(self):
+        """Пакетная генерация проверяет данные пользователя."""
+        password = CustomGenerationPassword(
+            password_length=self.correct_password_length,
+            user_sequence=self.incorrect_sequence
+        )
+        with self.assertRaises(ValueError):
+            password.generate_many(10)
+
 
 if __name__ == '__main__':
     unittest.main()
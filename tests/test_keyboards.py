@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from telebot import types
+
+from GerryPasswordBot.gerry_bot import replies
+from GerryPasswordBot.gerry_bot.keyboards import AUTOMATIC_PASSWORD, \
+    CUSTOM_RETRY, START, CachedKeyboard, KeyboardRegistry, keyboards
+
+
+class TestKeyboards(unittest.TestCase):
+    """Проверка реестра клавиатур."""
+
+    def test_same_markup_for_every_reply(self):
+        """Клавиатура создается один раз и переиспользуется."""
+        self.assertIs(replies.start_buttons(), replies.start_buttons())
+        self.assertIs(
+            replies.user_password_answer_buttons(automatic_selection=True),
+            keyboards.get(AUTOMATIC_PASSWORD))
+
+    def test_json_matches_inline_markup(self):
+        """JSON совпадает с клавиатурой, собранной через add()."""
+        markup = types.InlineKeyboardMarkup()
+        markup.add(
+            types.InlineKeyboardButton('Автоматический',
+                                       callback_data='auto_gen'),
+            types.InlineKeyboardButton('Кастомный',
+                                       callback_data='custom_gen'))
+        self.assertEqual(keyboards.get(START).to_json(), markup.to_json())
+
+    def test_answer_buttons_callback_data(self):
+        """Кнопка повтора ведет в выбранный режим."""
+        for flags, callback_data in (({'automatic_selection': True},
+                                      'auto_gen'),
+                                     ({'custom_selection': True},
+                                      'custom_gen')):
+            buttons = json.loads(replies.user_password_answer_buttons(
+                **flags).to_json())['inline_keyboard'][0]
+            self.assertEqual(['ok_selection', callback_data],
+                             [button['callback_data'] for button in buttons])
+
+    def test_error_reply_uses_retry_keyboard(self):
+        """Ошибка ввода возвращает клавиатуру 'Ввести данные заново'."""
+        _, markup = replies.custom_password_reply(40, 'kadabra')
+        self.assertIs(markup, keyboards.get(CUSTOM_RETRY))
+
+    def test_cached_keyboard_is_immutable(self):
+        """Общую клавиатуру нельзя изменить."""
+        keyboard = CachedKeyboard([[('A', 'a')]])
+        with self.assertRaises(TypeError):
+            keyboard.add(types.InlineKeyboardButton('B', callback_data='b'))
+        with self.assertRaises(TypeError):
+            keyboard.row(types.InlineKeyboardButton('B', callback_data='b'))
+
+    def test_unknown_keyboard(self):
+        """Необъявленная клавиатура - KeyError."""
+        registry = KeyboardRegistry({'one': [[('A', 'a')]]})
+        self.assertIn('one', registry)
+        with self.assertRaises(KeyError):
+            registry.get('two')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from loguru import logger
+
+from GerryPasswordBot.gerry_bot.logging_config import configure_logging
+
+
+class TestConfigureLogging(unittest.TestCase):
+    """Проверка настройки журнала бота."""
+
+    def setUp(self):
+        """Создать временный каталог для журнала."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'bot.log')
+
+    def tearDown(self):
+        """Вернуть стандартный обработчик loguru."""
+        logger.remove()
+        logger.add(sys.stderr)
+        self.directory.cleanup()
+
+    def read_log(self):
+        """Дождаться фоновой записи и прочитать журнал."""
+        logger.complete()
+        with open(self.path, encoding='utf-8') as log_file:
+            return log_file.read()
+
+    def test_disabled_level_is_skipped(self):
+        """Записи ниже уровня не попадают в журнал."""
+        configure_logging(path=self.path, level='INFO')
+        logger.debug('debug {0}', 'message')
+        logger.info('info {0}', 'message')
+        text = self.read_log()
+        self.assertNotIn('debug message', text)
+        self.assertIn('info message', text)
+
+    def test_json_format(self):
+        """В режиме serialize каждая запись - JSON."""
+        configure_logging(path=self.path, level='INFO', serialize=True)
+        logger.info('structured')
+        record = json.loads(self.read_log().splitlines()[0])
+        self.assertEqual('structured', record['record']['message'])
+        self.assertEqual('INFO', record['record']['level']['name'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import unittest
+import urllib.request
+
+from GerryPasswordBot.gerry_bot.metrics import MetricsRegistry, \
+    MetricsServer
+
+
+class FakeBot:
+    """Бот с одним методом Telegram API."""
+
+    def send_message(self, chat_id, text):
+        return text
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Проверка реестра метрик."""
+
+    def setUp(self):
+        """Установить инстанс класса MetricsRegistry."""
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_track_handler(self):
+        """Считаются вызовы, ошибки и время обработчика."""
+        @self.registry.track_handler
+        def start_message(fail):
+            if fail:
+                raise RuntimeError('fail')
+
+        start_message(False)
+        with self.assertRaises(RuntimeError):
+            start_message(True)
+        text = self.registry.render()
+        self.assertIn(
+            'gerry_bot_handler_calls_total{handler="start_message"} 2', text)
+        self.assertIn(
+            'gerry_bot_handler_errors_total{handler="start_message"} 1', text)
+        self.assertIn('gerry_bot_handler_duration_seconds_bucket'
+                      '{handler="start_message",le="+Inf"} 2', text)
+        self.assertIn('# TYPE gerry_bot_handler_duration_seconds histogram',
+                      text)
+
+    def test_track_async_handler(self):
+        """Async-обработчики тоже замеряются."""
+        @self.registry.track_handler
+        async def callback_user_decision_is_ok():
+            return 'ok'
+
+        self.assertEqual('ok', asyncio.run(callback_user_decision_is_ok()))
+        self.assertIn('handler="callback_user_decision_is_ok"} 1',
+                      self.registry.render())
+
+    def test_instrument_bot(self):
+        """Вызовы Telegram API попадают в гистограмму операций."""
+        bot = FakeBot()
+        self.registry.instrument_bot(bot, methods=('send_message',))
+        self.assertEqual('hi', bot.send_message(1, 'hi'))
+        with self.registry.time('generator', 'password_pool.get'):
+            pass
+        text = self.registry.render()
+        self.assertIn('gerry_bot_operation_duration_seconds_count'
+                      '{name="send_message",operation="telegram"} 1', text)
+        self.assertIn('gerry_bot_operation_duration_seconds_count'
+                      '{name="password_pool.get",operation="generator"} 1',
+                      text)
+
+    def test_collector(self):
+        """Gauge-метрики читаются из коллектора."""
+        self.registry.add_collector(lambda: {'gerry_bot_pool_size': 5})
+        self.assertIn('gerry_bot_pool_size 5', self.registry.render())
+
+    def test_named_collector_is_replaced(self):
+        """Источник с тем же именем заменяет предыдущий."""
+        self.registry.add_collector(lambda: {'gerry_bot_pool_size': 5},
+                                    name='pool')
+        self.registry.add_collector(lambda: {'gerry_bot_pool_size': 7},
+                                    name='pool')
+        samples = [line for line in self.registry.render().splitlines()
+                   if line.startswith('gerry_bot_pool_size ')]
+        self.assertEqual(['gerry_bot_pool_size 7'], samples)
+
+    def test_metrics_endpoint(self):
+        """/metrics отдает метрики по HTTP."""
+        self.registry.inc('gerry_bot_test_total')
+        server = MetricsServer(self.registry, '127.0.0.1', 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:{0}/metrics'.format(server.server_port)
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode('utf-8')
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn('gerry_bot_test_total 1', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
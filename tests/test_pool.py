@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from GerryPasswordBot.password_generator.generator import \
+    AutomaticPasswordGeneration
+from GerryPasswordBot.password_generator.pool import PasswordPool
+
+
+class SlowGeneration(AutomaticPasswordGeneration):
+    """Генератор, пакет которого создается заметное время."""
+
+    def generate_many(self, count):
+        time.sleep(0.05)
+        return super().generate_many(count)
+
+
+class TestPasswordPool(unittest.TestCase):
+    """Проверка пула заранее сгенерированных паролей."""
+
+    def setUp(self):
+        """Установить инстанс класса PasswordPool."""
+        self.pool = PasswordPool(
+            generation=AutomaticPasswordGeneration(auto_gen=True),
+            size=50,
+            low_water_mark=10)
+
+    def tearDown(self):
+        """Остановить фоновое пополнение."""
+        self.pool.stop(timeout=1)
+
+    def test_fill_is_bounded(self):
+        """Пул не заполняется больше максимального размера."""
+        self.assertEqual(50, self.pool.fill())
+        self.assertEqual(0, self.pool.fill())
+        self.assertEqual(50, len(self.pool))
+
+    def test_concurrent_fill_is_bounded(self):
+        """Одновременные fill не превышают максимальный размер."""
+        pool = PasswordPool(SlowGeneration(auto_gen=True), size=50,
+                            low_water_mark=10)
+        added = list()
+        threads = [threading.Thread(target=lambda: added.append(pool.fill()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(50, len(pool))
+        self.assertEqual([0, 0, 0, 50], sorted(added))
+
+    def test_miss_on_empty_pool(self):
+        """Пустой пул генерирует пароль на месте и считает промах."""
+        password = self.pool.get()
+        self.assertEqual(20, len(password))
+        self.assertEqual({'size': 0, 'hits': 0, 'misses': 1},
+                         self.pool.stats())
+
+    def test_hit_from_filled_pool(self):
+        """Заполненный пул выдает пароль и считает попадание."""
+        self.pool.fill()
+        self.pool.get()
+        self.assertEqual({'size': 49, 'hits': 1, 'misses': 0},
+                         self.pool.stats())
+
+    def test_background_refill(self):
+        """Фоновый поток пополняет пул ниже нижней границы."""
+        self.pool.start()
+        deadline = time.monotonic() + 5
+        while len(self.pool) < 50 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for _ in range(45):
+            self.pool.get()
+        deadline = time.monotonic() + 5
+        while len(self.pool) < 50 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(50, len(self.pool))
+
+    def test_every_password_is_issued_once(self):
+        """Каждый пароль из пула выдается ровно один раз."""
+        self.pool.fill()
+        issued = list()
+        lock = threading.Lock()
+
+        def take():
+            for _ in range(10):
+                password = self.pool.get()
+                with lock:
+                    issued.append(password)
+
+        threads = [threading.Thread(target=take) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(50, len(issued))
+        self.assertEqual(50, self.pool.stats()['hits'])
+        self.assertEqual(len(issued), len(set(issued)))
+
+    def test_invalid_low_water_mark(self):
+        """Нижняя граница должна быть меньше размера пула."""
+        with self.assertRaises(ValueError):
+            PasswordPool(
+                generation=AutomaticPasswordGeneration(auto_gen=True),
+                size=10,
+                low_water_mark=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
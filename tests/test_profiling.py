@@ -0,0 +1,210 @@
+import asyncio
+import glob
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from GerryPasswordBot.gerry_bot.metrics import MetricsRegistry
+from GerryPasswordBot.gerry_bot import profiling
+from GerryPasswordBot.gerry_bot.profiling import CPROFILE, SAMPLING, \
+    Profiler
+
+
+class FakeBot:
+    """Бот с медленным методом Telegram API."""
+
+    def send_message(self, chat_id, text):
+        time.sleep(0.02)
+        return text
+
+
+class BusyProfile(profiling.cProfile.Profile):
+    """Профиль, который не включается: профилировщик уже активен."""
+
+    def enable(self, *args, **kwargs):
+        raise ValueError('Another profiling tool is already active')
+
+
+class TestProfiler(unittest.TestCase):
+    """Проверка трасс медленных обработчиков и снимков профиля."""
+
+    def setUp(self):
+        """Профилировщик с временным каталогом и своим реестром метрик."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.profiler = Profiler()
+        self.profiler.configure(self.directory.name, slow_threshold=0.01,
+                                sample_interval=0.001)
+        self.registry = MetricsRegistry()
+        self.registry.add_listener(self.profiler.observe)
+        self.bot = FakeBot()
+        self.registry.instrument_bot(self.bot, methods=('send_message',))
+
+    def tearDown(self):
+        """Остановить профилировщик и удалить каталог."""
+        self.profiler.stop(timeout=1)
+        self.directory.cleanup()
+
+    def read_traces(self):
+        """Записанные трассы медленных обработчиков."""
+        self.profiler.flush()
+        traces = list()
+        for path in glob.glob(os.path.join(self.directory.name,
+                                           'slow-handlers-*.jsonl')):
+            with open(path, encoding='utf-8') as stream:
+                traces.extend(json.loads(line) for line in stream)
+        return traces
+
+    def test_slow_handler_trace(self):
+        """Медленный обработчик записывается с операциями внутри него."""
+        @self.profiler.track_handler
+        def password_length_from_user():
+            with self.registry.time('generator', 'custom_password_reply'):
+                pass
+
+        @self.profiler.track_handler
+        def continue_custom_dialog(chat_id):
+            password_length_from_user()
+            self.bot.send_message(chat_id, 'hi')
+
+        continue_custom_dialog(7)
+        traces = self.read_traces()
+        self.assertEqual(1, len(traces))
+        trace = traces[0]
+        self.assertEqual('continue_custom_dialog', trace['handler'])
+        self.assertGreaterEqual(trace['duration'], 0.02)
+        self.assertEqual(
+            [('generator', 'custom_password_reply'),
+             ('handler', 'password_length_from_user'),
+             ('telegram', 'send_message')],
+            [(span['operation'], span['name']) for span in trace['spans']])
+        self.assertGreaterEqual(trace['totals']['telegram'], 0.02)
+
+    def test_fast_handler_and_disabled(self):
+        """Быстрые обработчики и выключенный профилировщик не пишутся."""
+        @self.profiler.track_handler
+        def start_message():
+            return 'ok'
+
+        self.assertEqual('ok', start_message())
+        self.profiler.configure(None)
+        self.bot.send_message(1, 'outside handler')
+        self.assertEqual('ok', start_message())
+        self.assertEqual(0, self.profiler.flush())
+        self.assertEqual(0, self.profiler.stats()['written'])
+
+    def test_async_handler_error(self):
+        """Async-обработчик: трасса с операциями и именем исключения."""
+        async def send(chat_id):
+            with self.registry.time('telegram', 'send_message'):
+                await asyncio.sleep(0.02)
+
+        @self.profiler.track_handler
+        async def callback_user_decision_is_ok():
+            await asyncio.gather(send(1), send(1))
+            raise RuntimeError('fail')
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(callback_user_decision_is_ok())
+        trace = self.read_traces()[0]
+        self.assertEqual('RuntimeError', trace['error'])
+        self.assertEqual(2, len(trace['spans']))
+
+    def test_queue_limit(self):
+        """Переполненная очередь отбрасывает трассы, а не ждет."""
+        self.profiler.configure(self.directory.name, slow_threshold=0,
+                                max_queue=2)
+        handler = self.profiler.track_handler(lambda: None)
+        for _ in range(5):
+            handler()
+        self.assertEqual({'queued': 2, 'written': 0, 'dropped': 3,
+                          'snapshots': 0}, self.profiler.stats())
+
+    def test_sampling_snapshot(self):
+        """Снимок выборкой стеков содержит функции рабочих потоков."""
+        stop = threading.Event()
+
+        def busy_handler():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=busy_handler, name='handler')
+        worker.start()
+        try:
+            thread = self.profiler.snapshot(SAMPLING, duration=0.2)
+            self.assertIsNone(self.profiler.snapshot(SAMPLING))
+            thread.join()
+        finally:
+            stop.set()
+            worker.join()
+        [path] = glob.glob(os.path.join(self.directory.name, 'sampling-*'))
+        with open(path, encoding='utf-8') as stream:
+            lines = stream.read().splitlines()
+        self.assertTrue(any(line.startswith('handler;') and 'busy_handler'
+                            in line for line in lines))
+        self.assertTrue(all(line.rsplit(' ', 1)[1].isdigit()
+                            for line in lines))
+
+    def test_cprofile_snapshot(self):
+        """cProfile-снимок собирает вызовы обработчиков за время снимка."""
+        def generate_custom_password_for_user():
+            return sorted(range(100))
+
+        handler = self.profiler.track_handler(
+            generate_custom_password_for_user)
+        thread = self.profiler.snapshot(CPROFILE, duration=0.3)
+
+        def serve():
+            while thread.is_alive():
+                handler()
+                time.sleep(0.001)
+
+        workers = [threading.Thread(target=serve) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        [path] = glob.glob(os.path.join(self.directory.name, 'cprofile-*'))
+        functions = {function[2]: stats[1] for function, stats
+                     in pstats.Stats(path).stats.items()}
+        self.assertGreater(functions['generate_custom_password_for_user'],
+                           10)
+        self.assertEqual(1, self.profiler.stats()['snapshots'])
+        with self.assertRaises(ValueError):
+            self.profiler.snapshot('perf')
+
+    @mock.patch.object(profiling, 'PROCESS_WIDE_CPROFILE', False)
+    def test_cprofile_enable_error(self):
+        """Ошибка включения cProfile не доходит до обработчиков."""
+        def generate_custom_password_for_user():
+            return sorted(range(100))
+
+        handler = self.profiler.track_handler(
+            generate_custom_password_for_user)
+        with mock.patch.object(profiling.cProfile, 'Profile', BusyProfile):
+            thread = self.profiler.snapshot(CPROFILE, duration=0.2)
+            while thread.is_alive():
+                self.assertEqual(list(range(100)), handler())
+                time.sleep(0.001)
+        self.assertEqual(0, self.profiler.stats()['snapshots'])
+        # счетчик вызовов и флаг потока сброшены: следующий снимок
+        # собирает вызовы и не ждет CPROFILE_DRAIN_TIMEOUT
+        started = time.monotonic()
+        thread = self.profiler.snapshot(CPROFILE, duration=0.2)
+        while thread.is_alive():
+            handler()
+            time.sleep(0.001)
+        self.assertLess(time.monotonic() - started, 2)
+        [path] = glob.glob(os.path.join(self.directory.name, 'cprofile-*'))
+        functions = {function[2]: stats[1] for function, stats
+                     in pstats.Stats(path).stats.items()}
+        self.assertGreater(functions['generate_custom_password_for_user'],
+                           10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import random
+import unittest
+
+from GerryPasswordBot.password_generator.generator import \
+    AutomaticPasswordGeneration, CustomGenerationPassword, \
+    PasswordGeneratorMixin
+from GerryPasswordBot.password_generator.quality import \
+    QualityAccumulator, automatic_model, block_model, check_generator, \
+    chi_square_p_value, custom_collision_bits, custom_model
+from GerryPasswordBot.password_generator.strength import \
+    AUTOMATIC_KEYSPACE_BITS
+
+
+def index_biased_sequence() -> str:
+    """create_sequence с выбором заглавной буквы через sequence.index."""
+    sequence = list(PasswordGeneratorMixin.create_sequence().lower())
+    letters = [letter for letter in sequence if letter.isalpha()]
+    letter = random.choice(letters)
+    index = sequence.index(letter)
+    sequence[index] = letter.upper()
+    return ''.join(sequence)
+
+
+class TestChiSquare(unittest.TestCase):
+    """Проверить p-value критерия хи-квадрат."""
+
+    def test_known_values(self):
+        """Значения совпадают с табличными."""
+        self.assertAlmostEqual(0.05, chi_square_p_value(3.841459, 1), 6)
+        self.assertAlmostEqual(math.exp(-1), chi_square_p_value(2, 2))
+        self.assertAlmostEqual(0.01, chi_square_p_value(63.691, 40), 4)
+        self.assertEqual(1.0, chi_square_p_value(0, 5))
+
+
+class TestQualityAccumulator(unittest.TestCase):
+    """Проверить потоковую статистику."""
+
+    def test_duplicates_and_unexpected(self):
+        """Повторы считаются по всем пакетам, лишние символы - по позиции."""
+        accumulator = QualityAccumulator([{'a': 0.5, 'b': 0.5}])
+        accumulator.update(['a', 'b'])
+        accumulator.update(['a', 'c'])
+        report = accumulator.report(keyspace_bits=1)
+        self.assertEqual(4, report.count)
+        self.assertEqual(1, report.duplicates)
+        self.assertEqual(1, report.positions[0].unexpected)
+        self.assertFalse(report.passed())
+
+    def test_length_mismatch(self):
+        """Пароль другой длины - ошибка, а не сдвиг позиций."""
+        with self.assertRaises(ValueError):
+            QualityAccumulator(block_model(6)).update(['abcdef', 'abc'])
+
+
+class TestGeneratorQuality(unittest.TestCase):
+    """Проверить распределения генераторов на больших выборках."""
+
+    def test_automatic(self):
+        """Пакетные автоматические пароли соответствуют модели."""
+        generation = AutomaticPasswordGeneration(auto_gen=True)
+        report = check_generator(generation.generate_many, automatic_model(),
+                                 200000, keyspace_bits=AUTOMATIC_KEYSPACE_BITS)
+        self.assertTrue(report.passed(), report)
+        self.assertEqual(0, report.duplicates)
+
+    def test_sequences(self):
+        """Пакетные и поштучные блоки соответствуют одной модели."""
+        for generate_many in (
+                PasswordGeneratorMixin.create_many_sequences,
+                lambda count: [PasswordGeneratorMixin.create_sequence()
+                               for _ in range(count)]):
+            with self.subTest(generate_many=generate_many):
+                report = check_generator(generate_many, block_model(6),
+                                         50000, track_duplicates=False)
+                self.assertTrue(report.passed(), report)
+
+    def test_biased_uppercase_is_detected(self):
+        """Выбор заглавной буквы через sequence.index смещает частоты."""
+        report = check_generator(
+            lambda count: [index_biased_sequence() for _ in range(count)],
+            block_model(6), 50000, track_duplicates=False)
+        self.assertFalse(report.passed())
+
+    def test_custom_branches(self):
+        """Все ветки кастомного пароля соответствуют модели."""
+        for password_length, user_sequence in (
+                (8, 'abcdefg'), (9, 'abcdefg'), (10, 'abcdefg'),
+                (11, 'abcdefg'), (12, 'abcde1'), (20, 'kadabra'),
+                (32, 'kadabra')):
+            with self.subTest(password_length=password_length):
+                generation = CustomGenerationPassword(
+                    password_length=password_length,
+                    user_sequence=user_sequence)
+                report = check_generator(
+                    generation.generate_many,
+                    custom_model(password_length, user_sequence), 50000,
+                    keyspace_bits=custom_collision_bits(password_length,
+                                                        user_sequence))
+                self.assertTrue(report.passed(), report)
+
+
+if __name__ == '__main__':
+    unittest.main()
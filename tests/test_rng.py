@@ -0,0 +1,109 @@
+import collections
+import os
+import threading
+import unittest
+
+from GerryPasswordBot.password_generator.generator import \
+    AutomaticPasswordGeneration, CustomGenerationPassword, \
+    PasswordGeneratorMixin
+from GerryPasswordBot.password_generator.rng import RandomSource, \
+    SeededRandomSource, SystemRandomSource, get_random_source, \
+    set_random_source
+
+
+class TestRandomSource(unittest.TestCase):
+    """Проверка источников случайности."""
+
+    def test_randbelow_range(self):
+        """Значения в [0, n) и все встречаются."""
+        source = SystemRandomSource(buffer_size=64)
+        for n in (1, 3, 62, 256, 1000, 70000):
+            with self.subTest(n=n):
+                values = [source.randbelow(n) for _ in range(3000)]
+                self.assertTrue(all(0 <= value < n for value in values))
+        counts = collections.Counter(source.randbelow(3)
+                                     for _ in range(3000))
+        self.assertEqual({0, 1, 2}, set(counts))
+        with self.assertRaises(ValueError):
+            source.randbelow(0)
+
+    def test_random_bytes_is_abstract(self):
+        """Источник без random_bytes не создается."""
+        with self.assertRaises(TypeError):
+            RandomSource()
+
+    def test_token_bytes(self):
+        """Короткие запросы - из буфера, длинные - напрямую."""
+        source = SystemRandomSource(buffer_size=64)
+        self.assertEqual(10, len(source.token_bytes(10)))
+        self.assertEqual(1000, len(source.token_bytes(1000)))
+        self.assertNotEqual(source.token_bytes(32), source.token_bytes(32))
+
+    def test_threads_use_own_buffers(self):
+        """Потоки не получают одинаковые байты из общего буфера."""
+        source = SystemRandomSource()
+        results = list()
+
+        def draw():
+            results.append(source.token_bytes(32))
+
+        threads = [threading.Thread(target=draw) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8, len(set(results)))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'нужен os.fork')
+    def test_buffer_is_reset_after_fork(self):
+        """Процесс после fork не повторяет байты буфера родителя."""
+        source = SystemRandomSource()
+        source.token_bytes(1)
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            os.write(write_end, source.token_bytes(32))
+            os._exit(0)
+        os.close(write_end)
+        child_bytes = os.read(read_end, 32)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        self.assertNotEqual(source.token_bytes(32), child_bytes)
+
+
+class TestSeededGeneration(unittest.TestCase):
+    """Детерминированный режим генераторов."""
+
+    def test_same_seed_same_passwords(self):
+        """Одинаковый seed - одинаковые пароли, поштучно и пакетом."""
+        def passwords(seed):
+            rng = SeededRandomSource(seed)
+            automatic = AutomaticPasswordGeneration(auto_gen=True, rng=rng)
+            custom = CustomGenerationPassword(password_length=16,
+                                              user_sequence='kadabra',
+                                              rng=rng)
+            return ([automatic.generate_password(),
+                     custom.generate_password(),
+                     PasswordGeneratorMixin.create_sequence(rng=rng)]
+                    + automatic.generate_many(5) + custom.generate_many(5)
+                    + PasswordGeneratorMixin.create_many_sequences(5, rng))
+
+        self.assertEqual(passwords(42), passwords(42))
+        self.assertNotEqual(passwords(42), passwords(43))
+
+    def test_default_source(self):
+        """Источник по умолчанию можно заменить на время теста."""
+        previous = set_random_source(SeededRandomSource(7))
+        try:
+            generation = AutomaticPasswordGeneration(auto_gen=True)
+            first = generation.generate_password()
+            set_random_source(SeededRandomSource(7))
+            self.assertEqual(first, generation.generate_password())
+        finally:
+            set_random_source(previous)
+        self.assertIs(previous, get_random_source())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import os
+import tempfile
+import time
+import unittest
+
+import telebot
+
+from GerryPasswordBot.gerry_bot.sharding import ShardSupervisor, \
+    default_worker_count, poll_updates, shard_for, shard_log_path, \
+    update_chat_id, worker_index
+
+
+SHARD_LOG = 'GERRY_TEST_SHARD_LOG'
+
+
+class RecordingBot:
+    """Записывает чат и pid процесса для каждого Update."""
+
+    def process_new_updates(self, updates):
+        with open(os.environ[SHARD_LOG], mode='a') as log:
+            for update in updates:
+                if update.message.text == 'crash':
+                    os._exit(3)
+                log.write('{0} {1}\n'.format(update.message.chat.id,
+                                             os.getpid()))
+
+
+def recording_bot():
+    return RecordingBot()
+
+
+def indexed_bot():
+    """Записывает номер процесса-обработчика при создании бота."""
+    with open(os.environ[SHARD_LOG], mode='a') as log:
+        log.write('{0} {1}\n'.format(worker_index(), os.getpid()))
+    return RecordingBot()
+
+
+def threaded_bot():
+    """TeleBot с пулом потоков и медленным обработчиком."""
+    bot = telebot.TeleBot('1:TEST', threaded=True)
+
+    @bot.message_handler(content_types=['text'])
+    def slow_handler(message):
+        time.sleep(0.01)
+        with open(os.environ[SHARD_LOG], mode='a') as log:
+            log.write('{0} {1}\n'.format(message.chat.id,
+                                         message.message_id))
+
+    return bot
+
+
+def text_update(update_id, chat_id, text='hello'):
+    return {'update_id': update_id, 'message': {
+        'message_id': update_id, 'date': 0, 'text': text,
+        'chat': {'id': chat_id, 'type': 'private'},
+        'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Gerry'}}}
+
+
+class TestShardRouting(unittest.TestCase):
+    """Проверка выбора процесса для Update."""
+
+    def test_update_chat_id(self):
+        """Чат берется из сообщения, нажатия кнопки или пользователя."""
+        self.assertEqual(update_chat_id(text_update(1, 42)), 42)
+        self.assertEqual(update_chat_id({'update_id': 2, 'callback_query': {
+            'id': '2', 'from': {'id': 7},
+            'message': {'chat': {'id': -100}}}}), -100)
+        self.assertEqual(update_chat_id({'update_id': 3, 'callback_query': {
+            'id': '3', 'from': {'id': 7}}}), 7)
+        self.assertEqual(update_chat_id({'update_id': 4, 'inline_query': {
+            'id': '4', 'from': {'id': 9}, 'query': ''}}), 9)
+        self.assertEqual(update_chat_id({'update_id': 5}), 0)
+
+    def test_shard_for_is_stable(self):
+        """Один чат - один процесс, включая отрицательные id групп."""
+        for chat_id in (0, 1, 42, -1001234567890):
+            shard = shard_for(chat_id, 3)
+            self.assertIn(shard, range(3))
+            self.assertEqual(shard, shard_for(chat_id, 3))
+
+    def test_shard_log_path(self):
+        """Свой файл журнала для каждого процесса-обработчика."""
+        self.assertEqual(os.path.join('logs', 'bot.shard-1.log'),
+                         shard_log_path(os.path.join('logs', 'bot.log'), 1))
+        self.assertEqual('bot.shard-0', shard_log_path('bot', 0))
+        self.assertIsNone(worker_index())
+
+    def test_default_worker_count(self):
+        """0 - по числу ядер."""
+        self.assertEqual(default_worker_count(3), 3)
+        self.assertEqual(default_worker_count(0), os.cpu_count() or 1)
+
+
+class TestShardSupervisor(unittest.TestCase):
+    """Проверка процессов-обработчиков."""
+
+    def setUp(self):
+        descriptor, self.log_path = tempfile.mkstemp()
+        os.close(descriptor)
+        os.environ[SHARD_LOG] = self.log_path
+        self.supervisor = ShardSupervisor(recording_bot, workers=2)
+        self.supervisor.start()
+
+    def tearDown(self):
+        self.supervisor.stop()
+        del os.environ[SHARD_LOG]
+        os.remove(self.log_path)
+
+    def read_log(self):
+        with open(self.log_path) as log:
+            return [tuple(map(int, line.split())) for line in log]
+
+    def test_chat_affinity(self):
+        """Все Update чата обрабатываются одним процессом."""
+        updates = [text_update(update_id, update_id % 5)
+                   for update_id in range(1, 41)]
+        self.supervisor.dispatch(updates[:20])
+        self.supervisor.dispatch(updates[20:])
+        self.assertTrue(self.supervisor.wait_processed(timeout=30))
+        records = self.read_log()
+        self.assertEqual(len(records), 40)
+        pids_by_chat = dict()
+        for chat_id, pid in records:
+            pids_by_chat.setdefault(chat_id, set()).add(pid)
+        self.assertTrue(all(len(pids) == 1
+                            for pids in pids_by_chat.values()))
+        self.assertEqual(len({pid for _, pid in records}), 2)
+        self.assertEqual(self.supervisor.stats()['processed'], 40)
+
+    def test_worker_index(self):
+        """Бот процесса создается, когда номер процесса уже известен."""
+        self.supervisor.stop()
+        self.supervisor = ShardSupervisor(indexed_bot, workers=2)
+        self.supervisor.start()
+        deadline = time.monotonic() + 30
+        while len(self.read_log()) < 2:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        self.assertEqual([0, 1], sorted(index for index, _
+                                        in self.read_log()))
+
+    def test_processed_after_handlers(self):
+        """Update считается после обработчика, порядок чата сохраняется."""
+        self.supervisor.stop()
+        self.supervisor = ShardSupervisor(threaded_bot, workers=1)
+        self.supervisor.start()
+        self.supervisor.dispatch([text_update(update_id, 3)
+                                  for update_id in range(1, 21)])
+        self.assertTrue(self.supervisor.wait_processed(timeout=30))
+        self.assertEqual([(3, update_id) for update_id in range(1, 21)],
+                         self.read_log())
+
+    def test_crashed_worker_is_restarted(self):
+        """Упавший процесс перезапускается и продолжает обработку."""
+        self.supervisor.dispatch([text_update(1, 2, 'crash')])
+        deadline = time.monotonic() + 30
+        while not self.supervisor.check_workers():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        self.assertEqual(self.supervisor.restarts, 1)
+        # Update упавшего процесса потерян, новые обрабатываются
+        self.supervisor.dispatch([text_update(2, 2)])
+        while self.supervisor.processed() < 1:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        self.assertEqual([chat_id for chat_id, _ in self.read_log()], [2])
+
+    def test_poll_updates_moves_offset(self):
+        """getUpdates вызывается со смещением после последнего Update."""
+        offsets = list()
+        responses = [[text_update(10, 1), text_update(11, 2)], []]
+
+        def fetch_updates(offset):
+            offsets.append(offset)
+            if not responses:
+                raise KeyboardInterrupt
+            return responses.pop(0)
+
+        with self.assertRaises(KeyboardInterrupt):
+            poll_updates(fetch_updates, self.supervisor)
+        self.assertEqual(offsets, [None, 12, 12])
+        self.assertTrue(self.supervisor.wait_processed(timeout=30))
+
+
+if __name__ == '__main__':
+    unittest.main()
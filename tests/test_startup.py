@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# бюджет холодного импорта, микросекунды (main, gerry_bot_config и
+# gerry_bot - ~3 мс, gerry_bot.app с telebot и requests - ~200 мс)
+IMPORT_TIME_BUDGET = {
+    'main': 50000,
+    'gerry_bot_config': 50000,
+    'gerry_bot': 50000,
+    'gerry_bot.app': 600000,
+}
+# тяжелые зависимости, которые не должны загружаться при импорте
+LAZY_MODULES = ('telebot', 'requests', 'dotenv', 'loguru', 'sqlite3')
+# модули, которым тяжелые зависимости нужны
+EAGER_IMPORTS = ('gerry_bot.app',)
+# бюджет холодного запуска: импорт gerry_bot.app и create_app, секунды
+# (сейчас ~0.2 с)
+CREATE_APP_BUDGET = 1.0
+
+CREATE_APP_SCRIPT = '''
+import time
+started = time.perf_counter()
+from gerry_bot.app import create_app
+from gerry_bot_config import load_config
+create_app(load_config(dotenv=False))
+print(time.perf_counter() - started)
+'''
+
+
+def import_time(module: str):
+    """
+    Импортировать модуль в новом процессе с python -X importtime.
+
+    Returns:
+        tuple: (накопленное время импорта модуля в мкс,
+            множество всех импортированных модулей).
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         'import {0}'.format(module)],
+        cwd=PROJECT_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    cumulative = None
+    imported = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, total, name = line.split('|')
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(total)
+    return cumulative, imported
+
+
+class TestStartup(unittest.TestCase):
+    """Проверка времени холодного запуска."""
+
+    def test_import_time_budget(self):
+        """Импорт укладывается в бюджет и не тянет тяжелые зависимости."""
+        for module, budget in IMPORT_TIME_BUDGET.items():
+            with self.subTest(module=module):
+                cumulative, imported = import_time(module)
+                self.assertIsNotNone(cumulative)
+                self.assertLess(cumulative, budget)
+                if module not in EAGER_IMPORTS:
+                    self.assertFalse(imported.intersection(LAZY_MODULES))
+
+    def test_create_app_budget(self):
+        """Новый процесс создает бота в пределах бюджета."""
+        with tempfile.TemporaryDirectory() as directory:
+            environ = dict(os.environ,
+                           BOT_TOKEN='1:TEST',
+                           LOG_PATH=os.path.join(directory, 'bot.log'),
+                           STICKER_CACHE_PATH=os.path.join(
+                               directory, 'file_ids.json'))
+            completed = subprocess.run(
+                [sys.executable, '-c', CREATE_APP_SCRIPT], cwd=PROJECT_DIR,
+                env=environ, stdout=subprocess.PIPE, check=True,
+                universal_newlines=True)
+        self.assertLess(float(completed.stdout), CREATE_APP_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from telebot import apihelper
+
+from GerryPasswordBot.gerry_bot.stickers import StickerCache
+
+
+class FakeBot:
+    """Бот, который запоминает отправленные стикеры."""
+
+    def __init__(self, stale_file_ids=()):
+        self.sent = list()
+        self.stale_file_ids = set(stale_file_ids)
+
+    def send_sticker(self, chat_id, sticker):
+        if isinstance(sticker, str):
+            if sticker in self.stale_file_ids:
+                raise apihelper.ApiTelegramException(
+                    'sendSticker', None,
+                    {'error_code': 400,
+                     'description': 'Bad Request: wrong file identifier'})
+            self.sent.append(('file_id', sticker))
+        else:
+            self.sent.append(('upload', sticker.read()))
+        return SimpleNamespace(
+            sticker=SimpleNamespace(file_id='id-{0}'.format(len(self.sent))))
+
+
+class TestStickerCache(unittest.TestCase):
+    """Проверка кэша telegram file_id стикеров."""
+
+    def setUp(self):
+        """Создать каталог со стикером и путь к кэшу."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.stickers_dir = self.directory.name
+        self.cache_path = os.path.join(self.directory.name, 'file_ids.json')
+        with open(os.path.join(self.stickers_dir, 'Hello.tgs'), 'wb') as file:
+            file.write(b'sticker')
+
+    def tearDown(self):
+        """Удалить временный каталог."""
+        self.directory.cleanup()
+
+    def test_upload_once_then_send_by_file_id(self):
+        """Стикер загружается один раз, дальше отправляется по file_id."""
+        bot = FakeBot()
+        cache = StickerCache(self.stickers_dir, self.cache_path)
+        cache.send_sticker(bot, 1, 'Hello.tgs')
+        cache.send_sticker(bot, 1, 'Hello.tgs')
+        self.assertEqual([('upload', b'sticker'), ('file_id', 'id-1')],
+                         bot.sent)
+
+    def test_file_id_is_persisted(self):
+        """file_id сохраняется между перезапусками."""
+        StickerCache(self.stickers_dir, self.cache_path).send_sticker(
+            FakeBot(), 1, 'Hello.tgs')
+        cache = StickerCache(self.stickers_dir, self.cache_path)
+        self.assertEqual('id-1', cache.get_file_id('Hello.tgs'))
+
+    def test_reupload_stale_file_id(self):
+        """Устаревший file_id приводит к повторной загрузке."""
+        cache = StickerCache(self.stickers_dir, self.cache_path)
+        cache.remember('Hello.tgs', 'stale')
+        bot = FakeBot(stale_file_ids=['stale'])
+        cache.send_sticker(bot, 1, 'Hello.tgs')
+        self.assertEqual([('upload', b'sticker')], bot.sent)
+        self.assertEqual('id-1', cache.get_file_id('Hello.tgs'))
+
+    def test_missing_sticker_file(self):
+        """Отсутствующий файл стикера вызывает FileNotFoundError."""
+        cache = StickerCache(self.stickers_dir, self.cache_path)
+        with self.assertRaises(FileNotFoundError):
+            cache.send_sticker(FakeBot(), 1, 'Missing.tgs')
+
+    def test_preloaded_sticker_is_uploaded_from_memory(self):
+        """После preload загрузка не читает файл с диска."""
+        cache = StickerCache(self.stickers_dir, self.cache_path)
+        cache.preload(['Hello.tgs', 'Missing.tgs'])
+        os.remove(os.path.join(self.stickers_dir, 'Hello.tgs'))
+        bot = FakeBot()
+        cache.send_sticker(bot, 1, 'Hello.tgs')
+        self.assertEqual([('upload', b'sticker')], bot.sent)
+        with self.assertRaises(FileNotFoundError):
+            cache.send_sticker(bot, 1, 'Missing.tgs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import math
+import unittest
+
+from GerryPasswordBot.password_generator.generator import \
+    AutomaticPasswordGeneration, CustomGenerationPassword
+from GerryPasswordBot.password_generator.strength import \
+    AUTOMATIC_KEYSPACE_BITS, audit_passwords, block_keyspace, \
+    custom_keyspace_bits, score_many, score_password
+
+
+class TestKeyspace(unittest.TestCase):
+    """Проверить пространство шаблона create_sequence."""
+
+    def test_full_block(self):
+        """Блок из 6 символов: 12 форм, строки разных форм не совпадают."""
+        self.assertEqual(34560000, block_keyspace(6))
+
+    def test_automatic_keyspace(self):
+        """Автоматический пароль - 3 блока через '-'."""
+        self.assertAlmostEqual(3 * math.log2(34560000),
+                               AUTOMATIC_KEYSPACE_BITS)
+
+    def test_custom_keyspace_branches(self):
+        """Короткий остаток - только цифра или буква с цифрой."""
+        self.assertAlmostEqual(math.log2(10),
+                               custom_keyspace_bits(8, 'abcdefg'))
+        self.assertAlmostEqual(math.log2(260),
+                               custom_keyspace_bits(8, 'abcde'))
+        self.assertLess(custom_keyspace_bits(20, 'kadabra'),
+                        math.log2(block_keyspace(13)) + 1)
+
+
+class TestScore(unittest.TestCase):
+    """Проверить оценку надежности паролей."""
+
+    def test_random_password_is_capped_by_keyspace(self):
+        """Оценка автоматического пароля не выше пространства шаблона."""
+        password = AutomaticPasswordGeneration(True).generate_password()
+        score = score_password(password, keyspace_bits=AUTOMATIC_KEYSPACE_BITS)
+        self.assertLessEqual(score.bits, AUTOMATIC_KEYSPACE_BITS)
+        self.assertEqual(20, score.length)
+
+    def test_patterns_are_penalized(self):
+        """Повторы и клавиатурные последовательности снижают оценку."""
+        for password in ('aaaaaaaa', 'qwertyui', 'abcdefgh', '12345678'):
+            with self.subTest(password=password):
+                score = score_password(password)
+                self.assertGreater(score.penalty_bits, 0)
+                self.assertEqual(0, score.level)
+                self.assertEqual('очень слабый', score.label)
+
+    def test_brand_is_penalized(self):
+        """Последовательность пользователя не добавляет бит."""
+        password = CustomGenerationPassword(
+            password_length=16, user_sequence='Porsche').generate_password()
+        with_brand = score_password(password, brand='porsche')
+        without_brand = score_password(password)
+        self.assertLess(with_brand.bits, without_brand.bits)
+
+    def test_batch_matches_single(self):
+        """Пакетная оценка совпадает с оценкой по одному паролю."""
+        passwords = ['qwerty123', 'Xk9-aaa', '', 'zyxw', 'пароль1']
+        self.assertEqual([score_password(password) for password in passwords],
+                         score_many(passwords))
+
+    def test_newline_is_rejected(self):
+        """Пароль с переводом строки нельзя оценить в пакете."""
+        with self.assertRaises(ValueError):
+            score_many(['abc\ndef'])
+
+    def test_audit(self):
+        """Сводка по паролям считается пакетами."""
+        passwords = ['aaaaaaaa'] * 3 + \
+            AutomaticPasswordGeneration(True).generate_many(7)
+        summary = audit_passwords(iter(passwords), batch_size=4)
+        self.assertEqual(10, summary['count'])
+        self.assertEqual(10, sum(summary['level_{0}'.format(level)]
+                                 for level in range(5)))
+        self.assertGreaterEqual(summary['penalized'], 3)
+        self.assertLessEqual(summary['min_bits'], summary['mean_bits'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+import io
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import telebot
+from telebot import apihelper
+
+from GerryPasswordBot.gerry_bot.telegram_client import CLOSED, \
+    HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, TelegramHttpClient, \
+    install_telegram_client
+
+
+SENT_MESSAGE = {'message_id': 1, 'date': 0, 'text': 'ok',
+                'chat': {'id': 42, 'type': 'private'}}
+
+
+class FakeBotApiHandler(BaseHTTPRequestHandler):
+    """Локальный Bot API: отвечает по очереди из server.responses."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, body,
+                                    self.client_address[1]))
+            status, payload = server.responses.pop(0) \
+                if server.responses else (200, {'ok': True,
+                                                'result': SENT_MESSAGE})
+        if status == RESET:
+            # запрос получен, соединение рвется без ответа
+            self.close_connection = True
+            return
+        if status == SLOW:
+            # запрос получен, ответ приходит после таймаута чтения
+            time.sleep(payload)
+            status, payload = 200, {'ok': True, 'result': SENT_MESSAGE}
+        data = json.dumps(payload).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except ConnectionError:
+            # клиент уже закрыл соединение по таймауту чтения
+            self.close_connection = True
+
+    do_GET = do_POST
+
+    def log_message(self, format: str, *args) -> None:
+        """Не печатать запросы в вывод тестов."""
+
+
+def too_many_requests(retry_after: int):
+    return 429, {'ok': False, 'error_code': 429,
+                 'description': 'Too Many Requests: retry after {0}'.format(
+                     retry_after),
+                 'parameters': {'retry_after': retry_after}}
+
+
+SLOW = 'slow'
+RESET = 'reset'
+
+
+SERVER_ERROR = (502, {'ok': False, 'error_code': 502,
+                      'description': 'Bad Gateway'})
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Проверка состояний предохранителя."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, cooldown=10,
+                                      clock=self.clock)
+
+    def test_opens_after_threshold(self):
+        """После серии ошибок запросы не пропускаются."""
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_resets_failures(self):
+        """Успешный запрос обнуляет счетчик ошибок подряд."""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_allows_single_probe(self):
+        """После cooldown пропускается один пробный запрос."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.clock.now = 20
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.opened, 2)
+
+
+class TestTelegramHttpClient(unittest.TestCase):
+    """Проверка клиента на локальном сервере Bot API."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                          FakeBotApiHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = list()
+        self.server.responses = list()
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.api_url = 'http://127.0.0.1:{0}/bot{{0}}/{{1}}'.format(
+            self.server.server_address[1])
+        self.delays = list()
+        self.client = TelegramHttpClient(
+            pool_size=2, connect_timeout=1, max_retries=3,
+            backoff_base=0.5, backoff_max=4,
+            breaker=CircuitBreaker(failure_threshold=3, cooldown=60),
+            sleep=self.delays.append)
+        self.saved = apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL
+        install_telegram_client(self.client, api_url=self.api_url)
+        self.bot = telebot.TeleBot('1:TEST', threaded=False)
+
+    def tearDown(self):
+        apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL = self.saved
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_send_message_through_client(self):
+        """telebot отправляет запрос через установленный клиент."""
+        message = self.bot.send_message(42, 'hello')
+        self.assertEqual(message.text, 'ok')
+        path, _, _ = self.server.requests[0]
+        self.assertEqual(path.split('?')[0], '/bot1:TEST/sendMessage')
+
+    def test_keep_alive_reuses_connection(self):
+        """Последовательные запросы идут по одному соединению."""
+        for _ in range(5):
+            self.bot.send_message(42, 'hello')
+        client_ports = {port for _, _, port in self.server.requests}
+        self.assertEqual(len(client_ports), 1)
+
+    def test_retry_after_is_honored(self):
+        """Ответ 429 повторяется не раньше retry_after."""
+        self.server.responses = [too_many_requests(3), too_many_requests(1)]
+        message = self.bot.send_message(42, 'hello')
+        self.assertEqual(message.message_id, 1)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(3 <= self.delays[0] <= 3.5)
+        self.assertTrue(1 <= self.delays[1] <= 1.5)
+        self.assertEqual(self.client.breaker.state, CLOSED)
+
+    def test_last_429_is_returned_to_telebot(self):
+        """После всех повторов telebot получает ошибку 429."""
+        self.server.responses = [too_many_requests(1)] * 4
+        with self.assertRaises(apihelper.ApiTelegramException) as error:
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(error.exception.error_code, 429)
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_long_retry_after_is_not_awaited(self):
+        """retry_after больше backoff_max - ошибка без ожидания."""
+        self.server.responses = [too_many_requests(300)]
+        with self.assertRaises(apihelper.ApiTelegramException) as error:
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(error.exception.error_code, 429)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.delays, [])
+
+    def test_read_timeout_is_not_retried_for_send(self):
+        """Отправленное сообщение не повторяется после таймаута чтения."""
+        self.server.responses = [(SLOW, 0.5)]
+        with self.assertRaises(requests.ReadTimeout):
+            self.bot.send_message(42, 'hello', timeout=0.1)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.delays, [])
+
+    def test_read_timeout_is_retried_for_get_updates(self):
+        """getUpdates повторяется после таймаута чтения."""
+        self.server.responses = [(SLOW, 0.5),
+                                 (200, {'ok': True, 'result': []})]
+        response = self.client('get', self.api_url.format(
+            '1:TEST', 'getUpdates'), timeout=(1, 0.1))
+        self.assertEqual(response.json()['result'], [])
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(len(self.delays), 1)
+
+    def test_reset_after_send_is_not_retried(self):
+        """Разрыв после отправки: сообщение не отправляется повторно."""
+        self.server.responses = [(RESET, None)]
+        with self.assertRaises(requests.ConnectionError):
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.delays, [])
+
+    def test_reset_is_retried_for_get_me(self):
+        """Идемпотентный запрос повторяется после разрыва."""
+        self.server.responses = [
+            (RESET, None),
+            (200, {'ok': True, 'result': {'id': 1, 'is_bot': True,
+                                          'first_name': 'Gerry'}})]
+        self.assertEqual(1, self.bot.get_me().id)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(len(self.delays), 1)
+
+    def test_server_errors_use_jittered_backoff(self):
+        """Ответы 5xx повторяются с растущей задержкой не выше потолка."""
+        self.server.responses = [SERVER_ERROR, SERVER_ERROR]
+        self.bot.send_message(42, 'hello')
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(0 <= self.delays[0] <= 0.5)
+        self.assertTrue(0 <= self.delays[1] <= 1.0)
+
+    def test_circuit_opens_on_repeated_errors(self):
+        """Серия 5xx размыкает предохранитель, запросы не отправляются."""
+        self.server.responses = [SERVER_ERROR] * 4
+        with self.assertRaises(apihelper.ApiTelegramException):
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(self.client.breaker.state, OPEN)
+        # после размыкания повторы прекращаются
+        sent = len(self.server.requests)
+        self.assertEqual(sent, 3)
+        with self.assertRaises(CircuitOpenError):
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(len(self.server.requests), sent)
+        self.assertEqual(self.client.stats()['circuit_open'], 1)
+
+    def test_connection_error_is_retried_and_raised(self):
+        """Недоступный сервер: повторы, затем исключение requests."""
+        self.server.shutdown()
+        self.server.server_close()
+        install_telegram_client(self.client,
+                                api_url='http://127.0.0.1:9/bot{0}/{1}')
+        with self.assertRaises(requests.ConnectionError):
+            self.bot.send_message(42, 'hello')
+        self.assertEqual(len(self.delays), 2)
+        self.assertEqual(self.client.breaker.state, OPEN)
+
+    def test_upload_is_rewound_before_retry(self):
+        """Повтор загрузки отправляет файл целиком."""
+        self.server.responses = [SERVER_ERROR]
+        sticker = io.BytesIO(b'sticker-bytes')
+        sticker.name = 'sticker.tgs'
+        self.bot.send_sticker(42, sticker)
+        self.assertEqual(len(self.server.requests), 2)
+        for _, body, _ in self.server.requests:
+            self.assertIn(b'sticker-bytes', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import re
+import string
+import unittest
+
+from GerryPasswordBot.password_generator.generator import \
+    AUTOMATIC_TEMPLATE, BLOCK_SHAPES, BLOCK_TEMPLATE, CUSTOM_TAIL_TEMPLATE
+from GerryPasswordBot.password_generator.template import PasswordTemplate, \
+    compile_template
+
+
+# блок встроенного шаблона: цифра в начале или в конце, остальное - буквы
+BLOCK_REGEX = '(?:[0-9][a-zA-Z]{5}|[a-zA-Z]{5}[0-9])'
+
+
+class TestPasswordTemplate(unittest.TestCase):
+    """Проверка компилятора шаблонов паролей."""
+
+    def test_fixed_template(self):
+        """Шаблон без правил задает класс каждой позиции."""
+        template = compile_template('Cvcvcd-cvcvcv-dvcvcv')
+        pattern = re.compile('[A-Z][a-z]{4}[0-9]-[a-z]{6}-[0-9][a-z]{5}$')
+        self.assertRegex(template.generate(), pattern)
+        for password in template.generate_many(200):
+            self.assertRegex(password, pattern)
+
+    def test_compiled_once(self):
+        """Одинаковый шаблон компилируется один раз."""
+        self.assertIs(compile_template('cvc-d'), compile_template('cvc-d'))
+        self.assertIsInstance(compile_template('cvc-d'), PasswordTemplate)
+
+    def test_escaped_literal(self):
+        """Символ после '\\' - литерал, даже если это класс."""
+        template = compile_template('\\c\\\\d')
+        self.assertEqual(3, template.length)
+        for password in template.generate_many(50):
+            self.assertRegex(password, r'^c\\[0-9]$')
+
+    def test_invalid_templates(self):
+        """Пустой шаблон, '\\' в конце, не-ASCII и управляющие символы."""
+        for pattern in ('', 'cv\\', 'cvпароль', 'cv\nd', 'cv\\\nd',
+                        'cv\td'):
+            with self.subTest(pattern=pattern):
+                with self.assertRaises(ValueError):
+                    PasswordTemplate(pattern)
+
+    def test_length(self):
+        """Генерируются первые length символов шаблона."""
+        self.assertEqual(['' for _ in range(3)],
+                         AUTOMATIC_TEMPLATE.generate_many(3, length=0))
+        for password in AUTOMATIC_TEMPLATE.generate_many(50, length=9):
+            self.assertEqual(9, len(password))
+            self.assertEqual('-', password[6])
+        self.assertEqual(9, len(AUTOMATIC_TEMPLATE.generate(length=9)))
+        with self.assertRaises(ValueError):
+            AUTOMATIC_TEMPLATE.generate_many(1, length=21)
+
+    def test_block_policies(self):
+        """Одна заглавная буква (если ее не заменила цифра) и цифра с краю."""
+        for template in (compile_template('cvccvc', True, True),
+                         # размер 'l' и цифр не помещается в один байт
+                         compile_template('llllll', True, True)):
+            with self.subTest(template=template):
+                passwords = template.generate_many(500) + [
+                    template.generate() for _ in range(100)]
+                for password in passwords:
+                    self.assertRegex(password, BLOCK_REGEX + '$')
+                    self.assertLessEqual(
+                        sum(map(str.isupper, password)), 1)
+                self.assertTrue(any(
+                    password[0] in string.digits for password in passwords))
+                self.assertTrue(any(
+                    password[-1] in string.digits for password in passwords))
+
+    def test_prefix(self):
+        """Префикс генерирует ровно length символов и кэшируется."""
+        prefix = CUSTOM_TAIL_TEMPLATE.prefix(9)
+        self.assertIs(prefix, CUSTOM_TAIL_TEMPLATE.prefix(9))
+        self.assertIs(CUSTOM_TAIL_TEMPLATE,
+                      CUSTOM_TAIL_TEMPLATE.prefix(42))
+        self.assertEqual(9, prefix.length)
+        self.assertRegex(prefix.generate(), '^-{0}-[a-zA-Z0-9]{{1}}$'.format(
+            BLOCK_REGEX))
+        with self.assertRaises(ValueError):
+            CUSTOM_TAIL_TEMPLATE.prefix(43)
+
+    def test_prefix_ensure_digit(self):
+        """Цифра в коротком префиксе есть по построению."""
+        for length in range(2, 6):
+            with self.subTest(length=length):
+                prefix = CUSTOM_TAIL_TEMPLATE.prefix(length,
+                                                     ensure_digit=True)
+                passwords = prefix.generate_many(300) + [
+                    prefix.generate() for _ in range(100)]
+                for password in passwords:
+                    self.assertEqual(length, len(password))
+                    self.assertTrue(set(password) & set(string.digits))
+        # полный блок всегда содержит цифру - формы не меняются
+        self.assertIs(CUSTOM_TAIL_TEMPLATE.prefix(7),
+                      CUSTOM_TAIL_TEMPLATE.prefix(7, ensure_digit=True))
+        with self.assertRaises(ValueError):
+            compile_template('cvc-').prefix(4, ensure_digit=True)
+
+    def test_builtin_templates(self):
+        """Встроенные шаблоны повторяют формат генераторов."""
+        self.assertEqual(6, BLOCK_TEMPLATE.length)
+        # оценки стойкости перебирают формы блока по BLOCK_SHAPES
+        self.assertEqual(BLOCK_SHAPES, len(BLOCK_TEMPLATE.segments[0]))
+        self.assertRegex(AUTOMATIC_TEMPLATE.generate(),
+                         '^{0}-{0}-{0}$'.format(BLOCK_REGEX))
+        self.assertEqual(42, CUSTOM_TAIL_TEMPLATE.length)
+        self.assertRegex(CUSTOM_TAIL_TEMPLATE.generate(),
+                         '^(?:-{0}){{6}}$'.format(BLOCK_REGEX))
+
+
+if __name__ == '__main__':
+    unittest.main()
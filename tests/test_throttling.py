@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from GerryPasswordBot.gerry_bot import throttling
+from GerryPasswordBot.gerry_bot.throttling import THROTTLED_MESSAGE, \
+    Throttle, TokenBucketLimiter
+
+
+def callback(data='auto_gen', user_id=1, message_id=10):
+    """Нажатие inline-кнопки."""
+    return SimpleNamespace(id='cb', data=data,
+                           from_user=SimpleNamespace(id=user_id),
+                           message=SimpleNamespace(
+                               chat=SimpleNamespace(id=user_id),
+                               message_id=message_id))
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    """Проверка ограничителя частоты."""
+
+    def test_burst_then_throttle(self):
+        """Разрешается серия capacity запросов, дальше - отказ."""
+        limiter = TokenBucketLimiter(rate=0.001, capacity=3, idle_ttl=60)
+        self.assertEqual([True, True, True, False],
+                         [limiter.allow(1) for _ in range(4)])
+        self.assertTrue(limiter.allow(2))
+
+    def test_refill(self):
+        """Токены пополняются со временем."""
+        limiter = TokenBucketLimiter(rate=100, capacity=1, idle_ttl=60)
+        self.assertTrue(limiter.allow(1))
+        self.assertFalse(limiter.allow(1))
+        time.sleep(0.02)
+        self.assertTrue(limiter.allow(1))
+
+    def test_idle_keys_are_evicted(self):
+        """Неактивные пользователи забываются."""
+        limiter = TokenBucketLimiter(rate=1, capacity=1, idle_ttl=0.01)
+        for user_id in range(100):
+            limiter.allow(user_id)
+        time.sleep(0.02)
+        limiter.allow('new')
+        self.assertEqual(1, len(limiter))
+
+
+class TestThrottle(unittest.TestCase):
+    """Проверка общего ограничителя обработчиков."""
+
+    def setUp(self):
+        """Установить инстанс класса Throttle."""
+        self.answers = list()
+        self.throttle = Throttle(
+            TokenBucketLimiter(rate=0.001, capacity=2, idle_ttl=60),
+            answer_callback=lambda call_id, **kwargs: self.answers.append(
+                kwargs))
+
+    def test_throttled_callback_is_answered(self):
+        """Лишнее нажатие получает answer_callback_query."""
+        calls = list()
+        handler = self.throttle.callback(lambda call: calls.append(call))
+        for _ in range(3):
+            handler(callback())
+        self.assertEqual(2, len(calls))
+        self.assertEqual([{'text': THROTTLED_MESSAGE}], self.answers)
+        self.assertEqual(1, self.throttle.stats()['throttled'])
+
+    def test_duplicate_callback_is_coalesced(self):
+        """Повторное нажатие во время обработки не запускает генерацию."""
+        started = threading.Event()
+        release = threading.Event()
+        calls = list()
+
+        @self.throttle.callback
+        def handler(call):
+            calls.append(call)
+            started.set()
+            release.wait(timeout=5)
+
+        thread = threading.Thread(target=handler, args=(callback(),))
+        thread.start()
+        started.wait(timeout=5)
+        handler(callback())
+        release.set()
+        thread.join()
+        self.assertEqual(1, len(calls))
+        self.assertEqual([{}], self.answers)
+        self.assertEqual(1, self.throttle.stats()['coalesced'])
+
+    def test_throttled_message_is_dropped(self):
+        """Лишние сообщения отбрасываются."""
+        messages = list()
+        handler = self.throttle.message(lambda message: messages.append(1))
+        message = SimpleNamespace(from_user=SimpleNamespace(id=5),
+                                  chat=SimpleNamespace(id=5))
+        for _ in range(3):
+            handler(message)
+        self.assertEqual(2, len(messages))
+
+    def test_throttled_message_is_answered_once(self):
+        """На серию лишних сообщений - один ответ, пока запрос не пройдет."""
+        sent = list()
+        limiter = TokenBucketLimiter(rate=0.001, capacity=1, idle_ttl=60)
+        throttle = Throttle(limiter, answer_callback=None,
+                            send_message=lambda chat_id, text: sent.append(
+                                (chat_id, text)))
+        messages = list()
+        handler = throttle.message(lambda message: messages.append(1))
+        message = SimpleNamespace(from_user=SimpleNamespace(id=5),
+                                  chat=SimpleNamespace(id=6))
+        for _ in range(4):
+            handler(message)
+        self.assertEqual(1, len(messages))
+        self.assertEqual([(6, THROTTLED_MESSAGE)], sent)
+        # после разрешенного запроса следующая серия снова получает ответ
+        now = time.monotonic() + 2000
+        with mock.patch.object(throttling.time, 'monotonic',
+                               return_value=now):
+            handler(message)
+            handler(message)
+        handler(message)
+        self.assertEqual(2, len(messages))
+        self.assertEqual([(6, THROTTLED_MESSAGE)] * 2, sent)
+
+    def test_async_throttled_message(self):
+        """Async-обработчик сообщений отвечает на отклоненное сообщение."""
+        sent = list()
+
+        async def send_message(chat_id, text):
+            sent.append((chat_id, text))
+
+        throttle = Throttle(
+            TokenBucketLimiter(rate=0.001, capacity=1, idle_ttl=60),
+            answer_callback=None, send_message=send_message)
+
+        @throttle.message
+        async def handler(message):
+            return 'done'
+
+        message = SimpleNamespace(from_user=SimpleNamespace(id=5),
+                                  chat=SimpleNamespace(id=5))
+
+        async def send_twice():
+            return [await handler(message), await handler(message)]
+
+        self.assertEqual(['done', None], asyncio.run(send_twice()))
+        self.assertEqual([(5, THROTTLED_MESSAGE)], sent)
+
+    def test_async_callback(self):
+        """Async-обработчики ограничиваются так же."""
+        answers = list()
+
+        async def answer(call_id, **kwargs):
+            answers.append(kwargs)
+
+        throttle = Throttle(
+            TokenBucketLimiter(rate=0.001, capacity=1, idle_ttl=60),
+            answer_callback=answer)
+
+        @throttle.callback
+        async def handler(call):
+            return 'done'
+
+        async def press_twice():
+            return [await handler(callback()), await handler(callback())]
+
+        self.assertEqual(['done', None], asyncio.run(press_twice()))
+        self.assertEqual([{'text': THROTTLED_MESSAGE}], answers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from GerryPasswordBot.password_generator.validation import \
+    CYRILLIC_IN_SEQUENCE, INVALID_CHARACTERS, PASSWORD_LENGTH_OUT_OF_RANGE, \
+    SEQUENCE_TOO_LONG, PasswordValidationError, validate_user_data
+
+
+class TestValidateUserData(unittest.TestCase):
+    """Проверка табличной валидации данных пользователя."""
+
+    def test_correct_data(self):
+        """Корректные данные - ошибки нет."""
+        self.assertIsNone(validate_user_data(12, 'kadabra9'))
+
+    def test_error_codes(self):
+        """Каждая ошибка возвращает свой код."""
+        cases = (
+            (7, 'abc', PASSWORD_LENGTH_OUT_OF_RANGE),
+            (9, 'wertfgyhju', SEQUENCE_TOO_LONG),
+            (20, 'werПКsf', CYRILLIC_IN_SEQUENCE),
+            (20, 'qigf~er', INVALID_CHARACTERS),
+        )
+        for password_length, user_sequence, expected_code in cases:
+            error = validate_user_data(password_length, user_sequence)
+            self.assertIsInstance(error, PasswordValidationError)
+            self.assertIsInstance(error, ValueError)
+            self.assertEqual(expected_code, error.code)
+
+    def test_cyrillic_is_checked_before_invalid_characters(self):
+        """Кириллица проверяется раньше недопустимых символов."""
+        error = validate_user_data(20, 'a~bё')
+        self.assertEqual(CYRILLIC_IN_SEQUENCE, error.code)
+
+    def test_all_invalid_characters_in_message(self):
+        """Все недопустимые символы попадают в текст ошибки по порядку."""
+        error = validate_user_data(20, 'a b\t~~')
+        self.assertEqual([' ', '\t', '~', '~'], error.invalid_characters)
+        self.assertEqual(
+            "[' ', '\\t', '~', '~'] - недопустимые символы в "
+            "последовательности.",
+            str(error))
+
+
+if __name__ == '__main__':
+    unittest.main()
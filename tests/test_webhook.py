@@ -0,0 +1,180 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+import telebot
+from loguru import logger
+from telebot import apihelper
+
+from GerryPasswordBot.gerry_bot.app import create_app
+from GerryPasswordBot.gerry_bot.webhook import WebhookServer
+from GerryPasswordBot.gerry_bot_config import load_config
+
+
+START_UPDATE = {
+    'update_id': 100,
+    'message': {
+        'message_id': 1,
+        'date': 1640000000,
+        'chat': {'id': 42, 'type': 'private', 'first_name': 'Gerry'},
+        'from': {'id': 42, 'is_bot': False, 'first_name': 'Gerry'},
+        'text': '/start',
+        'entities': [{'type': 'bot_command', 'offset': 0, 'length': 6}],
+    },
+}
+
+
+def start_update(update_id, chat_id):
+    """Update с командой /start от пользователя chat_id."""
+    update = json.loads(json.dumps(START_UPDATE))
+    update['update_id'] = update_id
+    update['message']['chat']['id'] = chat_id
+    update['message']['from']['id'] = chat_id
+    return update
+
+
+class SlowSender:
+    """Медленная заглушка Bot API: считает одновременные запросы."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.threads = set()
+        self.calls = 0
+
+    def __call__(self, method, url, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.threads.add(threading.current_thread().name)
+        time.sleep(0.1)
+        with self.lock:
+            self.active -= 1
+            self.calls += 1
+        return SlowResponse()
+
+
+class SlowResponse:
+    status_code = 200
+    text = ('{"ok": true, "result": {"message_id": 1, "date": 0, '
+            '"chat": {"id": 42, "type": "private"}}}')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class TestWebhookServer(unittest.TestCase):
+    """Проверка локального webhook-сервера без доступа к сети."""
+
+    def setUp(self):
+        """Запустить сервер на свободном порту localhost."""
+        self.bot = telebot.TeleBot('1:TEST', threaded=False)
+        self.received = list()
+        self.processed = threading.Event()
+
+        @self.bot.message_handler(commands=['start'])
+        def start(message):
+            self.received.append(message.chat.id)
+            self.processed.set()
+
+        self.server = WebhookServer(self.bot, '127.0.0.1', 0, '/hook',
+                                    workers=2)
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{0}'.format(self.server.server_port)
+
+    def tearDown(self):
+        """Остановить сервер."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(timeout=1)
+
+    def post(self, path, body):
+        """Отправить POST-запрос на сервер."""
+        request = urllib.request.Request(
+            self.url + path, data=body, method='POST',
+            headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+
+    def test_update_is_processed(self):
+        """Записанный Update доходит до обработчика бота."""
+        status = self.post('/hook', json.dumps(START_UPDATE).encode())
+        self.assertEqual(200, status)
+        self.assertTrue(self.processed.wait(timeout=5))
+        self.assertEqual([42], self.received)
+
+    def test_wrong_path_is_forbidden(self):
+        """Запрос на чужой путь отклоняется."""
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post('/other', json.dumps(START_UPDATE).encode())
+        self.assertEqual(403, error.exception.code)
+
+    def test_invalid_json(self):
+        """Некорректный JSON отклоняется."""
+        with self.assertRaises(urllib.error.HTTPError) as error:
+            self.post('/hook', b'not json')
+        self.assertEqual(400, error.exception.code)
+
+
+class TestWebhookApp(unittest.TestCase):
+    """Webhook-сервер с ботом из create_app, как в main.py."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config = load_config({
+            'BOT_TOKEN': '1:TEST',
+            'LOG_PATH': os.path.join(self.directory.name, 'bot.log'),
+            'STICKERS_DIR': self.directory.name,
+            'STICKER_CACHE_PATH': os.path.join(self.directory.name,
+                                               'file_ids.json'),
+            'PASSWORD_POOL_SIZE': '10',
+            'PASSWORD_POOL_LOW_WATER_MARK': '2',
+        }, dotenv=False)
+        self.saved = apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL
+
+    def tearDown(self):
+        apihelper.CUSTOM_REQUEST_SENDER, apihelper.API_URL = self.saved
+        logger.remove()
+        self.directory.cleanup()
+
+    def serve(self, threaded):
+        """Обработать 4 /start от разных чатов, вернуть заглушку API."""
+        app = create_app(self.config, threaded=threaded)
+        sender = SlowSender()
+        apihelper.CUSTOM_REQUEST_SENDER = sender
+        server = WebhookServer(app.bot, '127.0.0.1', 0, '/hook', workers=4)
+        try:
+            for chat_id in range(1, 5):
+                server.submit_update(telebot.types.Update.de_json(
+                    start_update(chat_id, chat_id)))
+        finally:
+            # server_close дожидается обработки принятых Update
+            server.server_close()
+            app.stop()
+        return sender
+
+    def test_main_webhook_bot(self):
+        """Бот webhook-режима main.py обрабатывает Update в workers."""
+        sender = self.serve(threaded=False)
+        self.assertEqual(12, sender.calls)
+        self.assertGreater(sender.max_active, 2)
+        self.assertTrue(all(name.startswith('webhook')
+                            for name in sender.threads))
+
+    def test_threaded_bot_is_switched(self):
+        """Threaded-бот не уходит в пул telebot из 2 потоков."""
+        sender = self.serve(threaded=True)
+        self.assertEqual(12, sender.calls)
+        self.assertGreater(sender.max_active, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()